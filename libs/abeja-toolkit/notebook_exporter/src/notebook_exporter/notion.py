@@ -6,7 +6,7 @@ from google.oauth2.service_account import Credentials as ServiceAccountCredentia
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 
-from notion_extension import Block, Blocks, Client, Properties, make_batch
+from notion_extension import Block, Blocks, Client, Properties
 
 from .data import Cell
 from .extractor import NotebookExtractor
@@ -166,17 +166,10 @@ class NotionExporter:
         cells = NotebookExtractor.extract(notebook_path=notebook_path)
         blocks = self._to_notion_blocks(cells=cells, drive_dir_id=drive_dir_id)
 
-        # Notion API limits the number of blocks per request to 100.
+        # The blocks are split into the requests which meet the request limits of the Notion API.
         # See: https://developers.notion.com/reference/request-limits
-        for i, batch in enumerate(make_batch(blocks, batch_size=1)):
-            if i == 0:
-                page = self.notion_client.create_page(
-                    database_id=database_id,
-                    properties=db_properties,
-                    page_contents=Blocks(blocks=batch),
-                )
-            else:
-                self.notion_client.append_blocks_to_page(
-                    page_id=page["id"],
-                    blocks=Blocks(blocks=batch),
-                )
+        self.notion_client.create_page(
+            database_id=database_id,
+            properties=db_properties,
+            page_contents=Blocks(blocks=blocks),
+        )
@@ -0,0 +1,379 @@
+"""
+Benchmarks of the read and write paths of notion_extension against the mock backend.
+
+Usage:
+    python benchmarks/run.py                    # run and compare with baseline.json
+    python benchmarks/run.py --save-baseline    # run and overwrite baseline.json
+    python benchmarks/run.py --latency 0.05 --filter get_all_blocks
+
+The baseline stores the timings relative to a unit rather than in seconds, so that it can be
+compared across machines. The cases sending requests are divided by the latency of the mock
+backend, which gives the number of sequential round trips the case costs, and the others by
+the time of a fixed reference workload measured in the same run.
+"""
+
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from notion_extension.blocks import Blocks
+from notion_extension.client import Client
+from notion_extension.codec import JSONCodec, OrjsonCodec, StdlibCodec
+from notion_extension.db_properties import Properties, Property
+from notion_extension.mock_server import MockNotionBackend, MockTransport
+from notion_extension.ratelimit import RateLimiter
+from notion_extension.utils import blocks2markdown
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "baseline.json"
+# The latency of the mock backend, which makes the cases sending requests measure the round
+# trips, e.g. the concurrency of get_all_blocks, rather than the speed of the machine.
+DEFAULT_LATENCY = 0.005
+DEFAULT_MAX_WORKERS = 8
+# A case is regarded as regressed when it gets slower or bigger than the baseline by this ratio.
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass
+class Case:
+    name: str
+    # Prepare the state and return the workload, which returns the number of processed items.
+    setup: Callable[[], Callable[[], int]]
+    # Whether the workload sends requests to the mock backend, so it is timed in round trips.
+    uses_network: bool = False
+
+
+def reference_workload() -> int:
+    """A fixed CPU-bound workload, whose time is the unit of the cases not sending requests."""
+    body = [
+        {"id": str(i), "text": "x" * (i % 100), "values": list(range(i % 20))} for i in range(2000)
+    ]
+    return len(json.loads(json.dumps(body, sort_keys=True)))
+
+
+def make_client(backend: MockNotionBackend) -> Client:
+    return Client(
+        auth="secret",
+        client=httpx.Client(transport=MockTransport(backend)),
+        # Do not throttle, so that the client overhead and the backend latency are measured.
+        rate_limiter=RateLimiter(rate=1_000_000, burst=1_000),
+    )
+
+
+def make_markdown(num_sections: int) -> str:
+    sections = []
+    for i in range(num_sections):
+        sections.append(
+            f"## Section {i}\n\n"
+            f"Paragraph with **bold**, `code` and [a link](https://example.com/{i}).\n\n"
+            "- first item\n- second item\n  - nested item\n\n"
+            "1. step one\n2. step two\n\n"
+            f"```python\nprint({i})\n```\n\n"
+            "$$\ne = mc^2\n$$\n"
+        )
+    return "\n".join(sections)
+
+
+def bench_get_all_blocks(
+    latency: float, num_blocks: int, depth: int, fanout: int, max_workers: int | None = None
+) -> Case:
+    def setup() -> Callable[[], int]:
+        backend = MockNotionBackend(latency=latency)
+        workspace = backend.seed_workspace(
+            pages_per_database=1, blocks_per_page=num_blocks, depth=depth, fanout=fanout
+        )
+        client = make_client(backend)
+
+        def count(blocks: list[dict[str, Any]]) -> int:
+            return sum(1 + count(block.get("children", [])) for block in blocks)
+
+        return lambda: count(client.get_all_blocks(workspace.page_ids[0], max_workers=max_workers))
+
+    name = f"get_all_blocks[blocks={num_blocks},depth={depth},fanout={fanout},max_workers={max_workers}]"
+    return Case(name, setup, uses_network=True)
+
+
+def bench_get_entire_database(latency: float, rows: int) -> Case:
+    def setup() -> Callable[[], int]:
+        backend = MockNotionBackend(latency=latency)
+        workspace = backend.seed_workspace(pages_per_database=rows, blocks_per_page=0)
+        client = make_client(backend)
+        return lambda: len(client.get_entire_database(workspace.database_ids[0]))
+
+    return Case(f"get_entire_database[rows={rows}]", setup, uses_network=True)
+
+
+def bench_create_page(latency: float, num_sections: int) -> Case:
+    def setup() -> Callable[[], int]:
+        backend = MockNotionBackend(latency=latency)
+        workspace = backend.seed_workspace(pages_per_database=0)
+        client = make_client(backend)
+        blocks = Blocks.from_markdown(make_markdown(num_sections))
+        properties = Properties(properties=[Property.title(name="Name", text="benchmark")])
+
+        def run() -> int:
+            client.create_page(workspace.database_ids[0], properties, blocks)
+            return len(blocks.blocks)
+
+        return run
+
+    return Case(f"create_page[sections={num_sections}]", setup, uses_network=True)
+
+
+def bench_append_blocks(latency: float, num_sections: int) -> Case:
+    def setup() -> Callable[[], int]:
+        backend = MockNotionBackend(latency=latency)
+        workspace = backend.seed_workspace(pages_per_database=1, blocks_per_page=0)
+        client = make_client(backend)
+        blocks = Blocks.from_markdown(make_markdown(num_sections))
+
+        def run() -> int:
+            client.append_blocks_to_page(workspace.page_ids[0], blocks)
+            return len(blocks.blocks)
+
+        return run
+
+    return Case(f"append_blocks_to_page[sections={num_sections}]", setup, uses_network=True)
+
+
+def bench_from_markdown(num_sections: int) -> Case:
+    def setup() -> Callable[[], int]:
+        markdown = make_markdown(num_sections)
+        return lambda: len(Blocks.from_markdown(markdown).blocks)
+
+    return Case(f"from_markdown[sections={num_sections}]", setup)
+
+
+def bench_blocks2markdown(num_blocks: int) -> Case:
+    def setup() -> Callable[[], int]:
+        backend = MockNotionBackend()
+        workspace = backend.seed_workspace(
+            pages_per_database=1, blocks_per_page=num_blocks, depth=1, fanout=2
+        )
+        blocks = make_client(backend).get_all_blocks(workspace.page_ids[0])
+
+        def run() -> int:
+            blocks2markdown(blocks)
+            return num_blocks
+
+        return run
+
+    return Case(f"blocks2markdown[blocks={num_blocks}]", setup)
+
+
+def make_codecs() -> list[JSONCodec]:
+    codecs: list[JSONCodec] = [StdlibCodec()]
+    try:
+        codecs.append(OrjsonCodec())
+    except ImportError:
+        print("orjson is not installed, so only the stdlib codec is measured.")
+    return codecs
+
+
+def make_code_markdown(num_blocks: int) -> str:
+    # Large code blocks such as notebook cells and their outputs.
+    line = "result = model.predict(features)  # " + "x" * 60 + "\n"
+    return "\n".join(f"```python\n{line * 20}```\n" for _ in range(num_blocks))
+
+
+def bench_codec_encode(codec: JSONCodec, num_blocks: int) -> Case:
+    def setup() -> Callable[[], int]:
+        body = {"children": Blocks.from_markdown(make_code_markdown(num_blocks)).format()}
+        return lambda: len(codec.dumps(body))
+
+    return Case(f"codec_encode[{codec.name},blocks={num_blocks}]", setup)
+
+
+def bench_codec_decode(codec: JSONCodec, rows: int) -> Case:
+    def setup() -> Callable[[], int]:
+        backend = MockNotionBackend()
+        workspace = backend.seed_workspace(pages_per_database=rows, blocks_per_page=0)
+        # Concatenate the responses of the query to make a large body.
+        responses = []
+        for start in range(0, rows, 100):
+            _, content, _ = backend.handle(
+                "POST",
+                f"databases/{workspace.database_ids[0]}/query",
+                {},
+                json.dumps({"start_cursor": str(start)}).encode(),
+            )
+            responses.append(content)
+        payload = b"[" + b",".join(responses) + b"]"
+
+        def run() -> int:
+            codec.loads(payload)
+            return rows
+
+        return run
+
+    return Case(f"codec_decode[{codec.name},rows={rows}]", setup)
+
+
+def make_cases(latency: float, quick: bool) -> list[Case]:
+    scale = 1 if quick else 4
+    codecs = make_codecs()
+    return [
+        *(
+            bench_get_all_blocks(latency, 20 * scale, depth=3, fanout=4, max_workers=max_workers)
+            for max_workers in (None, DEFAULT_MAX_WORKERS)
+        ),
+        bench_get_all_blocks(
+            latency, 40 * scale, depth=1, fanout=10, max_workers=DEFAULT_MAX_WORKERS
+        ),
+        bench_get_entire_database(latency, rows=100 * scale),
+        bench_get_entire_database(latency, rows=1000 * scale),
+        bench_create_page(latency, num_sections=5 * scale),
+        bench_create_page(latency, num_sections=50 * scale),
+        bench_append_blocks(latency, num_sections=50 * scale),
+        bench_from_markdown(num_sections=20 * scale),
+        bench_from_markdown(num_sections=200 * scale),
+        bench_blocks2markdown(num_blocks=100 * scale),
+        bench_blocks2markdown(num_blocks=1000 * scale),
+        *(bench_codec_encode(codec, num_blocks=100 * scale) for codec in codecs),
+        *(bench_codec_decode(codec, rows=500 * scale) for codec in codecs),
+    ]
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q * (len(values) - 1))))
+    return values[index]
+
+
+def measure(workload: Callable[[], int], repeat: int) -> tuple[list[float], int]:
+    workload()  # warm up
+
+    durations = []
+    items = 0
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        items = workload()
+        durations.append(time.perf_counter() - started_at)
+    return durations, items
+
+
+def run_case(case: Case, repeat: int, unit: float) -> dict[str, float]:
+    workload = case.setup()
+    durations, items = measure(workload, repeat)
+
+    # Measure the memory in a separate run since tracing slows down the workload.
+    tracemalloc.start()
+    workload()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50 = statistics.median(durations)
+    p95 = percentile(durations, 0.95)
+    return {
+        "items": items,
+        "p50": p50,
+        "p95": p95,
+        "relative_p50": p50 / unit,
+        "relative_p95": p95 / unit,
+        "throughput": items / p50 if p50 > 0 else 0.0,
+        "peak_memory": peak,
+    }
+
+
+def to_baseline(result: dict[str, float]) -> dict[str, float]:
+    """Drop the timings in seconds, which are valid only on the machine measuring them."""
+    keys = ("items", "relative_p50", "relative_p95", "peak_memory")
+    return {key: round(result[key], 3) for key in keys}
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    """Print the ratios to the baseline and return the names of the regressed cases."""
+    regressions = []
+    print(f"\n{'case':<60} {'p50 ratio':>10} {'memory ratio':>13}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<60} {'new':>10} {'new':>13}")
+            continue
+
+        base_p50 = base["relative_p50"]
+        time_ratio = result["relative_p50"] / base_p50 if base_p50 > 0 else 1.0
+        memory_ratio = result["peak_memory"] / base["peak_memory"] if base["peak_memory"] else 1.0
+        regressed = time_ratio > 1 + threshold or memory_ratio > 1 + threshold
+        mark = "  REGRESSION" if regressed else ""
+        print(f"{name:<60} {time_ratio:>10.2f} {memory_ratio:>13.2f}{mark}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[1] if __doc__ else None)
+    parser.add_argument(
+        "--latency", type=float, default=DEFAULT_LATENCY, help="Latency of the mock backend"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of each case")
+    parser.add_argument("--quick", action="store_true", help="Run the small cases only")
+    parser.add_argument("--filter", type=str, default="", help="Run the cases containing this")
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE_PATH, help="Path to the baseline"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Save the results as the baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed ratio of regression"
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Path to save the results")
+    args = parser.parse_args()
+
+    reference = statistics.median(measure(reference_workload, max(args.repeat, 5))[0])
+    print(f"reference workload: {reference * 1000:.2f} ms\n")
+
+    results = {}
+    print(
+        f"{'case':<60} {'items':>7} {'p50 (ms)':>10} {'p95 (ms)':>10} {'relative':>9} "
+        f"{'items/s':>10} {'peak MB':>8}"
+    )
+    for case in make_cases(args.latency, args.quick):
+        if args.filter not in case.name:
+            continue
+        unit = args.latency if case.uses_network and args.latency > 0 else reference
+        result = run_case(case, args.repeat, unit)
+        results[case.name] = result
+        print(
+            f"{case.name:<60} {result['items']:>7.0f} {result['p50'] * 1000:>10.2f} "
+            f"{result['p95'] * 1000:>10.2f} {result['relative_p50']:>9.2f} "
+            f"{result['throughput']:>10.0f} {result['peak_memory'] / 1e6:>8.2f}"
+        )
+
+    config = {"latency": args.latency, "repeat": args.repeat}
+    report = {"config": config, "reference": reference, "results": results}
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        baseline = {
+            "config": config,
+            "results": {name: to_baseline(result) for name, result in results.items()},
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nSaved the baseline to {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["config"] != report["config"]:
+            print(f"\nWarning: the baseline was measured with {baseline['config']}.")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed over {args.threshold:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
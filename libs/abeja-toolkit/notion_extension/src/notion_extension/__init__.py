@@ -1,5 +1,16 @@
+from .background import BackgroundClient
 from .blocks import Block, Blocks
+from .cache import BlockCache, DiskBlockCache, MemoryBlockCache
 from .client import AsyncClient, Client
+from .crawler import WorkspaceCrawler
+from .dataframe import DatabaseTable
 from .db_properties import Properties, Property
 from .factory import RichTextFactory
+from .instrumentation import RequestMetrics
+from .mirror import DatabaseMirror
+from .ratelimit import RateLimiter, get_shared_rate_limiter
+from .records import BlockRecord, PageRecord
+from .response_cache import ResponseCache
+from .tree import AsyncBlockTree, BlockTree
+from .users import UserNotFoundError
 from .utils import blocks2markdown, make_batch
@@ -0,0 +1,410 @@
+import asyncio
+import inspect
+import threading
+from types import TracebackType
+from typing import Any, AsyncGenerator, Awaitable, Generator, Iterable, TextIO, TypeVar
+
+from notion_client.api_endpoints import Endpoint
+
+from .blocks import Blocks
+from .bulk import BulkReport
+from .client import DEFAULT_MAX_CONCURRENCY, AsyncClient
+from .dataframe import DatabaseTable
+from .db_properties import Properties
+from .diff import PageSyncResult
+from .records import BlockRecord, PageRecord
+
+T = TypeVar("T")
+
+
+async def _wait(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+def _concurrency(max_workers: int | None) -> int:
+    """Map `max_workers` of `Client` to `max_concurrency` of `AsyncClient`. The requests run
+    in the loop rather than in threads, so None uses the default concurrency."""
+    if max_workers is None:
+        return DEFAULT_MAX_CONCURRENCY
+    if max_workers < 1:
+        raise ValueError("max_workers must be greater than 0")
+    return max_workers
+
+
+class _Proxy:
+    """Run the coroutines returned by the methods of the wrapped object in the background loop."""
+
+    def __init__(self, owner: "BackgroundClient", target: Any):
+        self._owner = owner
+        self._target = target
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        return _Proxy(self._owner, value) if isinstance(value, Endpoint) else self._call(value)
+
+    def _call(self, method: Any) -> Any:
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = method(*args, **kwargs)
+            return self._owner.run(result) if inspect.isawaitable(result) else result
+
+        return call
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        # Some endpoints such as `search` are called directly.
+        result = self._target(*args, **kwargs)
+        return self._owner.run(result) if inspect.isawaitable(result) else result
+
+
+class BackgroundClient:
+    """
+    A synchronous client which runs an `AsyncClient` in an event loop on a background thread.
+
+    It has the methods of `Client` with the same names and parameters, which block until the
+    result is ready, so it can replace `Client` in synchronous code. `max_workers` limits the
+    requests in flight in the loop instead of the threads, and None uses
+    DEFAULT_MAX_CONCURRENCY. The endpoints such as `pages.create` are available as well, and
+    the batch methods `get_many_blocks` and `create_pages` fan out concurrently in the loop.
+
+    `get_block_tree`, whose tree is bound to the loop, is not supported. The methods must not
+    be called from the loop thread itself, e.g. from a callback.
+
+    Parameters
+    ----------
+    *args : Any
+        The positional arguments of `AsyncClient`.
+    **kwargs : Any
+        The keyword arguments of `AsyncClient`, e.g. `auth` and `rate_limiter`.
+
+    Examples
+    --------
+    >>> with BackgroundClient(auth=token) as client:
+    ...     blocks_by_page = client.get_many_blocks(page_ids)
+    ...     report = client.create_pages(database_id, rows)
+    ...     page = client.pages.retrieve(page_id=page_id)
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="notion-extension-loop", daemon=True
+        )
+        self._thread.start()
+        self._closed = False
+
+        async def create() -> AsyncClient:
+            # The HTTP client of AsyncClient is created in the loop where it is used.
+            return AsyncClient(*args, **kwargs)
+
+        self.async_client = self.run(create())
+
+    def __enter__(self) -> "BackgroundClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def run(self, awaitable: Awaitable[T]) -> T:
+        """
+        Run an awaitable in the background loop and wait for the result.
+
+        Parameters
+        ----------
+        awaitable : Awaitable[T]
+            The awaitable, e.g. a coroutine calling `async_client`.
+
+        Returns
+        -------
+        T
+            The result of the awaitable.
+
+        Raises
+        ------
+        RuntimeError
+            If the client is closed, or if this is called from the loop thread.
+        """
+        error = None
+        if self._closed:
+            error = RuntimeError("The client is closed")
+        elif threading.current_thread() is self._thread:
+            error = RuntimeError("BackgroundClient cannot be called from its own event loop")
+        if error is not None:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise error
+        return asyncio.run_coroutine_threadsafe(_wait(awaitable), self._loop).result()
+
+    def close(self) -> None:
+        """Close the HTTP client and stop the background loop."""
+        if self._closed:
+            return
+        try:
+            self.run(self.async_client.aclose())
+        finally:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def _iterate(self, generator: AsyncGenerator[T, None]) -> Generator[T, None, None]:
+        """Pull the items of the async generator one by one from the background loop."""
+        try:
+            while True:
+                try:
+                    item = self.run(generator.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            if not self._closed:
+                self.run(generator.aclose())
+
+    @property
+    def blocks(self) -> Any:
+        """The blocks endpoint, whose methods block until the response."""
+        return _Proxy(self, self.async_client.blocks)
+
+    @property
+    def databases(self) -> Any:
+        """The databases endpoint, whose methods block until the response."""
+        return _Proxy(self, self.async_client.databases)
+
+    @property
+    def pages(self) -> Any:
+        """The pages endpoint, whose methods block until the response."""
+        return _Proxy(self, self.async_client.pages)
+
+    @property
+    def users(self) -> Any:
+        """The users endpoint, whose methods block until the response."""
+        return _Proxy(self, self.async_client.users)
+
+    @property
+    def search(self) -> Any:
+        """The search endpoint, which blocks until the response when called."""
+        return _Proxy(self, self.async_client.search)
+
+    @property
+    def comments(self) -> Any:
+        """The comments endpoint, whose methods block until the response."""
+        return _Proxy(self, self.async_client.comments)
+
+    def request(
+        self,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None = None,
+        body: dict[Any, Any] | None = None,
+        auth: str | None = None,
+    ) -> Any:
+        """Send a request to the API. See `Client.request`."""
+        return self.run(self.async_client.request(path, method, query, body, auth))
+
+    def create_page(
+        self,
+        database_id: str,
+        properties: Properties,
+        page_contents: Blocks | None = None,
+        max_workers: int | None = None,
+    ) -> Any:
+        """Create a page in the database. See `Client.create_page`."""
+        return self.run(
+            self.async_client.create_page(
+                database_id, properties, page_contents, max_concurrency=_concurrency(max_workers)
+            )
+        )
+
+    def append_blocks_to_page(
+        self, page_id: str, blocks: Blocks, max_workers: int | None = None
+    ) -> Any:
+        """Append the blocks to the page. See `Client.append_blocks_to_page`."""
+        return self.run(
+            self.async_client.append_blocks_to_page(
+                page_id, blocks, max_concurrency=_concurrency(max_workers)
+            )
+        )
+
+    def sync_page_content(self, page_id: str, blocks: Blocks) -> PageSyncResult:
+        """Make the content of the page match the blocks. See `Client.sync_page_content`."""
+        return self.run(self.async_client.sync_page_content(page_id, blocks))
+
+    def update_pages(
+        self,
+        updates: Iterable[tuple[dict[str, Any], Properties]],
+        max_workers: int | None = None,
+        resume_from: BulkReport | None = None,
+    ) -> BulkReport:
+        """Update the properties of many pages. See `Client.update_pages`."""
+        return self.run(
+            self.async_client.update_pages(
+                updates, max_concurrency=_concurrency(max_workers), resume_from=resume_from
+            )
+        )
+
+    def get_all_blocks(
+        self,
+        page_id: str,
+        max_workers: int | None = None,
+        max_depth: int | None = None,
+        include_types: Iterable[str] | None = None,
+        skip_children_of: Iterable[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get all blocks of a page. See `Client.get_all_blocks`."""
+        return self.run(
+            self.async_client.get_all_blocks(
+                page_id,
+                max_concurrency=_concurrency(max_workers),
+                max_depth=max_depth,
+                include_types=include_types,
+                skip_children_of=skip_children_of,
+            )
+        )
+
+    def get_block_records(
+        self, page_id: str, keep_raw: bool = False, **kwargs: Any
+    ) -> list[BlockRecord]:
+        """Get all blocks of a page as compact records. See `Client.get_block_records`."""
+        if "max_workers" in kwargs:
+            kwargs["max_concurrency"] = _concurrency(kwargs.pop("max_workers"))
+        return self.run(self.async_client.get_block_records(page_id, keep_raw, **kwargs))
+
+    def stream_page_markdown(
+        self,
+        page_id: str,
+        fp: TextIO,
+        max_workers: int = DEFAULT_MAX_CONCURRENCY,
+        max_depth: int | None = None,
+        skip_children_of: Iterable[str] | None = None,
+    ) -> int:
+        """Write the page as Markdown while it is fetched. See `Client.stream_page_markdown`."""
+        return self.run(
+            self.async_client.stream_page_markdown(
+                page_id,
+                fp,
+                max_concurrency=_concurrency(max_workers),
+                max_depth=max_depth,
+                skip_children_of=skip_children_of,
+            )
+        )
+
+    def iter_database(
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        sorts: list[dict[str, Any]] | None = None,
+        filter_properties: list[str] | None = None,
+    ) -> Generator[dict[str, Any], None, None]:
+        """Iterate over the pages of the database. See `Client.iter_database`."""
+        return self._iterate(
+            self.async_client.aiter_database(database_id, filter, sorts, filter_properties)
+        )
+
+    def get_entire_database(
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        partitions: list[dict[str, Any]] | None = None,
+        max_workers: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get all pages of the database. See `Client.get_entire_database`."""
+        return self.run(
+            self.async_client.get_entire_database(
+                database_id, filter, partitions, max_concurrency=_concurrency(max_workers)
+            )
+        )
+
+    def get_database_table(
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        properties: list[str] | None = None,
+    ) -> DatabaseTable:
+        """Fetch the database into columnar buffers. See `Client.get_database_table`."""
+        return self.run(self.async_client.get_database_table(database_id, filter, properties))
+
+    def get_database_records(
+        self, database_id: str, filter: dict[str, Any] | None = None, keep_raw: bool = False
+    ) -> list[PageRecord]:
+        """Get all pages of the database as compact records. See
+        `Client.get_database_records`."""
+        return self.run(self.async_client.get_database_records(database_id, filter, keep_raw))
+
+    def iter_users(self) -> Generator[dict[str, Any], None, None]:
+        """Iterate over the users of the workspace. See `Client.iter_users`."""
+        return self._iterate(self.async_client.aiter_users())
+
+    def get_all_users(self) -> list[dict[str, Any]]:
+        """Get all users of the workspace. See `Client.get_all_users`."""
+        return self.run(self.async_client.get_all_users())
+
+    def get_user_info(self, email: str) -> dict[str, Any]:
+        """Get the user with the email. See `Client.get_user_info`."""
+        return self.run(self.async_client.get_user_info(email))
+
+    def get_users_by_email(self, emails: list[str]) -> dict[str, dict[str, Any]]:
+        """Get the users with the emails. See `Client.get_users_by_email`."""
+        return self.run(self.async_client.get_users_by_email(emails))
+
+    def get_many_blocks(
+        self,
+        page_ids: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        **kwargs: Any,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Get all blocks of many pages concurrently in the background loop.
+
+        Parameters
+        ----------
+        page_ids : Iterable[str]
+            The IDs of the pages.
+        max_concurrency : int, optional
+            The maximum number of requests in flight, by default DEFAULT_MAX_CONCURRENCY.
+        **kwargs : Any
+            The options of `get_all_blocks`, e.g. `max_depth`.
+
+        Returns
+        -------
+        dict[str, list[dict[str, Any]]]
+            The blocks of each page keyed by the page ID.
+        """
+        return self.run(
+            self.async_client.get_many_blocks(page_ids, max_concurrency=max_concurrency, **kwargs)
+        )
+
+    def create_pages(
+        self,
+        database_id: str,
+        rows: Iterable[tuple[Properties, Blocks | None]],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        resume_from: BulkReport | None = None,
+    ) -> BulkReport:
+        """
+        Create many pages in the database concurrently in the background loop.
+
+        Parameters
+        ----------
+        database_id : str
+            The ID of the database.
+        rows : Iterable[tuple[Properties, Blocks | None]]
+            The pairs of the properties and the contents of the pages.
+        max_concurrency : int, optional
+            The maximum number of pages created at the same time, by default
+            DEFAULT_MAX_CONCURRENCY.
+        resume_from : BulkReport | None, optional
+            The report of the previous run with the same rows, by default None.
+
+        Returns
+        -------
+        BulkReport
+            The results of the pages in the same order as the rows.
+        """
+        return self.run(
+            self.async_client.create_pages(
+                database_id, rows, max_concurrency=max_concurrency, resume_from=resume_from
+            )
+        )
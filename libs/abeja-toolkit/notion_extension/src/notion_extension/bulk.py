@@ -0,0 +1,62 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class ItemResult(BaseModel):
+    index: int = Field(..., description="The index of the item in the input.")
+    success: bool = Field(..., description="Whether the request of the item succeeded.")
+    response: dict[str, Any] | None = Field(
+        default=None, description="The response of the API request if it succeeded."
+    )
+    error: str | None = Field(default=None, description="The error message if it failed.")
+    skipped: bool = Field(
+        default=False, description="Whether no request was needed since nothing changed."
+    )
+    page_id: str | None = Field(
+        default=None,
+        description="The ID of the created page, also when the item failed after the page "
+        "was created.",
+    )
+    completed_requests: int = Field(
+        default=0,
+        description="The number of the planned requests of the page which completed, the page "
+        "creation included. The follow-ups to the nested blocks are sent after all of them.",
+    )
+
+
+class BulkReport(BaseModel):
+    results: list[ItemResult] = Field(
+        ..., description="The results of the items in the same order as the input."
+    )
+
+    @property
+    def succeeded(self) -> list[ItemResult]:
+        """The results of the items which succeeded."""
+        return [result for result in self.results if result.success]
+
+    @property
+    def skipped(self) -> list[ItemResult]:
+        """The results of the items which needed no request."""
+        return [result for result in self.results if result.skipped]
+
+    @property
+    def failed(self) -> list[ItemResult]:
+        """The results of the items which failed."""
+        return [result for result in self.results if not result.success]
+
+    def is_done(self, index: int) -> bool:
+        """
+        Whether the item has already succeeded. This is used to resume the bulk operation.
+
+        Parameters
+        ----------
+        index : int
+            The index of the item in the input.
+
+        Returns
+        -------
+        bool
+            True if the item succeeded.
+        """
+        return self.results[index].success
@@ -0,0 +1,292 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+DEFAULT_CACHE_MAXSIZE = 1024
+
+# The blocks whose children may be in another page, whose edits don't change the version of
+# the page containing the block, so their children are not cached. The children of a
+# duplicate `synced_block` live in the page of the original block.
+_SEPARATE_PAGE_TYPES = frozenset({"child_page", "child_database", "synced_block"})
+
+
+class BlockCache(ABC):
+    """
+    The interface of the cache of block children used by `get_all_blocks` and
+    `get_block_tree`.
+
+    An entry is the direct children of a block, keyed by the ID of the block and validated by
+    the `last_edited_time` of the page containing the block. Notion updates the
+    `last_edited_time` of the page whenever any block in it is edited, but not the
+    `last_edited_time` of the ancestor blocks, so the version of the page is the only one
+    which tells whether the children of a nested block are unchanged. When the page is
+    edited, all its entries become stale, and each level of the tree is fetched and stored
+    again while it is walked down.
+    """
+
+    @abstractmethod
+    def get(self, block_id: str, last_edited_time: str) -> list[dict[str, Any]] | None:
+        """
+        Get the children of the block.
+
+        Parameters
+        ----------
+        block_id : str
+            The ID of the block.
+        last_edited_time : str
+            The current `last_edited_time` of the page containing the block.
+
+        Returns
+        -------
+        list[dict[str, Any]] | None
+            The direct children of the block, or None if the cache has no valid entry.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, block_id: str, last_edited_time: str, children: list[dict[str, Any]]) -> None:
+        """
+        Store the children of the block.
+
+        Parameters
+        ----------
+        block_id : str
+            The ID of the block.
+        last_edited_time : str
+            The `last_edited_time` of the page containing the block when the children were
+            fetched.
+        children : list[dict[str, Any]]
+            The direct children of the block.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+        raise NotImplementedError
+
+
+class MemoryBlockCache(BlockCache):
+    """
+    In-memory block cache with LRU eviction. Entries are kept as JSON strings, so the
+    returned children can be modified by the caller without breaking the cache.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of entries, by default DEFAULT_CACHE_MAXSIZE.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be greater than 0")
+
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, block_id: str, last_edited_time: str) -> list[dict[str, Any]] | None:
+        with self._lock:
+            entry = self._entries.get(block_id)
+            if entry is None or entry[0] != last_edited_time:
+                return None
+            self._entries.move_to_end(block_id)
+
+        children: list[dict[str, Any]] = json.loads(entry[1])
+        return children
+
+    def set(self, block_id: str, last_edited_time: str, children: list[dict[str, Any]]) -> None:
+        entry = (last_edited_time, json.dumps(children))
+        with self._lock:
+            self._entries[block_id] = entry
+            self._entries.move_to_end(block_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskBlockCache(BlockCache):
+    """
+    On-disk block cache which stores an entry per block as a JSON file, so that the cache is
+    reused across processes.
+
+    The directory is unbounded by default, and grows by an entry per block ever read. With
+    `maxsize`, the least recently used tenth of the entries is removed when the number of
+    entries exceeds it. The entries are counted per instance, so processes sharing the directory may
+    exceed `maxsize` until one of them evicts.
+
+    Parameters
+    ----------
+    cache_dir : str | Path
+        The directory to store the entries.
+    maxsize : int | None, optional
+        The maximum number of entries, by default None, which keeps all entries.
+    """
+
+    def __init__(self, cache_dir: str | Path, maxsize: int | None = None):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be greater than 0")
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._size = sum(1 for _ in self.cache_dir.glob("*.json")) if maxsize else 0
+
+    def _path(self, block_id: str) -> Path:
+        return self.cache_dir / f"{block_id}.json"
+
+    def get(self, block_id: str, last_edited_time: str) -> list[dict[str, Any]] | None:
+        path = self._path(block_id)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            if self.maxsize is not None:
+                # The modification time orders the entries by their last use.
+                os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if entry.get("last_edited_time") != last_edited_time:
+            return None
+        children: list[dict[str, Any]] = entry["children"]
+        return children
+
+    def set(self, block_id: str, last_edited_time: str, children: list[dict[str, Any]]) -> None:
+        path = self._path(block_id)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"last_edited_time": last_edited_time, "children": children}, f)
+        added = not path.exists()
+        tmp_path.replace(path)
+
+        if self.maxsize is None or not added:
+            return
+        with self._lock:
+            self._size += 1
+            if self._size > self.maxsize:
+                # A tenth is evicted at once not to list the directory on every store.
+                self._evict(self.maxsize - self.maxsize // 10)
+
+    def _evict(self, maxsize: int) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                continue
+        entries.sort()
+        for _, path in entries[: max(len(entries) - maxsize, 0)]:
+            path.unlink(missing_ok=True)
+        self._size = min(len(entries), maxsize)
+
+    def clear(self) -> None:
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._size = 0
+
+
+def is_settled(last_edited_time: str) -> bool:
+    """
+    Whether the minute of `last_edited_time` is over. The API returns `last_edited_time` with
+    the resolution of a minute, so an edit in the same minute may not change it, and a
+    response is safe to validate by it only after the minute.
+
+    Parameters
+    ----------
+    last_edited_time : str
+        The `last_edited_time` in ISO 8601, e.g. `2024-01-01T00:00:00.000Z`.
+
+    Returns
+    -------
+    bool
+        Whether a later edit certainly changes `last_edited_time`.
+    """
+    edited_at = datetime.fromisoformat(last_edited_time.replace("Z", "+00:00"))
+    minute = edited_at.replace(second=0, microsecond=0)
+    return datetime.now(timezone.utc) >= minute + timedelta(minutes=1)
+
+
+def children_version(block: dict[str, Any], version: str | None) -> str | None:
+    """
+    Get the version validating the cached children of the block.
+
+    Parameters
+    ----------
+    block : dict[str, Any]
+        The block.
+    version : str | None
+        The `last_edited_time` of the page containing the block.
+
+    Returns
+    -------
+    str | None
+        The version, or None if the children are in another page and cannot be cached.
+    """
+    return None if block["type"] in _SEPARATE_PAGE_TYPES else version
+
+
+def get_children(
+    cache: BlockCache | None, block_id: str, version: str | None
+) -> list[dict[str, Any]] | None:
+    """
+    Get the cached children of the block.
+
+    Parameters
+    ----------
+    cache : BlockCache | None
+        The block cache. If None, nothing is found.
+    block_id : str
+        The ID of the block or the page.
+    version : str | None
+        The current `last_edited_time` of the page containing the block. If None, the
+        children cannot be validated and nothing is found.
+
+    Returns
+    -------
+    list[dict[str, Any]] | None
+        The direct children of the block, or None if they must be fetched.
+    """
+    if cache is None or version is None:
+        return None
+    return cache.get(block_id, version)
+
+
+def set_children(
+    cache: BlockCache | None,
+    block_id: str,
+    version: str | None,
+    children: list[dict[str, Any]],
+) -> None:
+    """
+    Store the fetched children of the block, unless the page was edited in the current
+    minute.
+
+    Parameters
+    ----------
+    cache : BlockCache | None
+        The block cache. If None, nothing is stored.
+    block_id : str
+        The ID of the block or the page.
+    version : str | None
+        The `last_edited_time` of the page containing the block, retrieved before the
+        children were fetched. If None, nothing is stored.
+    children : list[dict[str, Any]]
+        The direct children of the block.
+    """
+    if cache is None or version is None or not is_settled(version):
+        return
+    cache.set(
+        block_id,
+        version,
+        [{key: value for key, value in child.items() if key != "children"} for child in children],
+    )
@@ -1,18 +1,255 @@
-from typing import Any
+import asyncio
+import copy
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncGenerator, Generator, Iterable, TextIO, cast
 
+import httpx
 from notion_client import AsyncClient as _AsyncClient
 from notion_client import Client as _Client
+from notion_client.client import BaseClient, ClientOptions
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
 from notion_client.helpers import async_collect_paginated_api, collect_paginated_api
 from notion_client.typing import SyncAsync
 
 from .blocks import Blocks
+from .bulk import BulkReport, ItemResult
+from .cache import BlockCache, children_version, get_children, set_children
+from .codec import JSONCodec, get_default_codec
+from .dataframe import DatabaseTable
 from .db_properties import Properties
+from .diff import PageSyncResult, expand_blocks, sync_children
+from .instrumentation import RequestMetrics
+from .pagination import async_iterate_paginated_api, iterate_paginated_api
+from .planner import AppendRequest, plan_append, resolve_deferred, send_append_requests
+from .ratelimit import (
+    DEFAULT_MAX_RETRIES,
+    RateLimiter,
+    get_shared_rate_limiter,
+    response_retry_delay,
+    transport_retry_delay,
+)
+from .records import BlockRecord, PageRecord, to_block_records
+from .response_cache import CacheKey, ResponseCache, cached_request
+from .sharding import combine_filters, merge_shards
+from .steps import arun_steps, run_steps
+from .tree import AsyncBlockTree, BlockTree
+from .updates import changed_properties
+from .users import DEFAULT_USER_CACHE_TTL, UserDirectory, UserNotFoundError
+from .utils import _markdown_head, _markdown_tail
 
+# The number of blocks whose children are fetched concurrently by default.
+DEFAULT_MAX_CONCURRENCY = 10
 
-class Client(_Client):
+# The POST endpoints which only read data, in addition to all GET endpoints.
+_READ_ONLY_POST_PATHS = re.compile(r"databases/[^/]+/query|search")
+# The PATCH endpoint which adds blocks, so it is not idempotent unlike the other PATCH endpoints.
+_APPEND_PATH = re.compile(r"blocks/[^/]+/children")
+# The errors recorded per page by the bulk updates: the failed requests, and the malformed
+# page objects or properties found by the comparison.
+_UPDATE_ERRORS = (
+    HTTPResponseError,
+    RequestTimeoutError,
+    httpx.HTTPError,
+    AttributeError,
+    KeyError,
+    TypeError,
+    ValueError,
+)
+
+
+def _is_idempotent(method: str, path: str) -> bool:
+    """Whether the request can be sent again after Notion may have processed it."""
+    path = path.strip("/")
+    if method == "POST":
+        return bool(_READ_ONLY_POST_PATHS.fullmatch(path))
+    if method == "PATCH":
+        return not _APPEND_PATH.fullmatch(path)
+    return True
+
+
+def _coalescing_key(
+    path: str,
+    method: str,
+    query: dict[Any, Any] | None,
+    body: dict[Any, Any] | None,
+    auth: str | None,
+) -> str | None:
+    """Get the key identifying the read request, or None if the request may modify data."""
+    if method != "GET" and not (
+        method == "POST" and _READ_ONLY_POST_PATHS.fullmatch(path.strip("/"))
+    ):
+        return None
+    return json.dumps([method, path, query, body, auth], sort_keys=True, default=str)
+
+
+class _BlockFilter:
+    """The options of `get_all_blocks` which limit the blocks to fetch."""
+
+    def __init__(
+        self,
+        max_depth: int | None,
+        include_types: Iterable[str] | None,
+        skip_children_of: Iterable[str] | None,
+    ):
+        if max_depth is not None and max_depth < 1:
+            raise ValueError("max_depth must be greater than 0")
+        self.max_depth = max_depth
+        self.include_types = frozenset(include_types) if include_types is not None else None
+        self.skip_children_of = frozenset(skip_children_of or ())
+
+    def keep(self, blocks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self.include_types is None:
+            return blocks
+        return [block for block in blocks if block["type"] in self.include_types]
+
+    def descend(self, block: dict[str, Any], depth: int) -> bool:
+        """Whether to fetch the children of the block at the depth, where the top level is 1."""
+        return (
+            bool(block.get("has_children"))
+            and (self.max_depth is None or depth < self.max_depth)
+            and block["type"] not in self.skip_children_of
+        )
+
+
+class _InflightRequest:
+    """A request shared by the concurrent callers of `AsyncClient.request`."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class _ExtensionMixin(BaseClient):
+    """The state and the request handling shared by `Client` and `AsyncClient`."""
+
+    block_cache: BlockCache | None
+    metrics: RequestMetrics | None
+    codec: JSONCodec
+    response_cache: ResponseCache | None
+    rate_limiter: RateLimiter
+    max_retries: int
+    user_directory: UserDirectory
+
+    def _setup(
+        self,
+        rate_limiter: RateLimiter | None,
+        max_retries: int,
+        user_cache_ttl: float,
+        user_cache_path: str | Path | None,
+        block_cache: BlockCache | None,
+        metrics: RequestMetrics | None,
+        codec: JSONCodec | None,
+        response_cache: ResponseCache | None,
+    ) -> None:
+        self.block_cache = block_cache
+        self.metrics = metrics
+        self.codec = codec or get_default_codec()
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_retries = max_retries
+        self.user_directory = UserDirectory(
+            ttl=user_cache_ttl, cache_path=user_cache_path, auth=self.options.auth
+        )
+
+    def _build_request(
+        self,
+        method: str,
+        path: str,
+        query: dict[Any, Any] | None = None,
+        body: dict[Any, Any] | None = None,
+        auth: str | None = None,
+    ) -> httpx.Request:
+        headers = httpx.Headers()
+        if auth:
+            headers["Authorization"] = f"Bearer {auth}"
+        content = None
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+            content = self.codec.dumps(body)
+        self.logger.info(f"{method} {self.client.base_url}{path}")
+        # Formatting a large body is as slow as encoding it, so do it only when it is logged.
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"=> {query} -- {body}")
+        return self.client.build_request(
+            method, path, params=query, content=content, headers=headers
+        )
+
+    def _parse_response(self, response: httpx.Response) -> Any:
+        if response.is_error:
+            return super()._parse_response(response)
+        body = self.codec.loads(response.content)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"=> {body}")
+        return body
+
+    def _forget_on_write(self, method: str, path: str) -> None:
+        """Stop trusting the versions validated by the response cache before a request which
+        may modify data, so that the client reads its own writes."""
+        if (
+            self.response_cache is not None
+            and method != "GET"
+            and not _READ_ONLY_POST_PATHS.fullmatch(path.strip("/"))
+        ):
+            self.response_cache.forget()
+
+    def _observe(
+        self,
+        method: str,
+        path: str,
+        attempt: int,
+        started_at: float,
+        request: httpx.Request,
+        response: httpx.Response | None,
+        error: Exception | None = None,
+    ) -> None:
+        if self.metrics is not None:
+            latency = time.perf_counter() - started_at
+            self.metrics.observe(method, path, attempt, latency, request, response, error)
+
+    def _retry_response(
+        self, response: httpx.Response, method: str, path: str, idempotent: bool, attempt: int
+    ) -> float | None:
+        """Get the seconds to wait before retrying the request failed with the response, or
+        None to return the response. The rate limiter is paused on HTTP 429."""
+        delay = response_retry_delay(response, idempotent, attempt, self.max_retries)
+        if delay is None:
+            return None
+        self.logger.warning(
+            f"{method} {path} failed with status {response.status_code}. Retrying..."
+        )
+        if response.status_code == 429:
+            self.rate_limiter.pause(delay)
+            return 0.0
+        return delay
+
+    def _retry_transport_error(
+        self, error: Exception, method: str, path: str, idempotent: bool, attempt: int
+    ) -> float:
+        """Get the seconds to wait before retrying the request failed without a response, or
+        raise the error if the request must not be retried."""
+        delay = transport_retry_delay(error, idempotent, attempt, self.max_retries)
+        if delay is None:
+            if isinstance(error, httpx.ConnectError):
+                raise error
+            raise RequestTimeoutError() from error
+        self.logger.warning(f"{method} {path} failed with {error!r}. Retrying...")
+        return delay
+
+
+class Client(_ExtensionMixin, _Client):
     """
     A wrapper class for the Notion API synchronous client.
     This class provides additional methods to interact with the Notion API.
+    Every request waits for the rate limiter, and requests failed by rate limiting,
+    server errors, timeouts or connection errors are retried with exponential backoff.
+    Requests which create pages or append blocks are retried only on rate limiting and
+    connection errors, since they may have been processed before failing otherwise.
 
     Args:
         auth: Bearer token for authentication. If left undefined, the `auth` parameter
@@ -25,6 +262,22 @@ class Client(_Client):
             written to `stdout`.
         logger: A custom logger.
         notion_version: Notion version to use.
+        rate_limiter: The rate limiter to throttle requests. If left undefined, the rate
+            limiter shared by all clients in the process is used.
+        max_retries: Maximum number of retries for a request failed with HTTP 429, 5xx or
+            a timeout.
+        user_cache_ttl: Number of seconds the users fetched for email lookups are cached.
+        user_cache_path: Path to the JSON file to persist the cached users across processes.
+            The file is named per token with a hash of the token after the stem.
+        block_cache: Cache of the children of blocks used by `get_all_blocks` and
+            `get_block_tree`. If left undefined, blocks are always fetched from the API.
+        metrics: Collector of the per-endpoint request metrics. If left undefined, no
+            metrics are recorded.
+        codec: JSON codec of the request and response bodies. If left undefined, the
+            standard library is used. Pass `OrjsonCodec()` to encode large bodies faster.
+        response_cache: Persistent cache of the responses of `blocks.children.list`,
+            `pages.retrieve` and `databases.retrieve`, validated by the `last_edited_time`
+            of the objects. If left undefined, the responses are not cached.
 
 
     Attributes:
@@ -42,15 +295,111 @@ class Client(_Client):
             See: https://developers.notion.com/reference/create-a-comment
     """
 
+    def __init__(
+        self,
+        options: dict[str, Any] | ClientOptions | None = None,
+        client: httpx.Client | None = None,
+        rate_limiter: RateLimiter | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        user_cache_ttl: float = DEFAULT_USER_CACHE_TTL,
+        user_cache_path: str | Path | None = None,
+        block_cache: BlockCache | None = None,
+        metrics: RequestMetrics | None = None,
+        codec: JSONCodec | None = None,
+        response_cache: ResponseCache | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(options, client, **kwargs)
+        self._setup(
+            rate_limiter,
+            max_retries,
+            user_cache_ttl,
+            user_cache_path,
+            block_cache,
+            metrics,
+            codec,
+            response_cache,
+        )
+        self._user_directory_lock = threading.Lock()
+
+    def request(
+        self,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None = None,
+        body: dict[Any, Any] | None = None,
+        auth: str | None = None,
+    ) -> Any:
+        """
+        Send an HTTP request under the rate limit, retrying it on transient errors.
+        The responses of the cacheable read endpoints are served from the response cache
+        while they are valid.
+        """
+        self._forget_on_write(method, path)
+        if self.response_cache is not None:
+            cache_key = self.response_cache.match(method, path, query, auth or self.options.auth)
+            if cache_key is not None:
+                return self._cached_request(cache_key, path, method, query, auth)
+        return self._send_request(path, method, query, body, auth)
+
+    def _cached_request(
+        self,
+        cache_key: CacheKey,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None,
+        auth: str | None,
+    ) -> Any:
+        cache = cast(ResponseCache, self.response_cache)
+        return run_steps(
+            self, cached_request(cache, self.codec, cache_key, path, method, query, auth)
+        )
+
+    def _send_request(
+        self,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None = None,
+        body: dict[Any, Any] | None = None,
+        auth: str | None = None,
+    ) -> Any:
+        # A request creating objects may have been processed when it timed out or failed with
+        # a server error, so it is retried only when it was rejected or never sent.
+        idempotent = _is_idempotent(method, path)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            request = self._build_request(method, path, query, body, auth)
+            started_at = time.perf_counter()
+            try:
+                response = self.client.send(request)
+            except (httpx.TimeoutException, httpx.ConnectError) as error:
+                self._observe(method, path, attempt, started_at, request, None, error)
+                time.sleep(self._retry_transport_error(error, method, path, idempotent, attempt))
+                attempt += 1
+                continue
+
+            self._observe(method, path, attempt, started_at, request, response)
+            delay = self._retry_response(response, method, path, idempotent, attempt)
+            if delay is None:
+                return self._parse_response(response)
+            time.sleep(delay)
+            attempt += 1
+
     def create_page(
         self,
         database_id: str,
         properties: Properties,
         page_contents: Blocks | None = None,
+        max_workers: int | None = None,
     ) -> SyncAsync[Any]:
         """
         Create a new page in the Notion database.
 
+        The contents are split into the fewest requests which meet the request limits of the
+        Notion API. The blocks which don't fit in the page creation request are appended by
+        follow-up requests.
+
         Parameters
         ----------
         database_id: str
@@ -59,24 +408,112 @@ class Client(_Client):
             The properties of the page.
         page_contents: Blocks | None, optional
             The contents of the page. Defaults to None.
+        max_workers: int | None, optional
+            The maximum number of threads to send the follow-up requests to different blocks
+            in parallel. If None, they are sent sequentially. Defaults to None.
 
         Returns
         ----------
         SyncAsync[Any]
             The response of the API request.
         """
-        if page_contents:
+        requests = plan_append(page_contents.format()) if page_contents else []
+        if not requests:
             return self.pages.create(
                 parent={"database_id": database_id},
                 properties=properties.format(),
-                children=page_contents.format(),
             )
 
-        return self.pages.create(
-            parent={"database_id": database_id},
-            properties=properties.format(),
+        page = cast(
+            dict[str, Any],
+            self.pages.create(
+                parent={"database_id": database_id},
+                properties=properties.format(),
+                children=requests[0].children,
+            ),
         )
 
+        followups = []
+        if requests[0].deferred:
+            # The response of the page creation doesn't include the created blocks.
+            created_blocks = collect_paginated_api(self.blocks.children.list, block_id=page["id"])
+            followups.extend(
+                run_steps(self, resolve_deferred(created_blocks, requests[0].deferred))
+            )
+        _, rest_followups = run_steps(self, send_append_requests(page["id"], requests[1:]))
+        self._send_followups(followups + rest_followups, max_workers)
+
+        return page
+
+    def update_pages(
+        self,
+        updates: Iterable[tuple[dict[str, Any], Properties]],
+        max_workers: int | None = None,
+        resume_from: BulkReport | None = None,
+    ) -> BulkReport:
+        """
+        Update the properties of many pages concurrently by a thread pool.
+
+        A page is compared with the desired properties, and only the changed properties
+        are sent. Pages with no change are skipped without a request, and are recorded as
+        skipped in the report. A failure of a page doesn't stop the others. The report can
+        be passed to `resume_from` with the same updates to retry only the failed pages.
+
+        Parameters
+        ----------
+        updates: Iterable[tuple[dict[str, Any], Properties]]
+            The pairs of the last known page object, e.g. from `iter_database` or
+            `DatabaseMirror.get`, and the desired properties of the page.
+        max_workers: int | None, optional
+            The maximum number of pages updated at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
+        resume_from: BulkReport | None, optional
+            The report of the previous run with the same updates. If given, the pages which
+            succeeded in the previous run are skipped. Defaults to None.
+
+        Returns
+        -------
+        BulkReport
+            The results of the pages in the same order as the updates. The responses of the
+            updated pages are the updated page objects.
+        """
+        updates = list(updates)
+        if resume_from is not None and len(resume_from.results) != len(updates):
+            raise ValueError("resume_from must be the report of the same updates")
+
+        def update(index: int) -> ItemResult:
+            if resume_from is not None and resume_from.is_done(index):
+                return resume_from.results[index]
+
+            page, properties = updates[index]
+            try:
+                changes = changed_properties(page, properties)
+                if not changes:
+                    return ItemResult(index=index, success=True, skipped=True)
+                response = self.pages.update(page_id=page["id"], properties=changes)
+            except _UPDATE_ERRORS as error:
+                self.logger.warning(f"Failed to update the page {page.get('id')}: {error!r}")
+                return ItemResult(
+                    index=index, success=False, error=f"{type(error).__name__}: {error}"
+                )
+            return ItemResult(index=index, success=True, response=cast(dict[str, Any], response))
+
+        with ThreadPoolExecutor(max_workers=max_workers or DEFAULT_MAX_CONCURRENCY) as executor:
+            results = list(executor.map(update, range(len(updates))))
+        return BulkReport(results=results)
+
+    def iter_users(self) -> Generator[dict[str, Any], None, None]:
+        """
+        Iterate over all users in the workspace. Users are fetched page by page while they
+        are consumed, so only a couple of pages are held in memory.
+
+        Yields
+        ------
+        dict[str, Any]
+            The user in the workspace.
+        """
+        yield from iterate_paginated_api(self.users.list)
+
     def get_all_users(self) -> list[dict[str, Any]]:
         """
         Get all users in the workspace. This method fetch all pagenated users.
@@ -86,11 +523,18 @@ class Client(_Client):
         list[dict[str, Any]]
             The list of users in the workspace.
         """
-        return collect_paginated_api(self.users.list)
+        return list(self.iter_users())
+
+    def _get_user_directory(self) -> UserDirectory:
+        with self._user_directory_lock:
+            if self.user_directory.is_expired:
+                self.user_directory.update(self.iter_users())
+        return self.user_directory
 
     def get_user_info(self, email: str) -> dict[str, Any]:
         """
-        Get the information of a user by email.
+        Get the information of a user by email. Users are fetched at most once in the TTL of
+        the user directory and looked up by the email index.
 
         Parameters
         ----------
@@ -101,16 +545,55 @@ class Client(_Client):
         -------
         dict[str, Any]
             The information of the user.
+
+        Raises
+        ------
+        UserNotFoundError
+            If no user has the email. It is both a `KeyError` and an `IndexError`.
+        """
+        user = self._get_user_directory().get(email)
+        if user is None:
+            raise UserNotFoundError(f"User is not found: {email}")
+        return user
+
+    def get_users_by_email(self, emails: list[str]) -> dict[str, dict[str, Any]]:
         """
-        users = self.get_all_users()
-        return [user for user in users if user.get("person", {}).get("email") == email][0]
+        Get the information of the users by email at once.
+
+        Parameters
+        ----------
+        emails: list[str]
+            The emails of the users.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            The mapping from the email to the information of the user. Emails of the users
+            not found in the workspace are not included.
+        """
+        directory = self._get_user_directory()
+        users = {}
+        for email in emails:
+            user = directory.get(email)
+            if user is not None:
+                users[email] = user
+        return users
 
     def get_entire_database(
-        self, database_id: str, filter: dict[str, Any] | None = None
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        partitions: list[dict[str, Any]] | None = None,
+        max_workers: int | None = None,
     ) -> list[dict[str, Any]]:
         """
         Get the entire database content. This method fetch all pagenated database content.
 
+        A single query follows one cursor chain, so the requests are strictly sequential.
+        If `partitions` are given, the query is split into one query per partition, and the
+        partitions are paginated concurrently. Make the partitions with
+        `notion_extension.sharding`, e.g. `partition_by_timestamp` or `partition_by_select`.
+
         Parameters
         ----------
         database_id: str
@@ -118,70 +601,463 @@ class Client(_Client):
         filter: dict[str, Any] | None, optional
             The filter to apply. Defaults to None.
             See: https://developers.notion.com/reference/post-database-query-filter
+        partitions: list[dict[str, Any]] | None, optional
+            The disjoint filters which together cover the whole database. Each is combined
+            with `filter` by `and`. Pages matching several partitions are returned once.
+            Defaults to None.
+        max_workers: int | None, optional
+            The number of partitions queried concurrently. Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Returns
         -------
         list[dict[str, Any]]
-            The entire database content.
+            The entire database content. With partitions, pages are ordered by partition.
+        """
+        if partitions is None:
+            return list(self.iter_database(database_id, filter=filter))
+
+        # The filters are combined before any request, so an invalid filter fails fast.
+        filters = [combine_filters(filter, partition) for partition in partitions]
+
+        def query(shard_filter: dict[str, Any] | None) -> list[dict[str, Any]]:
+            return list(self.iter_database(database_id, filter=shard_filter))
+
+        with ThreadPoolExecutor(max_workers=max_workers or DEFAULT_MAX_CONCURRENCY) as executor:
+            return merge_shards(executor.map(query, filters))
+
+    def get_database_table(
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        properties: list[str] | None = None,
+    ) -> DatabaseTable:
+        """
+        Fetch the database into columnar buffers, which can be converted to a pandas
+        DataFrame or a pyarrow Table by `to_pandas()` or `to_arrow()`. The pages are
+        converted while they are fetched, and only the requested properties are downloaded.
+
+        Parameters
+        ----------
+        database_id: str
+            The ID of the database you want to fetch.
+        filter: dict[str, Any] | None, optional
+            The filter to apply. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-filter
+        properties: list[str] | None, optional
+            The names of the properties to fetch. Defaults to None, all properties.
+
+        Returns
+        -------
+        DatabaseTable
+            The columns of the database.
+        """
+        database = cast(dict[str, Any], self.databases.retrieve(database_id=database_id))
+        table = DatabaseTable(database, properties=properties)
+        table.extend(
+            self.iter_database(
+                database_id,
+                filter=filter,
+                filter_properties=table.property_ids if properties is not None else None,
+            )
+        )
+        return table
+
+    def get_database_records(
+        self, database_id: str, filter: dict[str, Any] | None = None, keep_raw: bool = False
+    ) -> list[PageRecord]:
+        """
+        Get the entire database content as compact records. The pages are converted while
+        they are fetched, so the response dicts of the whole database are never held in
+        memory at once.
+
+        Parameters
+        ----------
+        database_id: str
+            The ID of the database you want to fetch.
+        filter: dict[str, Any] | None, optional
+            The filter to apply. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-filter
+        keep_raw: bool, optional
+            Whether to keep the JSON of each page, which can be restored by
+            `PageRecord.raw`. Defaults to False.
+
+        Returns
+        -------
+        list[PageRecord]
+            The records of the pages.
+        """
+        return [
+            PageRecord.from_dict(page, keep_raw=keep_raw)
+            for page in self.iter_database(database_id, filter=filter)
+        ]
+
+    def iter_database(
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        sorts: list[dict[str, Any]] | None = None,
+        filter_properties: list[str] | None = None,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Iterate over the database content. Rows are fetched page by page while they are
+        consumed, so the memory usage stays flat regardless of the size of the database.
+
+        Parameters
+        ----------
+        database_id: str
+            The ID of the database you want to fetch.
+        filter: dict[str, Any] | None, optional
+            The filter to apply. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-filter
+        sorts: list[dict[str, Any]] | None, optional
+            The sort order of the rows. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-sort
+        filter_properties: list[str] | None, optional
+            The IDs of the properties to include in the pages. The other properties are not
+            downloaded. Defaults to None, all properties.
+
+        Yields
+        ------
+        dict[str, Any]
+            The page in the database.
         """
         kwargs: dict[str, Any] = {"database_id": database_id}
         if filter:
             kwargs["filter"] = filter
-        return collect_paginated_api(self.databases.query, **kwargs)
+        if sorts:
+            kwargs["sorts"] = sorts
+        if filter_properties:
+            kwargs["filter_properties"] = filter_properties
+        yield from iterate_paginated_api(self.databases.query, **kwargs)
 
-    def get_all_blocks(self, page_id: str) -> list[dict[str, Any]]:
+    def get_all_blocks(
+        self,
+        page_id: str,
+        max_workers: int | None = None,
+        max_depth: int | None = None,
+        include_types: Iterable[str] | None = None,
+        skip_children_of: Iterable[str] | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Get all blocks of a page. This method fetch all pagenated blocks.
 
+        The block tree is crawled level by level, and nested blocks are stored in the
+        `children` key of their parent block in the original order. When `max_workers` is
+        given, the children of all blocks in the same level are fetched in parallel by a
+        thread pool sharing this client. If the client has a block cache, the page is
+        retrieved first, and while its `last_edited_time` is unchanged, the children of
+        each level are served from the cache.
+
+        The subtrees excluded by `max_depth`, `include_types` and `skip_children_of` are not
+        fetched at all. The blocks whose children are not fetched keep `has_children` as it
+        is, but have no `children` key.
+
         Parameters
         ----------
         page_id: str
             The ID of the page you want to get the contents.
+        max_workers: int | None, optional
+            The maximum number of threads to fetch the children in parallel. If None, the
+            children are fetched sequentially. Defaults to None.
+        max_depth: int | None, optional
+            The depth of the deepest blocks to fetch, where the top-level blocks are at depth
+            1. Defaults to None, no limit.
+        include_types: Iterable[str] | None, optional
+            The types of the blocks to keep. The blocks of the other types are dropped with
+            their subtrees. Defaults to None, all types.
+        skip_children_of: Iterable[str] | None, optional
+            The types of the blocks whose children are not fetched, e.g. toggle or
+            child_page. Defaults to None.
 
         Returns
         -------
         list[dict[str, Any]]
             The list of blocks of the page.
         """
-        blocks: list[dict[str, Any]] = collect_paginated_api(
-            self.blocks.retrieve, block_id=f"{page_id}/children"
-        )
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        block_filter = _BlockFilter(max_depth, include_types, skip_children_of)
+
+        def fetch_children(item: tuple[dict[str, Any], str | None]) -> list[dict[str, Any]]:
+            return block_filter.keep(self._fetch_children(item[0]["id"], item[1]))
 
-        output = []
-        for block in blocks:
-            if block.get("has_children"):
-                block["children"] = self.get_all_blocks(block["id"])
+        version = self._get_cache_version(page_id)
+        output = block_filter.keep(self._fetch_children(page_id, version))
 
-            output.append(block)
+        executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers else None
+        try:
+            # The blocks of the level with the version of the page which contains them.
+            level = [(block, version) for block in output]
+            depth = 1
+            while level:
+                parents = [
+                    (block, children_version(block, block_version))
+                    for block, block_version in level
+                    if block_filter.descend(block, depth)
+                ]
+                if executor is not None:
+                    children_list = list(executor.map(fetch_children, parents))
+                else:
+                    children_list = [fetch_children(parent) for parent in parents]
 
+                level = []
+                for (parent, parent_version), children in zip(parents, children_list, strict=True):
+                    parent["children"] = children
+                    level.extend((child, parent_version) for child in children)
+                depth += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
         return output
 
-    def append_blocks_to_page(self, page_id: str, blocks: Blocks) -> SyncAsync[Any]:
+    def _get_cache_version(self, page_id: str) -> str | None:
+        """Get the `last_edited_time` of the page to validate the block cache, or None if the
+        client has no block cache or the ID is not a page."""
+        if self.block_cache is None:
+            return None
+        page = cast(dict[str, Any], self.blocks.retrieve(block_id=page_id))
+        return cast(str, page["last_edited_time"]) if page["type"] == "child_page" else None
+
+    def _fetch_children(self, block_id: str, version: str | None) -> list[dict[str, Any]]:
+        """Get the direct children of the block from the block cache or the API."""
+        children = get_children(self.block_cache, block_id, version)
+        if children is None:
+            children = collect_paginated_api(self.blocks.children.list, block_id=block_id)
+            set_children(self.block_cache, block_id, version, children)
+        return children
+
+    def get_block_records(
+        self, page_id: str, keep_raw: bool = False, **kwargs: Any
+    ) -> list[BlockRecord]:
+        """
+        Get all blocks of a page as compact records. See `get_all_blocks` for the options.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page you want to get the contents.
+        keep_raw: bool, optional
+            Whether to keep the JSON of each block, which can be restored by
+            `BlockRecord.raw`. Defaults to False.
+        **kwargs: Any
+            The options of `get_all_blocks`, e.g. `max_depth`.
+
+        Returns
+        -------
+        list[BlockRecord]
+            The records of the top-level blocks, with the nested records in `children`.
+        """
+        return to_block_records(self.get_all_blocks(page_id, **kwargs), keep_raw=keep_raw)
+
+    def get_block_tree(
+        self, page_id: str, prefetch: bool = False, max_workers: int = DEFAULT_MAX_CONCURRENCY
+    ) -> BlockTree:
+        """
+        Get the blocks of a page as a lazy tree. Only the top-level blocks are fetched here,
+        and the children of each block are fetched on the first access to
+        `BlockNode.children`. If the client has a block cache, the children are served from
+        the cache while the `last_edited_time` of the page is unchanged.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page you want to get the contents.
+        prefetch: bool, optional
+            Whether to fetch the children of the accessed level in the background, so that
+            the next level is ready when it is accessed. Defaults to False.
+        max_workers: int, optional
+            The number of threads for prefetching. Defaults to DEFAULT_MAX_CONCURRENCY.
+
+        Returns
+        -------
+        BlockTree
+            The lazy tree. Close it to stop the prefetching threads.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+
+        version = self._get_cache_version(page_id)
+        executor = ThreadPoolExecutor(max_workers=max_workers) if prefetch else None
+        return BlockTree(
+            page_id,
+            self._fetch_children(page_id, version),
+            self._fetch_children,
+            version,
+            executor,
+        )
+
+    def stream_page_markdown(
+        self,
+        page_id: str,
+        fp: TextIO,
+        max_workers: int = DEFAULT_MAX_CONCURRENCY,
+        max_depth: int | None = None,
+        skip_children_of: Iterable[str] | None = None,
+    ) -> int:
+        """
+        Write the blocks of a page to a file as markdown while they are fetched.
+
+        The output is the same as `blocks2markdown(client.get_all_blocks(page_id))`, but each
+        block is written as soon as the blocks before it are written, so the time to the
+        first byte does not grow with the length of the page. While a page of up to 100
+        blocks is written, the next page and the first page of the children of its blocks
+        are fetched by a thread pool sharing this client, and deeper levels are fetched only
+        when their parents are written. The blocks held in memory are therefore bounded by
+        the pages on the path being written and their prefetched children, about 100 * 100
+        blocks per level of nesting, rather than by the size of the page.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page you want to export.
+        fp: TextIO
+            The file object to write the markdown to.
+        max_workers: int, optional
+            The number of threads for prefetching. Defaults to DEFAULT_MAX_CONCURRENCY.
+        max_depth: int | None, optional
+            The depth of the deepest blocks to write, where the top-level blocks are at depth
+            1. Defaults to None, no limit.
+        skip_children_of: Iterable[str] | None, optional
+            The types of the blocks whose children are not written, e.g. child_page.
+            Defaults to None.
+
+        Returns
+        -------
+        int
+            The number of blocks written.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        block_filter = _BlockFilter(max_depth, None, skip_children_of)
+
+        def fetch(block_id: str, start_cursor: str | None = None) -> dict[str, Any]:
+            kwargs = {"block_id": block_id}
+            if start_cursor is not None:
+                kwargs["start_cursor"] = start_cursor
+            return cast(dict[str, Any], self.blocks.children.list(**kwargs))
+
+        def write(block_id: str, page: "Future[dict[str, Any]]", depth: int) -> int:
+            written = 0
+            response = page.result()
+            while True:
+                # Only the level below the blocks being written is prefetched, and each
+                # subtree is released once it is written.
+                next_page = None
+                if response.get("has_more"):
+                    next_page = executor.submit(fetch, block_id, response["next_cursor"])
+                children = {
+                    block["id"]: executor.submit(fetch, block["id"])
+                    for block in response["results"]
+                    if block_filter.descend(block, depth)
+                }
+                for block in response["results"]:
+                    fp.write(_markdown_head(block, depth - 1))
+                    if block["id"] in children:
+                        written += write(block["id"], children.pop(block["id"]), depth + 1)
+                    fp.write(_markdown_tail(block, depth - 1))
+                    written += 1
+                if next_page is None:
+                    return written
+                response = next_page.result()
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            return write(page_id, executor.submit(fetch, page_id), 1)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _send_followups(
+        self, followups: list[tuple[str, list[dict[str, Any]]]], max_workers: int | None = None
+    ) -> None:
+        """Append the deferred children level by level. Follow-ups to different blocks are
+        independent, so they are sent in parallel when `max_workers` is given."""
+
+        def send(followup: tuple[str, list[dict[str, Any]]]) -> list[tuple[str, Any]]:
+            block_id, children = followup
+            _, nested_followups = run_steps(
+                self, send_append_requests(block_id, plan_append(children))
+            )
+            return nested_followups
+
+        executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers else None
+        try:
+            while followups:
+                if executor is not None:
+                    nested_list = list(executor.map(send, followups))
+                else:
+                    nested_list = [send(followup) for followup in followups]
+                followups = [followup for nested in nested_list for followup in nested]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def sync_page_content(self, page_id: str, blocks: Blocks) -> PageSyncResult:
+        """
+        Make the content of a page the same as the blocks with the fewest changes.
+
+        The existing block tree is fetched and compared with the blocks level by level.
+        Blocks are matched by their type and content hash, so only the changed blocks are
+        updated, deleted or inserted, and re-publishing a mostly unchanged page takes a few
+        requests. Child pages and child databases in the page are left as they are, at their
+        positions among the other blocks.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page to update.
+        blocks: Blocks
+            The desired content of the page.
+
+        Returns
+        -------
+        PageSyncResult
+            The numbers of the kept, updated, inserted and deleted blocks.
+        """
+        result = PageSyncResult()
+        old = self.get_all_blocks(page_id)
+        run_steps(self, sync_children(page_id, old, expand_blocks(blocks.format()), result))
+        return result
+
+    def append_blocks_to_page(
+        self, page_id: str, blocks: Blocks, max_workers: int | None = None
+    ) -> SyncAsync[Any]:
         """
         Append blocks to a page.
 
+        The blocks are split into the fewest requests which meet the request limits of the
+        Notion API. The nested blocks beyond the nesting limit are appended to the created
+        blocks by follow-up requests.
+
         Parameters
         ----------
         page_id: str
             The ID of the page you want to append the blocks.
         blocks: Blocks
             The blocks to append.
+        max_workers: int | None, optional
+            The maximum number of threads to send the follow-up requests to different blocks
+            in parallel. If None, they are sent sequentially. Defaults to None.
 
         Returns
         -------
         SyncAsync[Any]
-            The response of the API request.
+            The list object whose `results` are the top-level blocks appended to the page.
         """
-        return self.blocks.children.append(
-            block_id=page_id,
-            children=blocks.format(),
+        appended, followups = run_steps(
+            self, send_append_requests(page_id, plan_append(blocks.format()))
         )
+        self._send_followups(followups, max_workers)
+        return {"object": "list", "results": appended, "next_cursor": None, "has_more": False}
 
 
-class AsyncClient(_AsyncClient):
+class AsyncClient(_ExtensionMixin, _AsyncClient):
     """
     A wrapper class for the Notion API asynchronous client.
     This class provides additional methods to interact with the Notion API.
+    Every request waits for the rate limiter, and requests failed by rate limiting,
+    server errors, timeouts or connection errors are retried with exponential backoff.
+    Requests which create pages or append blocks are retried only on rate limiting and
+    connection errors, since they may have been processed before failing otherwise.
 
     Args:
         auth: Bearer token for authentication. If left undefined, the `auth` parameter
@@ -194,6 +1070,26 @@ class AsyncClient(_AsyncClient):
             written to `stdout`.
         logger: A custom logger.
         notion_version: Notion version to use.
+        rate_limiter: The rate limiter to throttle requests. If left undefined, the rate
+            limiter shared by all clients in the process is used.
+        max_retries: Maximum number of retries for a request failed with HTTP 429, 5xx or
+            a timeout.
+        user_cache_ttl: Number of seconds the users fetched for email lookups are cached.
+        user_cache_path: Path to the JSON file to persist the cached users across processes.
+            The file is named per token with a hash of the token after the stem.
+        block_cache: Cache of the children of blocks used by `get_all_blocks` and
+            `get_block_tree`. If left undefined, blocks are always fetched from the API.
+        metrics: Collector of the per-endpoint request metrics. If left undefined, no
+            metrics are recorded.
+        codec: JSON codec of the request and response bodies. If left undefined, the
+            standard library is used. Pass `OrjsonCodec()` to encode large bodies faster.
+        response_cache: Persistent cache of the responses of `blocks.children.list`,
+            `pages.retrieve` and `databases.retrieve`, validated by the `last_edited_time`
+            of the objects. If left undefined, the responses are not cached.
+        coalesce_reads: Whether concurrent identical read requests (GET, database queries and
+            searches) share a single HTTP request. Each caller receives its own copy of the
+            response. A caller may receive the response of a request which was sent before
+            its call, so this is opt-in. Defaults to False.
 
 
     Attributes:
@@ -211,15 +1107,156 @@ class AsyncClient(_AsyncClient):
             See: https://developers.notion.com/reference/create-a-comment
     """
 
+    def __init__(
+        self,
+        options: dict[str, Any] | ClientOptions | None = None,
+        client: httpx.AsyncClient | None = None,
+        rate_limiter: RateLimiter | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        user_cache_ttl: float = DEFAULT_USER_CACHE_TTL,
+        user_cache_path: str | Path | None = None,
+        block_cache: BlockCache | None = None,
+        metrics: RequestMetrics | None = None,
+        codec: JSONCodec | None = None,
+        response_cache: ResponseCache | None = None,
+        coalesce_reads: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(options, client, **kwargs)
+        self._setup(
+            rate_limiter,
+            max_retries,
+            user_cache_ttl,
+            user_cache_path,
+            block_cache,
+            metrics,
+            codec,
+            response_cache,
+        )
+        self._user_directory_lock = asyncio.Lock()
+        self.coalesce_reads = coalesce_reads
+        self._inflight: dict[str, _InflightRequest] = {}
+
+    async def request(
+        self,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None = None,
+        body: dict[Any, Any] | None = None,
+        auth: str | None = None,
+    ) -> Any:
+        """
+        Send an HTTP request under the rate limit, retrying it on transient errors.
+        Concurrent identical read requests share a single in-flight request.
+        """
+        self._forget_on_write(method, path)
+        key = _coalescing_key(path, method, query, body, auth) if self.coalesce_reads else None
+        if key is None:
+            return await self._read(path, method, query, body, auth)
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = _InflightRequest(
+                asyncio.ensure_future(self._read(path, method, query, body, auth))
+            )
+            self._inflight[key] = inflight
+            inflight.task.add_done_callback(lambda task: self._finish_inflight(key, task))
+
+        inflight.waiters += 1
+        try:
+            # A cancelled caller must not cancel the request shared with the other callers.
+            result = await asyncio.shield(inflight.task)
+        finally:
+            inflight.waiters -= 1
+
+        # The callers resume one by one, so every caller but the last one takes a copy before
+        # the last one gets the original response and possibly modifies it.
+        return result if inflight.waiters == 0 else copy.deepcopy(result)
+
+    def _finish_inflight(self, key: str, task: "asyncio.Task[Any]") -> None:
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.task is task:
+            del self._inflight[key]
+        # Retrieve the exception in case all callers are cancelled to avoid the warning.
+        if not task.cancelled():
+            task.exception()
+
+    async def _read(
+        self,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None = None,
+        body: dict[Any, Any] | None = None,
+        auth: str | None = None,
+    ) -> Any:
+        """Send a request, serving the response from the response cache if it is valid."""
+        if self.response_cache is not None:
+            cache_key = self.response_cache.match(method, path, query, auth or self.options.auth)
+            if cache_key is not None:
+                return await self._cached_request(cache_key, path, method, query, auth)
+        return await self._send_request(path, method, query, body, auth)
+
+    async def _cached_request(
+        self,
+        cache_key: CacheKey,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None,
+        auth: str | None,
+    ) -> Any:
+        cache = cast(ResponseCache, self.response_cache)
+        # The SQLite calls of the cache block, so they are run in a thread.
+        return await arun_steps(
+            self, cached_request(cache, self.codec, cache_key, path, method, query, auth)
+        )
+
+    async def _send_request(
+        self,
+        path: str,
+        method: str,
+        query: dict[Any, Any] | None = None,
+        body: dict[Any, Any] | None = None,
+        auth: str | None = None,
+    ) -> Any:
+        # A request creating objects may have been processed when it timed out or failed with
+        # a server error, so it is retried only when it was rejected or never sent.
+        idempotent = _is_idempotent(method, path)
+        attempt = 0
+        while True:
+            await self.rate_limiter.async_acquire()
+            request = self._build_request(method, path, query, body, auth)
+            started_at = time.perf_counter()
+            try:
+                response = await self.client.send(request)
+            except (httpx.TimeoutException, httpx.ConnectError) as error:
+                self._observe(method, path, attempt, started_at, request, None, error)
+                await asyncio.sleep(
+                    self._retry_transport_error(error, method, path, idempotent, attempt)
+                )
+                attempt += 1
+                continue
+
+            self._observe(method, path, attempt, started_at, request, response)
+            delay = self._retry_response(response, method, path, idempotent, attempt)
+            if delay is None:
+                return self._parse_response(response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
     async def create_page(
         self,
         database_id: str,
         properties: Properties,
         page_contents: Blocks | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ) -> SyncAsync[Any]:
         """
         Create a new page in the Notion database.
 
+        The contents are split into the fewest requests which meet the request limits of the
+        Notion API. The blocks which don't fit in the page creation request are appended by
+        follow-up requests, and the follow-ups to different blocks are sent concurrently.
+
         Parameters
         ----------
         database_id: str
@@ -228,23 +1265,281 @@ class AsyncClient(_AsyncClient):
             The properties of the page.
         page_contents: Blocks | None, optional
             The contents of the page. Defaults to None.
+        max_concurrency: int, optional
+            The maximum number of follow-up requests sent at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Returns
         ----------
         dict[str, dict[str, str]]
             The created page.
         """
-        if page_contents:
-            return await self.pages.create(
+        requests = plan_append(page_contents.format()) if page_contents else []
+        return await self._create_page(
+            database_id, properties, requests, asyncio.Semaphore(max_concurrency)
+        )
+
+    async def _create_page(
+        self,
+        database_id: str,
+        properties: Properties,
+        requests: list[AppendRequest],
+        semaphore: asyncio.Semaphore,
+        progress: ItemResult | None = None,
+    ) -> dict[str, Any]:
+        """Create the page and send the planned requests. The created page and the number of
+        the completed requests are recorded in `progress`, so that a failure after the page
+        creation can be resumed on the same page."""
+        if not requests:
+            return cast(
+                dict[str, Any],
+                await self.pages.create(
+                    parent={"database_id": database_id},
+                    properties=properties.format(),
+                ),
+            )
+
+        page = cast(
+            dict[str, Any],
+            await self.pages.create(
                 parent={"database_id": database_id},
                 properties=properties.format(),
-                children=page_contents.format(),
+                children=requests[0].children,
+            ),
+        )
+        if progress is not None:
+            progress.page_id = page["id"]
+            progress.completed_requests = 1
+
+        followups = []
+        if requests[0].deferred:
+            # The response of the page creation doesn't include the created blocks.
+            created_blocks = await async_collect_paginated_api(
+                self.blocks.children.list, block_id=page["id"]
+            )
+            followups.extend(
+                await arun_steps(self, resolve_deferred(created_blocks, requests[0].deferred))
             )
+        await self._continue_page(page["id"], requests, 1, followups, semaphore, progress)
+        return page
+
+    async def _resume_page(
+        self,
+        page_contents: Blocks,
+        requests: list[AppendRequest],
+        semaphore: asyncio.Semaphore,
+        progress: ItemResult,
+    ) -> dict[str, Any]:
+        """Send the rest of the planned requests to a page whose creation failed after the
+        page was created."""
+        assert progress.page_id is not None
+        page = cast(dict[str, Any], await self.pages.retrieve(page_id=progress.page_id))
+        completed = progress.completed_requests
+        if completed >= len(requests):
+            # Only the follow-ups were left, which are sent to many blocks level by level.
+            # Instead of tracking them, the missing blocks are inserted by the synchronization.
+            await self.sync_page_content(page["id"], page_contents)
+            return page
+
+        created_blocks = await async_collect_paginated_api(
+            self.blocks.children.list, block_id=page["id"]
+        )
+        sizes = [len(request.children) for request in requests]
+        # An append which failed by a timeout is not retried, but may have been applied.
+        if len(created_blocks) >= sum(sizes[: completed + 1]):
+            completed += 1
+            progress.completed_requests = completed
+
+        followups = []
+        offset = 0
+        for request in requests[:completed]:
+            sent_blocks = created_blocks[offset : offset + len(request.children)]
+            followups.extend(
+                await arun_steps(self, resolve_deferred(sent_blocks, request.deferred))
+            )
+            offset += len(request.children)
+        await self._continue_page(page["id"], requests, completed, followups, semaphore, progress)
+        return page
+
+    async def _continue_page(
+        self,
+        page_id: str,
+        requests: list[AppendRequest],
+        completed: int,
+        followups: list[tuple[str, list[dict[str, Any]]]],
+        semaphore: asyncio.Semaphore,
+        progress: ItemResult | None,
+    ) -> None:
+        """Append the requests after the completed ones to the page, and then send the
+        follow-ups of all the requests."""
+        for number, request in enumerate(requests[completed:], start=completed + 1):
+            _, request_followups = await arun_steps(self, send_append_requests(page_id, [request]))
+            followups.extend(request_followups)
+            if progress is not None:
+                progress.completed_requests = number
+        await self._send_followups(followups, semaphore)
+
+    async def create_pages(
+        self,
+        database_id: str,
+        rows: Iterable[tuple[Properties, Blocks | None]],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        resume_from: BulkReport | None = None,
+    ) -> BulkReport:
+        """
+        Create many pages in the Notion database concurrently.
+
+        Pages are created through the rate limiter with at most `max_concurrency` pages in
+        flight. A failure of a page doesn't stop the others, and is recorded in the report.
+        The report can be passed to `resume_from` with the same rows to retry only the failed
+        pages.
+
+        Parameters
+        ----------
+        database_id: str
+            The ID of the database where the pages will be created.
+        rows: Iterable[tuple[Properties, Blocks | None]]
+            The pairs of the properties and the contents of the pages.
+        max_concurrency: int, optional
+            The maximum number of pages created at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
+        resume_from: BulkReport | None, optional
+            The report of the previous run with the same rows. If given, the pages which
+            succeeded in the previous run are skipped, and the pages which failed after they
+            were created are completed instead of created again. Defaults to None.
+
+        Returns
+        -------
+        BulkReport
+            The results of the pages in the same order as the rows.
+        """
+        rows = list(rows)
+        if resume_from is not None and len(resume_from.results) != len(rows):
+            raise ValueError("resume_from must be the report of the same rows")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def create(
+            index: int, properties: Properties, page_contents: Blocks | None
+        ) -> ItemResult:
+            progress = ItemResult(index=index, success=False)
+            if resume_from is not None:
+                if resume_from.is_done(index):
+                    return resume_from.results[index]
+                previous = resume_from.results[index]
+                progress.page_id = previous.page_id
+                progress.completed_requests = previous.completed_requests
+
+            requests = plan_append(page_contents.format()) if page_contents else []
+            async with semaphore:
+                try:
+                    if progress.page_id is not None and page_contents is not None:
+                        page = await self._resume_page(
+                            page_contents,
+                            requests,
+                            asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY),
+                            progress,
+                        )
+                    else:
+                        page = await self._create_page(
+                            database_id,
+                            properties,
+                            requests,
+                            asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY),
+                            progress,
+                        )
+                except (HTTPResponseError, RequestTimeoutError, httpx.HTTPError) as error:
+                    self.logger.warning(f"Failed to create the page of row {index}: {error}")
+                    progress.error = str(error)
+                    return progress
+            progress.success = True
+            progress.response = page
+            return progress
+
+        results = await asyncio.gather(
+            *(
+                create(index, properties, contents)
+                for index, (properties, contents) in enumerate(rows)
+            )
+        )
+        return BulkReport(results=list(results))
+
+    async def update_pages(
+        self,
+        updates: Iterable[tuple[dict[str, Any], Properties]],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        resume_from: BulkReport | None = None,
+    ) -> BulkReport:
+        """
+        Update the properties of many pages concurrently.
+
+        A page is compared with the desired properties, and only the changed properties
+        are sent. Pages with no change are skipped without a request, and are recorded as
+        skipped in the report. A failure of a page doesn't stop the others. The report can
+        be passed to `resume_from` with the same updates to retry only the failed pages.
+
+        Parameters
+        ----------
+        updates: Iterable[tuple[dict[str, Any], Properties]]
+            The pairs of the last known page object, e.g. from `iter_database` or
+            `DatabaseMirror.get`, and the desired properties of the page.
+        max_concurrency: int, optional
+            The maximum number of pages updated at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
+        resume_from: BulkReport | None, optional
+            The report of the previous run with the same updates. If given, the pages which
+            succeeded in the previous run are skipped. Defaults to None.
+
+        Returns
+        -------
+        BulkReport
+            The results of the pages in the same order as the updates. The responses of the
+            updated pages are the updated page objects.
+        """
+        updates = list(updates)
+        if resume_from is not None and len(resume_from.results) != len(updates):
+            raise ValueError("resume_from must be the report of the same updates")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def update(index: int, page: dict[str, Any], properties: Properties) -> ItemResult:
+            if resume_from is not None and resume_from.is_done(index):
+                return resume_from.results[index]
 
-        return await self.pages.create(
-            parent={"database_id": database_id},
-            properties=properties.format(),
+            try:
+                changes = changed_properties(page, properties)
+                if not changes:
+                    return ItemResult(index=index, success=True, skipped=True)
+                async with semaphore:
+                    response = await self.pages.update(page_id=page["id"], properties=changes)
+            except _UPDATE_ERRORS as error:
+                self.logger.warning(f"Failed to update the page {page.get('id')}: {error!r}")
+                return ItemResult(
+                    index=index, success=False, error=f"{type(error).__name__}: {error}"
+                )
+            return ItemResult(index=index, success=True, response=cast(dict[str, Any], response))
+
+        results = await asyncio.gather(
+            *(update(index, page, properties) for index, (page, properties) in enumerate(updates))
         )
+        return BulkReport(results=list(results))
+
+    async def aiter_users(self) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Iterate asynchronously over all users in the workspace. Users are fetched page by page
+        while they are consumed, so only a couple of pages are held in memory.
+
+        Yields
+        ------
+        dict[str, Any]
+            The user in the workspace.
+        """
+        async for user in async_iterate_paginated_api(self.users.list):
+            yield user
 
     async def get_all_users(self) -> list[dict[str, Any]]:
         """
@@ -255,11 +1550,18 @@ class AsyncClient(_AsyncClient):
         list[dict[str, Any]]
             The list of users in the workspace.
         """
-        return await async_collect_paginated_api(self.users.list)
+        return [user async for user in self.aiter_users()]
+
+    async def _get_user_directory(self) -> UserDirectory:
+        async with self._user_directory_lock:
+            if self.user_directory.is_expired:
+                self.user_directory.update(await self.get_all_users())
+        return self.user_directory
 
     async def get_user_info(self, email: str) -> dict[str, Any]:
         """
-        Get the information of a user by email.
+        Get the information of a user by email. Users are fetched at most once in the TTL of
+        the user directory and looked up by the email index.
 
         Parameters
         ----------
@@ -270,16 +1572,55 @@ class AsyncClient(_AsyncClient):
         -------
         dict[str, Any]
             The information of the user.
+
+        Raises
+        ------
+        UserNotFoundError
+            If no user has the email. It is both a `KeyError` and an `IndexError`.
+        """
+        user = (await self._get_user_directory()).get(email)
+        if user is None:
+            raise UserNotFoundError(f"User is not found: {email}")
+        return user
+
+    async def get_users_by_email(self, emails: list[str]) -> dict[str, dict[str, Any]]:
         """
-        users = await self.get_all_users()
-        return [user for user in users if user.get("person", {}).get("email") == email][0]
+        Get the information of the users by email at once.
+
+        Parameters
+        ----------
+        emails: list[str]
+            The emails of the users.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            The mapping from the email to the information of the user. Emails of the users
+            not found in the workspace are not included.
+        """
+        directory = await self._get_user_directory()
+        users = {}
+        for email in emails:
+            user = directory.get(email)
+            if user is not None:
+                users[email] = user
+        return users
 
     async def get_entire_database(
-        self, database_id: str, filter: dict[str, Any] | None = None
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        partitions: list[dict[str, Any]] | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ) -> list[dict[str, Any]]:
         """
         Get the entire database content. This method fetch all pagenated database content.
 
+        A single query follows one cursor chain, so the requests are strictly sequential.
+        If `partitions` are given, the query is split into one query per partition, and the
+        partitions are paginated concurrently. Make the partitions with
+        `notion_extension.sharding`, e.g. `partition_by_timestamp` or `partition_by_select`.
+
         Parameters
         ----------
         database_id: str
@@ -287,61 +1628,502 @@ class AsyncClient(_AsyncClient):
         filter: dict[str, Any] | None, optional
             The filter to apply. Defaults to None.
             See: https://developers.notion.com/reference/post-database-query-filter
+        partitions: list[dict[str, Any]] | None, optional
+            The disjoint filters which together cover the whole database. Each is combined
+            with `filter` by `and`. Pages matching several partitions are returned once.
+            Defaults to None.
+        max_concurrency: int, optional
+            The number of partitions queried concurrently. Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Returns
         -------
         list[dict[str, Any]]
-            The entire database content.
+            The entire database content. With partitions, pages are ordered by partition.
+        """
+        if partitions is None:
+            return [page async for page in self.aiter_database(database_id, filter=filter)]
+
+        # The filters are combined before any request, so an invalid filter fails fast.
+        filters = [combine_filters(filter, partition) for partition in partitions]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def query(shard_filter: dict[str, Any] | None) -> list[dict[str, Any]]:
+            async with semaphore:
+                return [
+                    page async for page in self.aiter_database(database_id, filter=shard_filter)
+                ]
+
+        return merge_shards(await asyncio.gather(*[query(f) for f in filters]))
+
+    async def get_database_table(
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        properties: list[str] | None = None,
+    ) -> DatabaseTable:
+        """
+        Fetch the database into columnar buffers, which can be converted to a pandas
+        DataFrame or a pyarrow Table by `to_pandas()` or `to_arrow()`. The pages are
+        converted while they are fetched, and only the requested properties are downloaded.
+
+        Parameters
+        ----------
+        database_id: str
+            The ID of the database you want to fetch.
+        filter: dict[str, Any] | None, optional
+            The filter to apply. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-filter
+        properties: list[str] | None, optional
+            The names of the properties to fetch. Defaults to None, all properties.
+
+        Returns
+        -------
+        DatabaseTable
+            The columns of the database.
+        """
+        database = await self.databases.retrieve(database_id=database_id)
+        table = DatabaseTable(database, properties=properties)
+        async for page in self.aiter_database(
+            database_id,
+            filter=filter,
+            filter_properties=table.property_ids if properties is not None else None,
+        ):
+            table.append(page)
+        return table
+
+    async def get_database_records(
+        self, database_id: str, filter: dict[str, Any] | None = None, keep_raw: bool = False
+    ) -> list[PageRecord]:
+        """
+        Get the entire database content as compact records. The pages are converted while
+        they are fetched, so the response dicts of the whole database are never held in
+        memory at once.
+
+        Parameters
+        ----------
+        database_id: str
+            The ID of the database you want to fetch.
+        filter: dict[str, Any] | None, optional
+            The filter to apply. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-filter
+        keep_raw: bool, optional
+            Whether to keep the JSON of each page, which can be restored by
+            `PageRecord.raw`. Defaults to False.
+
+        Returns
+        -------
+        list[PageRecord]
+            The records of the pages.
+        """
+        return [
+            PageRecord.from_dict(page, keep_raw=keep_raw)
+            async for page in self.aiter_database(database_id, filter=filter)
+        ]
+
+    async def aiter_database(
+        self,
+        database_id: str,
+        filter: dict[str, Any] | None = None,
+        sorts: list[dict[str, Any]] | None = None,
+        filter_properties: list[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Iterate asynchronously over the database content. Rows are fetched page by page while
+        they are consumed, so the memory usage stays flat regardless of the size of the
+        database.
+
+        Parameters
+        ----------
+        database_id: str
+            The ID of the database you want to fetch.
+        filter: dict[str, Any] | None, optional
+            The filter to apply. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-filter
+        sorts: list[dict[str, Any]] | None, optional
+            The sort order of the rows. Defaults to None.
+            See: https://developers.notion.com/reference/post-database-query-sort
+        filter_properties: list[str] | None, optional
+            The IDs of the properties to include in the pages. The other properties are not
+            downloaded. Defaults to None, all properties.
+
+        Yields
+        ------
+        dict[str, Any]
+            The page in the database.
         """
         kwargs: dict[str, Any] = {"database_id": database_id}
         if filter:
             kwargs["filter"] = filter
-        return await async_collect_paginated_api(self.databases.query, **kwargs)
+        if sorts:
+            kwargs["sorts"] = sorts
+        if filter_properties:
+            kwargs["filter_properties"] = filter_properties
+        async for page in async_iterate_paginated_api(self.databases.query, **kwargs):
+            yield page
 
-    async def get_all_blocks(self, page_id: str) -> list[dict[str, Any]]:
+    async def get_all_blocks(
+        self,
+        page_id: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_depth: int | None = None,
+        include_types: Iterable[str] | None = None,
+        skip_children_of: Iterable[str] | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Get all blocks of a page. This method fetch all pagenated blocks.
 
+        The block tree is crawled level by level. The children of all blocks which have
+        children in the same level are fetched concurrently, and nested blocks are stored in
+        the `children` key of their parent block in the original order. If the client has a
+        block cache, the page is retrieved first, and while its `last_edited_time` is
+        unchanged, the children of each level are served from the cache.
+
+        The subtrees excluded by `max_depth`, `include_types` and `skip_children_of` are not
+        fetched at all. The blocks whose children are not fetched keep `has_children` as it
+        is, but have no `children` key.
+
         Parameters
         ----------
         page_id: str
             The ID of the page you want to get the contents.
+        max_concurrency: int, optional
+            The maximum number of blocks whose children are fetched at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
+        max_depth: int | None, optional
+            The depth of the deepest blocks to fetch, where the top-level blocks are at depth
+            1. Defaults to None, no limit.
+        include_types: Iterable[str] | None, optional
+            The types of the blocks to keep. The blocks of the other types are dropped with
+            their subtrees. Defaults to None, all types.
+        skip_children_of: Iterable[str] | None, optional
+            The types of the blocks whose children are not fetched, e.g. toggle or
+            child_page. Defaults to None.
 
         Returns
         -------
         list[dict[str, Any]]
             The list of blocks of the page.
         """
-        blocks: list[dict[str, Any]] = await async_collect_paginated_api(
-            self.blocks.retrieve, block_id=f"{page_id}/children"
-        )
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        block_filter = _BlockFilter(max_depth, include_types, skip_children_of)
 
-        output = []
-        for block in blocks:
-            if block.get("has_children"):
-                block["children"] = await self.get_all_blocks(block["id"])
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-            output.append(block)
+        async def fetch_children(block_id: str, version: str | None) -> list[dict[str, Any]]:
+            async with semaphore:
+                return block_filter.keep(await self._fetch_children(block_id, version))
 
+        version = await self._get_cache_version(page_id)
+        output = await fetch_children(page_id, version)
+
+        # The blocks of the level with the version of the page which contains them.
+        level = [(block, version) for block in output]
+        depth = 1
+        while level:
+            parents = [
+                (block, children_version(block, block_version))
+                for block, block_version in level
+                if block_filter.descend(block, depth)
+            ]
+            children_list = await asyncio.gather(
+                *(fetch_children(block["id"], block_version) for block, block_version in parents)
+            )
+
+            level = []
+            for (parent, parent_version), children in zip(parents, children_list, strict=True):
+                parent["children"] = children
+                level.extend((child, parent_version) for child in children)
+            depth += 1
         return output
 
-    async def append_blocks_to_page(self, page_id: str, blocks: Blocks) -> SyncAsync[Any]:
+    async def _get_cache_version(self, page_id: str) -> str | None:
+        """Get the `last_edited_time` of the page to validate the block cache, or None if the
+        client has no block cache or the ID is not a page."""
+        if self.block_cache is None:
+            return None
+        page = await self.blocks.retrieve(block_id=page_id)
+        return cast(str, page["last_edited_time"]) if page["type"] == "child_page" else None
+
+    async def _fetch_children(self, block_id: str, version: str | None) -> list[dict[str, Any]]:
+        """Get the direct children of the block from the block cache or the API."""
+        children = get_children(self.block_cache, block_id, version)
+        if children is None:
+            children = await async_collect_paginated_api(
+                self.blocks.children.list, block_id=block_id
+            )
+            set_children(self.block_cache, block_id, version, children)
+        return children
+
+    async def get_block_records(
+        self, page_id: str, keep_raw: bool = False, **kwargs: Any
+    ) -> list[BlockRecord]:
+        """
+        Get all blocks of a page as compact records. See `get_all_blocks` for the options.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page you want to get the contents.
+        keep_raw: bool, optional
+            Whether to keep the JSON of each block, which can be restored by
+            `BlockRecord.raw`. Defaults to False.
+        **kwargs: Any
+            The options of `get_all_blocks`, e.g. `max_depth`.
+
+        Returns
+        -------
+        list[BlockRecord]
+            The records of the top-level blocks, with the nested records in `children`.
+        """
+        blocks = await self.get_all_blocks(page_id, **kwargs)
+        return to_block_records(blocks, keep_raw=keep_raw)
+
+    async def get_many_blocks(
+        self,
+        page_ids: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        **kwargs: Any,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Get all blocks of many pages concurrently.
+
+        Parameters
+        ----------
+        page_ids: Iterable[str]
+            The IDs of the pages you want to get the contents.
+        max_concurrency: int, optional
+            The maximum number of blocks whose children are fetched at the same time across
+            all pages. Defaults to DEFAULT_MAX_CONCURRENCY.
+        **kwargs: Any
+            The options of `get_all_blocks`, e.g. `max_depth`.
+
+        Returns
+        -------
+        dict[str, list[dict[str, Any]]]
+            The blocks of each page keyed by the page ID, in the order of `page_ids`.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        page_ids = list(dict.fromkeys(page_ids))
+
+        # Each crawl gets an equal share of the concurrency, and at most `max_concurrency`
+        # pages are crawled at once, so the requests in flight stay within the limit.
+        per_page = max(1, max_concurrency // max(1, len(page_ids)))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(page_id: str) -> list[dict[str, Any]]:
+            async with semaphore:
+                return await self.get_all_blocks(page_id, max_concurrency=per_page, **kwargs)
+
+        results = await asyncio.gather(*(fetch(page_id) for page_id in page_ids))
+        return dict(zip(page_ids, results, strict=True))
+
+    async def get_block_tree(
+        self, page_id: str, prefetch: bool = False, max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> AsyncBlockTree:
+        """
+        Get the blocks of a page as a lazy tree. Only the top-level blocks are fetched here,
+        and the children of each block are fetched on the first call of
+        `AsyncBlockNode.get_children`. If the client has a block cache, the children are
+        served from the cache while the `last_edited_time` of the page is unchanged.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page you want to get the contents.
+        prefetch: bool, optional
+            Whether to fetch the children of the accessed level in background tasks, so that
+            the next level is ready when it is accessed. Defaults to False.
+        max_concurrency: int, optional
+            The maximum number of prefetches at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
+
+        Returns
+        -------
+        AsyncBlockTree
+            The lazy tree. Close it with `aclose` to cancel the outstanding prefetches.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+
+        version = await self._get_cache_version(page_id)
+        semaphore = asyncio.Semaphore(max_concurrency) if prefetch else None
+        return AsyncBlockTree(
+            page_id,
+            await self._fetch_children(page_id, version),
+            self._fetch_children,
+            version,
+            semaphore,
+        )
+
+    async def stream_page_markdown(
+        self,
+        page_id: str,
+        fp: TextIO,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_depth: int | None = None,
+        skip_children_of: Iterable[str] | None = None,
+    ) -> int:
+        """
+        Write the blocks of a page to a file as markdown while they are fetched.
+
+        The output is the same as `blocks2markdown(await client.get_all_blocks(page_id))`,
+        but each block is written as soon as the blocks before it are written, so the time
+        to the first byte does not grow with the length of the page. While a page of up to
+        100 blocks is written, the next page and the first page of the children of its
+        blocks are fetched concurrently, and deeper levels are fetched only when their
+        parents are written. The blocks held in memory are therefore bounded by the pages on
+        the path being written and their prefetched children, about 100 * 100 blocks per
+        level of nesting, rather than by the size of the page.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page you want to export.
+        fp: TextIO
+            The file object to write the markdown to.
+        max_concurrency: int, optional
+            The maximum number of prefetches at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
+        max_depth: int | None, optional
+            The depth of the deepest blocks to write, where the top-level blocks are at depth
+            1. Defaults to None, no limit.
+        skip_children_of: Iterable[str] | None, optional
+            The types of the blocks whose children are not written, e.g. child_page.
+            Defaults to None.
+
+        Returns
+        -------
+        int
+            The number of blocks written.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        block_filter = _BlockFilter(max_depth, None, skip_children_of)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        pending: set[asyncio.Task[Any]] = set()
+
+        def prefetch(block_id: str, start_cursor: str | None = None) -> asyncio.Task[Any]:
+            task = asyncio.ensure_future(fetch(block_id, start_cursor))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            return task
+
+        async def fetch(block_id: str, start_cursor: str | None = None) -> dict[str, Any]:
+            kwargs = {"block_id": block_id}
+            if start_cursor is not None:
+                kwargs["start_cursor"] = start_cursor
+            async with semaphore:
+                response: dict[str, Any] = await self.blocks.children.list(**kwargs)
+            return response
+
+        async def write(block_id: str, page: asyncio.Task[Any], depth: int) -> int:
+            written = 0
+            response = await page
+            while True:
+                # Only the level below the blocks being written is prefetched, and each
+                # subtree is released once it is written.
+                next_page = None
+                if response.get("has_more"):
+                    next_page = prefetch(block_id, response["next_cursor"])
+                children = {
+                    block["id"]: prefetch(block["id"])
+                    for block in response["results"]
+                    if block_filter.descend(block, depth)
+                }
+                for block in response["results"]:
+                    fp.write(_markdown_head(block, depth - 1))
+                    if block["id"] in children:
+                        written += await write(block["id"], children.pop(block["id"]), depth + 1)
+                    fp.write(_markdown_tail(block, depth - 1))
+                    written += 1
+                if next_page is None:
+                    return written
+                response = await next_page
+
+        try:
+            return await write(page_id, prefetch(page_id), 1)
+        finally:
+            tasks = list(pending)
+            for task in tasks:
+                task.cancel()
+            # Wait for the cancelled tasks, so that none is left running after the return.
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _send_followups(
+        self,
+        followups: list[tuple[str, list[dict[str, Any]]]],
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Append the deferred children. Follow-ups to different blocks are independent, so
+        they are sent concurrently, by default DEFAULT_MAX_CONCURRENCY at a time."""
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY)
+
+        async def send(block_id: str, children: list[dict[str, Any]]) -> None:
+            async with semaphore:
+                _, nested_followups = await arun_steps(
+                    self, send_append_requests(block_id, plan_append(children))
+                )
+            await self._send_followups(nested_followups, semaphore)
+
+        await asyncio.gather(*(send(block_id, children) for block_id, children in followups))
+
+    async def sync_page_content(self, page_id: str, blocks: Blocks) -> PageSyncResult:
+        """
+        Make the content of a page the same as the blocks with the fewest changes.
+
+        The existing block tree is fetched and compared with the blocks level by level.
+        Blocks are matched by their type and content hash, so only the changed blocks are
+        updated, deleted or inserted, and re-publishing a mostly unchanged page takes a few
+        requests. Child pages and child databases in the page are left as they are, at their
+        positions among the other blocks.
+
+        Parameters
+        ----------
+        page_id: str
+            The ID of the page to update.
+        blocks: Blocks
+            The desired content of the page.
+
+        Returns
+        -------
+        PageSyncResult
+            The numbers of the kept, updated, inserted and deleted blocks.
+        """
+        result = PageSyncResult()
+        old = await self.get_all_blocks(page_id)
+        await arun_steps(self, sync_children(page_id, old, expand_blocks(blocks.format()), result))
+        return result
+
+    async def append_blocks_to_page(
+        self, page_id: str, blocks: Blocks, max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> SyncAsync[Any]:
         """
         Append blocks to a page.
 
+        The blocks are split into the fewest requests which meet the request limits of the
+        Notion API. The nested blocks beyond the nesting limit are appended to the created
+        blocks by follow-up requests, which are sent concurrently.
+
         Parameters
         ----------
         page_id: str
             The ID of the page you want to append the blocks.
         blocks: Blocks
             The blocks to append.
+        max_concurrency: int, optional
+            The maximum number of follow-up requests sent at the same time.
+            Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Returns
         -------
         SyncAsync[Any]
-            The response of the API request.
+            The list object whose `results` are the top-level blocks appended to the page.
         """
-        return await self.blocks.children.append(
-            block_id=page_id,
-            children=blocks.format(),
+        appended, followups = await arun_steps(
+            self, send_append_requests(page_id, plan_append(blocks.format()))
         )
+        await self._send_followups(followups, asyncio.Semaphore(max_concurrency))
+        return {"object": "list", "results": appended, "next_cursor": None, "has_more": False}
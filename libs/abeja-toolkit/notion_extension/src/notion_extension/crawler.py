@@ -0,0 +1,355 @@
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Generator, Literal, cast
+
+import httpx
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+from pydantic import BaseModel, Field
+
+from .client import DEFAULT_MAX_CONCURRENCY, Client
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    id TEXT PRIMARY KEY,
+    object TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL,
+    fetched_edited_time TEXT,
+    data TEXT NOT NULL,
+    blocks TEXT
+);
+CREATE INDEX IF NOT EXISTS objects_pending ON objects (object, fetched_edited_time);
+CREATE TABLE IF NOT EXISTS crawl_state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    in_progress INTEGER NOT NULL,
+    discovered INTEGER NOT NULL,
+    search_cursor TEXT,
+    since TEXT,
+    next_since TEXT,
+    finished_at TEXT
+);
+"""
+
+# The contents of the child pages and databases are crawled as objects of their own, so they
+# are not fetched again as the blocks of their parent page.
+_CRAWLED_SEPARATELY = ("child_page", "child_database")
+
+
+class CrawlResult(BaseModel):
+    discovered: int = Field(
+        default=0, description="The number of pages and databases found by the search."
+    )
+    fetched: int = Field(default=0, description="The number of pages whose blocks were fetched.")
+    failed: list[str] = Field(
+        default_factory=list, description="The IDs of the pages whose blocks failed to be fetched."
+    )
+    since: str | None = Field(
+        default=None, description="The last_edited_time from which the next crawl searches."
+    )
+
+
+class WorkspaceCrawler:
+    """
+    A crawler which keeps a local SQLite copy of the pages and databases shared with the
+    integration, including the blocks of the pages.
+
+    A crawl has two phases. The discovery phase pages through the search API sorted by
+    `last_edited_time` in descending order and records every page and database. The fetch
+    phase then fetches the blocks of the pages whose `last_edited_time` differs from the one
+    at their last fetch, concurrently by a thread pool sharing the client and its rate
+    limiter.
+
+    Progress is committed to the SQLite file after every search response and every fetched
+    page, so an interrupted crawl resumes where it stopped: the discovery continues from the
+    saved search cursor, and only the pages not fetched yet are fetched. Once a crawl is
+    completed, the next crawl stops the discovery at the objects edited before the previous
+    crawl started, so a recrawl costs requests in proportion to the number of changes.
+
+    Objects which are deleted or no longer shared are not detected by the search, and are
+    kept in the store. Start a fresh store to drop them.
+
+    Parameters
+    ----------
+    client : Client
+        The Notion client.
+    path : str | Path
+        The path to the SQLite file.
+    max_workers : int, optional
+        The number of pages fetched concurrently, by default DEFAULT_MAX_CONCURRENCY.
+
+    Examples
+    --------
+    >>> with WorkspaceCrawler(client, "workspace.db") as crawler:
+    ...     result = crawler.crawl()
+    ...     for page in crawler.iter_objects("page"):
+    ...         blocks = crawler.get_blocks(page["id"])
+    """
+
+    def __init__(
+        self, client: Client, path: str | Path, max_workers: int = DEFAULT_MAX_CONCURRENCY
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        self.client = client
+        self.max_workers = max_workers
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO crawl_state (id, in_progress, discovered) VALUES (0, 0, 0)"
+            )
+
+    def __enter__(self) -> "WorkspaceCrawler":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection to the SQLite file."""
+        self.connection.close()
+
+    @property
+    def since(self) -> str | None:
+        """The `last_edited_time` from which the next crawl searches, None for everything."""
+        row = self.connection.execute("SELECT since FROM crawl_state WHERE id = 0").fetchone()
+        return cast(str | None, row[0])
+
+    @property
+    def in_progress(self) -> bool:
+        """Whether a crawl was interrupted and will be resumed by the next `crawl`."""
+        row = self.connection.execute("SELECT in_progress FROM crawl_state WHERE id = 0").fetchone()
+        return bool(row[0])
+
+    def crawl(self, full: bool = False) -> CrawlResult:
+        """
+        Crawl the workspace, or resume the interrupted crawl.
+
+        Parameters
+        ----------
+        full : bool, optional
+            Whether to search all objects instead of the ones edited since the last crawl,
+            by default False. The blocks of the pages are fetched again only if the pages
+            were edited. This has no effect when resuming an interrupted crawl.
+
+        Returns
+        -------
+        CrawlResult
+            The summary of the crawl.
+        """
+        if not self.in_progress:
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE crawl_state SET in_progress = 1, discovered = 0, search_cursor = NULL, "
+                    "next_since = NULL" + (", since = NULL" if full else "")
+                )
+
+        result = CrawlResult()
+        self._discover(result)
+        self._fetch(result)
+
+        with self.connection:
+            # The next crawl searches from the newest object at the start of this crawl, which
+            # covers the objects edited during this crawl.
+            self.connection.execute(
+                "UPDATE crawl_state SET in_progress = 0, discovered = 0, search_cursor = NULL, "
+                "since = COALESCE(next_since, since), next_since = NULL, finished_at = ?",
+                (datetime.now(timezone.utc).isoformat(),),
+            )
+        result.since = self.since
+        return result
+
+    def _discover(self, result: CrawlResult) -> None:
+        discovered, since, cursor, next_since = self.connection.execute(
+            "SELECT discovered, since, search_cursor, next_since FROM crawl_state WHERE id = 0"
+        ).fetchone()
+        if discovered:
+            # The discovery of the interrupted crawl has been completed.
+            return
+
+        while True:
+            kwargs: dict[str, Any] = {
+                "sort": {"direction": "descending", "timestamp": "last_edited_time"},
+                "page_size": 100,
+            }
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response = cast(dict[str, Any], self.client.search(**kwargs))
+
+            objects = []
+            reached_since = False
+            for obj in response["results"]:
+                # The last_edited_time is rounded to the minute, so the objects edited in the
+                # same minute as `since` are searched again and simply overwritten.
+                if since is not None and obj["last_edited_time"] < since:
+                    reached_since = True
+                    break
+                objects.append(obj)
+            if next_since is None:
+                next_since = objects[0]["last_edited_time"] if objects else since
+
+            cursor = None if reached_since or not response["has_more"] else response["next_cursor"]
+            with self.connection:
+                self._upsert(objects)
+                self.connection.execute(
+                    "UPDATE crawl_state SET search_cursor = ?, next_since = ?, discovered = ?",
+                    (cursor, next_since, cursor is None),
+                )
+            result.discovered += len(objects)
+            if cursor is None:
+                return
+
+    def _upsert(self, objects: list[dict[str, Any]]) -> None:
+        self.connection.executemany(
+            "INSERT INTO objects (id, object, last_edited_time, fetched_edited_time, data) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+            "last_edited_time = excluded.last_edited_time, data = excluded.data, "
+            "fetched_edited_time = COALESCE(excluded.fetched_edited_time, fetched_edited_time)",
+            [
+                (
+                    obj["id"],
+                    obj["object"],
+                    obj["last_edited_time"],
+                    # Databases have nothing to fetch beyond the search result.
+                    obj["last_edited_time"] if obj["object"] == "database" else None,
+                    json.dumps(obj),
+                )
+                for obj in objects
+            ],
+        )
+
+    def _fetch(self, result: CrawlResult) -> None:
+        pending = self.connection.execute(
+            "SELECT id, last_edited_time FROM objects WHERE object = 'page' AND "
+            "(fetched_edited_time IS NULL OR fetched_edited_time != last_edited_time)"
+        ).fetchall()
+
+        # The thread pool only calls the API, and the results are written by this thread
+        # since the SQLite connection cannot be shared between threads.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.client.get_all_blocks, page_id, skip_children_of=_CRAWLED_SEPARATELY
+                ): (page_id, last_edited_time)
+                for page_id, last_edited_time in pending
+            }
+            for future in as_completed(futures):
+                page_id, last_edited_time = futures[future]
+                try:
+                    blocks = future.result()
+                except (HTTPResponseError, RequestTimeoutError, httpx.HTTPError):
+                    # The page stays pending and is fetched again by the next crawl.
+                    result.failed.append(page_id)
+                    continue
+
+                with self.connection:
+                    self.connection.execute(
+                        "UPDATE objects SET blocks = ?, fetched_edited_time = ? WHERE id = ?",
+                        (json.dumps(blocks), last_edited_time, page_id),
+                    )
+                result.fetched += 1
+
+    def get(self, object_id: str) -> dict[str, Any] | None:
+        """
+        Get a page or a database from the store.
+
+        Parameters
+        ----------
+        object_id : str
+            The ID of the page or the database.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            The object returned by the search, or None if it is not crawled.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM objects WHERE id = ?", (object_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        obj: dict[str, Any] = json.loads(row[0])
+        return obj
+
+    def get_blocks(self, page_id: str) -> list[dict[str, Any]] | None:
+        """
+        Get the blocks of a page from the store.
+
+        Parameters
+        ----------
+        page_id : str
+            The ID of the page.
+
+        Returns
+        -------
+        list[dict[str, Any]] | None
+            The blocks in the same form as `get_all_blocks`, or None if they are not fetched.
+        """
+        row = self.connection.execute(
+            "SELECT blocks FROM objects WHERE id = ?", (page_id,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        blocks: list[dict[str, Any]] = json.loads(row[0])
+        return blocks
+
+    def iter_objects(
+        self, object_type: Literal["page", "database"] | None = None
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Iterate over the crawled objects from the most recently edited.
+
+        Parameters
+        ----------
+        object_type : Literal["page", "database"] | None, optional
+            The type of the objects, by default None, both.
+
+        Yields
+        ------
+        dict[str, Any]
+            The page or the database object.
+        """
+        query = "SELECT data FROM objects"
+        params: tuple[str, ...] = ()
+        if object_type is not None:
+            query += " WHERE object = ?"
+            params = (object_type,)
+        for row in self.connection.execute(query + " ORDER BY last_edited_time DESC", params):
+            yield json.loads(row[0])
+
+    def export_jsonl(self, path: str | Path) -> int:
+        """
+        Export the crawled objects to a JSON Lines file. The pages have their blocks in the
+        `children` key.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path to the output file.
+
+        Returns
+        -------
+        int
+            The number of exported objects.
+        """
+        count = 0
+        rows = self.connection.execute(
+            "SELECT data, blocks FROM objects ORDER BY last_edited_time DESC"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            for data, blocks in rows:
+                obj = json.loads(data)
+                if blocks is not None:
+                    obj["children"] = json.loads(blocks)
+                f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+                count += 1
+        return count
@@ -0,0 +1,225 @@
+import json
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .db_properties import extract_property_value
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# The columns of every table, which are not properties, and the fields of the page they hold.
+# They are prefixed with an underscore so that they don't clash with properties named like
+# the fields, e.g. an `id` property.
+PAGE_COLUMNS = {
+    "_id": "id",
+    "_created_time": "created_time",
+    "_last_edited_time": "last_edited_time",
+}
+
+# The kinds of the columns by property type. The other types are stored as strings.
+_BOOLEAN_TYPES = {"checkbox"}
+_NUMBER_TYPES = {"number"}
+_LIST_TYPES = {"multi_select", "people"}
+_TIMESTAMP_TYPES = {"date", "created_time", "last_edited_time"}
+_STRING_TYPES = {
+    "title",
+    "rich_text",
+    "select",
+    "status",
+    "url",
+    "email",
+    "phone_number",
+}
+
+
+def _parse_timestamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # Dates without time are regarded as UTC midnight.
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _column_kind(prop_type: str) -> str:
+    if prop_type in _BOOLEAN_TYPES:
+        return "boolean"
+    if prop_type in _NUMBER_TYPES:
+        return "number"
+    if prop_type in _LIST_TYPES:
+        return "list"
+    if prop_type in _TIMESTAMP_TYPES:
+        return "timestamp"
+    return "string"
+
+
+class DatabaseTable:
+    """
+    Columnar buffers of the pages of a database, converted to a pyarrow Table or a pandas
+    DataFrame at the end.
+
+    The pages are appended one by one, typically while iterating over the query results, and
+    only the plain values are kept in a list per column, so the nested property JSON of the
+    whole database is never held in memory. The column types are chosen from the database
+    schema rather than guessed from the values, so empty columns keep their types. The ID and
+    the timestamps of the pages are in the `_id`, `_created_time` and `_last_edited_time`
+    columns, followed by a column per property named after the property.
+
+    Parameters
+    ----------
+    database : dict[str, Any]
+        The database object returned by `client.databases.retrieve`.
+    properties : list[str] | None, optional
+        The names of the properties to keep. If None, all properties are kept,
+        by default None.
+
+    Examples
+    --------
+    >>> database = client.databases.retrieve(database_id=database_id)
+    >>> table = DatabaseTable(database, properties=["Name", "Status"])
+    >>> for page in client.iter_database(
+    ...     database_id, filter_properties=table.property_ids
+    ... ):
+    ...     table.append(page)
+    >>> df = table.to_pandas()
+
+    Raises
+    ------
+    KeyError
+        If `properties` has a name which is not in the database.
+    ValueError
+        If a kept property is named like a page column, e.g. `_id`.
+    """
+
+    def __init__(self, database: dict[str, Any], properties: list[str] | None = None):
+        schema = database["properties"]
+        if properties is not None:
+            unknown = set(properties) - set(schema)
+            if unknown:
+                raise KeyError(f"Unknown properties: {sorted(unknown)}")
+
+        self.property_types: dict[str, str] = {
+            name: prop["type"]
+            for name, prop in schema.items()
+            if properties is None or name in properties
+        }
+        clashing = set(self.property_types) & set(PAGE_COLUMNS)
+        if clashing:
+            raise ValueError(
+                f"The properties {sorted(clashing)} clash with the page columns. Pass "
+                "`properties` without them."
+            )
+        self.property_ids: list[str] = [schema[name]["id"] for name in self.property_types]
+        self.columns: dict[str, list[Any]] = {
+            name: [] for name in [*PAGE_COLUMNS, *self.property_types]
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns["_id"])
+
+    @property
+    def column_kinds(self) -> dict[str, str]:
+        """The kind of each column: string, number, boolean, timestamp or list."""
+        return {
+            "_id": "string",
+            "_created_time": "timestamp",
+            "_last_edited_time": "timestamp",
+            **{name: _column_kind(prop_type) for name, prop_type in self.property_types.items()},
+        }
+
+    def append(self, page: dict[str, Any]) -> None:
+        """
+        Append the values of a page to the columns.
+
+        Parameters
+        ----------
+        page : dict[str, Any]
+            The page object in the query results.
+        """
+        for column, field in PAGE_COLUMNS.items():
+            value = page.get(field)
+            self.columns[column].append(value if field == "id" else _parse_timestamp(value))
+
+        properties = page["properties"]
+        for name, prop_type in self.property_types.items():
+            value = properties.get(name)
+            extracted = extract_property_value(value) if value is not None else None
+            if prop_type in _TIMESTAMP_TYPES:
+                extracted = _parse_timestamp(extracted)
+            elif prop_type in _LIST_TYPES and extracted is None:
+                extracted = []
+            elif prop_type not in _STRING_TYPES | _BOOLEAN_TYPES | _NUMBER_TYPES | _LIST_TYPES:
+                # Formulas, rollups, relations and so on are kept as their JSON.
+                extracted = None if extracted is None else json.dumps(extracted)
+            self.columns[name].append(extracted)
+
+    def extend(self, pages: Iterable[dict[str, Any]]) -> None:
+        """
+        Append the values of the pages to the columns.
+
+        Parameters
+        ----------
+        pages : Iterable[dict[str, Any]]
+            The page objects in the query results.
+        """
+        for page in pages:
+            self.append(page)
+
+    def to_arrow(self) -> "pa.Table":
+        """
+        Convert the columns to a pyarrow Table. This requires pyarrow.
+
+        Returns
+        -------
+        pa.Table
+            The table with a column per page field and property.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError(
+                "pyarrow is required. Install it with `pip install notion-extension[dataframe]`."
+            ) from error
+
+        arrow_types = {
+            "string": pa.string(),
+            "number": pa.float64(),
+            "boolean": pa.bool_(),
+            "timestamp": pa.timestamp("ms", tz="UTC"),
+            "list": pa.list_(pa.string()),
+        }
+        kinds = self.column_kinds
+        return pa.table(
+            {
+                name: pa.array(values, type=arrow_types[kinds[name]])
+                for name, values in self.columns.items()
+            }
+        )
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """
+        Convert the columns to a pandas DataFrame with nullable dtypes. This requires pandas.
+
+        Returns
+        -------
+        pd.DataFrame
+            The DataFrame with a column per page field and property.
+        """
+        try:
+            import pandas as pd
+        except ImportError as error:
+            raise ImportError(
+                "pandas is required. Install it with `pip install notion-extension[dataframe]`."
+            ) from error
+
+        data = {}
+        for name, kind in self.column_kinds.items():
+            values = self.columns[name]
+            if kind == "timestamp":
+                data[name] = pd.to_datetime(pd.Series(values, dtype=object), utc=True)
+            elif kind == "list":
+                data[name] = pd.Series(values, dtype=object)
+            else:
+                dtype = {"string": "string", "number": "Float64", "boolean": "boolean"}[kind]
+                data[name] = pd.Series(values, dtype=dtype)
+        return pd.DataFrame(data)
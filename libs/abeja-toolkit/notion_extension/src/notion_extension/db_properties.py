@@ -1,3 +1,4 @@
+import sys
 from typing import Any, Literal
 
 from pydantic import BaseModel, Field
@@ -10,6 +11,11 @@ from .objects import (
 )
 
 
+def _option_name(option: dict[str, Any] | None) -> str | None:
+    # Option names repeat in every row, so share a single string object per name.
+    return sys.intern(option["name"]) if option else None
+
+
 class _Property(BaseModel):
     name: str
     type: str
@@ -18,6 +24,23 @@ class _Property(BaseModel):
     def format(self) -> dict[str, Any]:
         raise NotImplementedError
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> Any:
+        """
+        Extract the plain value from the property value of a page in the API response.
+
+        Parameters
+        ----------
+        value : dict[str, Any]
+            The property value, e.g. `page["properties"]["Name"]`.
+
+        Returns
+        -------
+        Any
+            The plain value of the property.
+        """
+        raise NotImplementedError
+
 
 class TitlePropertyContent(BaseModel):
     text: Text = Field(..., description="The text content of the title.")
@@ -34,6 +57,10 @@ class TitleProperty(_Property):
         contents = [self.content.model_dump(exclude_none=True)]
         return {self.name: {self.type: contents}}
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> str:
+        return "".join(item.get("plain_text", "") for item in value["title"])
+
 
 class StatusPropertyContent(BaseModel):
     name: str | None = Field(None, description="The name of the status.")
@@ -47,10 +74,15 @@ class StatusProperty(_Property):
     content: StatusPropertyContent = Field(..., description="The content of the property.")
 
     def format(self) -> dict[str, Any]:
-        contents = self.content.model_dump(exclude_none=True)
+        # An empty option is sent as null, which clears the property.
+        contents = self.content.model_dump(exclude_none=True) or None
 
         return {self.name: {self.type: contents}}
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> str | None:
+        return _option_name(value["status"])
+
 
 class DescriptionPropertyContent(BaseModel):
     rich_text: list[RichText] = Field(..., description="The rich text content of the description.")
@@ -67,6 +99,10 @@ class DescriptionProperty(_Property):
         rich_text = self.content.model_dump(exclude_none=True)["rich_text"]
         return {self.name: {self.type: rich_text}}
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> str:
+        return "".join(item.get("plain_text", "") for item in value["rich_text"])
+
 
 class CheckboxPropertyContent(BaseModel):
     checkbox: bool = Field(
@@ -87,6 +123,10 @@ class CheckboxProperty(_Property):
 
         return {self.name: contents}
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> bool:
+        return bool(value["checkbox"])
+
 
 class SelectPropertyContent(BaseModel):
     name: str | None = Field(None, description="The name of the select option.")
@@ -100,10 +140,15 @@ class SelectProperty(_Property):
     content: SelectPropertyContent = Field(..., description="The content of the property.")
 
     def format(self) -> dict[str, Any]:
-        contents = self.content.model_dump(exclude_none=True)
+        # An empty option is sent as null, which clears the property.
+        contents = self.content.model_dump(exclude_none=True) or None
 
         return {self.name: {self.type: contents}}
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> str | None:
+        return _option_name(value["select"])
+
 
 class MultiSelectProperty(_Property):
     type: Literal["multi_select"] = Field(
@@ -119,6 +164,10 @@ class MultiSelectProperty(_Property):
             }
         }
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> list[str]:
+        return [sys.intern(option["name"]) for option in value["multi_select"]]
+
 
 class URLPropertyContent(BaseModel):
     url: str | None = Field(None, description="The URL of the link.")
@@ -132,9 +181,13 @@ class URLProperty(_Property):
     content: URLPropertyContent = Field(..., description="The content of the property.")
 
     def format(self) -> dict[str, Any]:
-        contents = self.content.model_dump(exclude_none=True)
+        # A missing URL is sent as null, which clears the property.
+        return {self.name: {self.type: self.content.url}}
 
-        return {self.name: contents}
+    @staticmethod
+    def extract(value: dict[str, Any]) -> str | None:
+        url: str | None = value["url"]
+        return url
 
 
 class DatePropertyContent(BaseModel):
@@ -154,6 +207,11 @@ class DateProperty(_Property):
 
         return {self.name: {self.type: contents}}
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> str | None:
+        date = value["date"]
+        return date["start"] if date else None
+
 
 class PeoplePropertyContent(BaseModel):
     people: dict[str, Any] = Field(..., description="The notion user object.")
@@ -171,6 +229,10 @@ class PeopleProperty(_Property):
 
         return {self.name: {self.type: contents}}
 
+    @staticmethod
+    def extract(value: dict[str, Any]) -> list[str]:
+        return [person["id"] for person in value["people"]]
+
 
 PropertyType = (
     TitleProperty
@@ -184,6 +246,43 @@ PropertyType = (
     | PeopleProperty
 )
 
+# The property classes keyed by the property type of the API.
+PROPERTY_CLASSES: dict[str, type[_Property]] = {
+    cls.model_fields["type"].default: cls
+    for cls in (
+        TitleProperty,
+        StatusProperty,
+        DescriptionProperty,
+        CheckboxProperty,
+        SelectProperty,
+        MultiSelectProperty,
+        URLProperty,
+        DateProperty,
+        PeopleProperty,
+    )
+}
+
+
+def extract_property_value(value: dict[str, Any]) -> Any:
+    """
+    Extract the plain value from the property value of a page in the API response. The types
+    without a property class, such as number or email, are returned as they are.
+
+    Parameters
+    ----------
+    value : dict[str, Any]
+        The property value, e.g. `page["properties"]["Name"]`.
+
+    Returns
+    -------
+    Any
+        The plain value of the property.
+    """
+    cls = PROPERTY_CLASSES.get(value["type"])
+    if cls is None:
+        return value.get(value["type"])
+    return cls.extract(value)
+
 
 class Properties(BaseModel):
     properties: list[PropertyType] = Field(..., description="The list of properties.")
@@ -332,7 +431,7 @@ class Property:
         return CheckboxProperty(name=name, content=CheckboxPropertyContent(checkbox=checkbox))
 
     @staticmethod
-    def select(name: str, value: str) -> SelectProperty:
+    def select(name: str, value: str | None) -> SelectProperty:
         """
         Set a select property.
 
@@ -340,8 +439,8 @@ class Property:
         ----------
         name : str
             The name of the property.
-        value : str
-            The name of the select option.
+        value : str | None
+            The name of the select option. None clears the property.
 
         Returns
         -------
@@ -372,7 +471,7 @@ class Property:
         )
 
     @staticmethod
-    def url(name: str, url: str) -> URLProperty:
+    def url(name: str, url: str | None) -> URLProperty:
         """
         Set a URL property.
 
@@ -380,8 +479,8 @@ class Property:
         ----------
         name : str
             The name of the property.
-        url : str
-            The URL of the link.
+        url : str | None
+            The URL of the link. None clears the property.
 
         Returns
         -------
@@ -0,0 +1,332 @@
+import hashlib
+import json
+from difflib import SequenceMatcher
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from .planner import _get_children, plan_append, send_append_requests, split_block
+from .steps import Call, Steps
+
+# Blocks which are never modified by the synchronization. Deleting a child page block
+# archives the page itself, and blocks can't be moved, so they are left where they are.
+PRESERVED_BLOCK_TYPES = frozenset({"child_page", "child_database"})
+# Blocks which cannot be updated in place, since their structure is fixed on creation.
+_NON_UPDATABLE_BLOCK_TYPES = frozenset(
+    {"table", "column_list", "column", "synced_block", "link_to_page", "unsupported"}
+)
+_DEFAULT_ANNOTATIONS = {
+    "bold": False,
+    "italic": False,
+    "strikethrough": False,
+    "underline": False,
+    "code": False,
+    "color": "default",
+}
+# The keys of the block objects in the responses which are not the content of the blocks.
+_RESPONSE_ONLY_KEYS = frozenset({"children", "color"})
+
+
+class BlockOperation(BaseModel):
+    kind: Literal["keep", "update", "insert", "delete", "preserve"] = Field(
+        ...,
+        description="The operation applied to the block. A preserved block is a child page "
+        "or a child database, which is left where it is.",
+    )
+    old: dict[str, Any] | None = Field(
+        default=None, description="The existing block. None for insert."
+    )
+    new: dict[str, Any] | None = Field(
+        default=None, description="The desired formatted block. None for delete and preserve."
+    )
+
+
+class PageSyncResult(BaseModel):
+    kept: int = Field(default=0, description="The number of blocks left unchanged.")
+    updated: int = Field(default=0, description="The number of blocks updated in place.")
+    inserted: int = Field(default=0, description="The number of top-level blocks inserted.")
+    deleted: int = Field(default=0, description="The number of blocks deleted.")
+
+
+def _canonical_rich_text(items: list[dict[str, Any]]) -> list[Any]:
+    """Reduce the rich text to what is visible, merging the adjacent texts of the same style."""
+    output: list[Any] = []
+    for item in items:
+        annotations = {
+            key: value
+            for key, value in (item.get("annotations") or {}).items()
+            if _DEFAULT_ANNOTATIONS.get(key) != value
+        }
+        if item.get("type", "text") == "text" and "text" in item:
+            link = item["text"].get("link")
+            style = ["text", link.get("url") if link else None, annotations]
+            content = item["text"]["content"]
+            if not content:
+                continue
+            if output and output[-1][:3] == style:
+                output[-1][3] += content
+            else:
+                output.append([*style, content])
+        elif item.get("type") == "equation":
+            output.append(["equation", item["equation"]["expression"], annotations])
+        elif item.get("type") == "mention":
+            mention = item["mention"]
+            target = mention.get(mention["type"])
+            if isinstance(target, dict):
+                target = target.get("id") or target.get("start") or target.get("url")
+            output.append(["mention", mention["type"], target, annotations])
+        else:
+            output.append([item.get("type"), item.get("plain_text")])
+    return output
+
+
+def _canonical_content(block: dict[str, Any]) -> Any:
+    content = block.get(block["type"])
+    if not isinstance(content, dict):
+        return content
+
+    canonical = {}
+    for key, value in content.items():
+        if key in _RESPONSE_ONLY_KEYS:
+            continue
+        if key in ("rich_text", "caption"):
+            value = _canonical_rich_text(value)
+            if not value:
+                continue
+        elif key == "cells":
+            value = [_canonical_rich_text(cell) for cell in value]
+        elif key in ("is_toggleable", "checked") and value is False:
+            continue
+        canonical[key] = value
+    # The color is omitted by some block factories and defaulted by the API.
+    if content.get("color", "default") != "default":
+        canonical["color"] = content["color"]
+    return canonical
+
+
+def block_hash(block: dict[str, Any]) -> str:
+    """
+    Hash the type and the visible content of a block, excluding its children. A formatted
+    block and the block returned by the API have the same hash if they look the same.
+
+    Parameters
+    ----------
+    block : dict[str, Any]
+        The formatted block or the block object in the API response.
+
+    Returns
+    -------
+    str
+        The hex digest of the block.
+    """
+    key = json.dumps([block["type"], _canonical_content(block)], sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def update_payload(block: dict[str, Any]) -> dict[str, Any]:
+    """
+    Make the arguments of `client.blocks.update` to change a block to the formatted block.
+
+    Parameters
+    ----------
+    block : dict[str, Any]
+        The formatted block.
+
+    Returns
+    -------
+    dict[str, Any]
+        The type key and the content without the children.
+    """
+    content = block.get(block["type"])
+    if isinstance(content, dict):
+        content = {key: value for key, value in content.items() if key != "children"}
+    return {block["type"]: content}
+
+
+def expand_blocks(blocks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Split the formatted blocks the same way as they are appended, so that they can be
+    compared with the blocks created from them."""
+    return [split for block in blocks for split in split_block(block)]
+
+
+def _can_pair(old: dict[str, Any], new: dict[str, Any]) -> bool:
+    return old["type"] == new["type"] and old["type"] not in _NON_UPDATABLE_BLOCK_TYPES
+
+
+def _align(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[BlockOperation]:
+    old_hashes = [block_hash(block) for block in old]
+    new_hashes = [block_hash(block) for block in new]
+    matcher = SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+
+    operations: list[BlockOperation] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            operations.extend(
+                BlockOperation(kind="keep", old=old[i], new=new[j])
+                for i, j in zip(range(i1, i2), range(j1, j2), strict=True)
+            )
+            continue
+
+        # Update the replaced blocks in place as long as the types match in order.
+        i, j = i1, j1
+        while i < i2 and j < j2 and _can_pair(old[i], new[j]):
+            operations.append(BlockOperation(kind="update", old=old[i], new=new[j]))
+            i += 1
+            j += 1
+        operations.extend(BlockOperation(kind="delete", old=block) for block in old[i:i2])
+        operations.extend(BlockOperation(kind="insert", new=block) for block in new[j:j2])
+    return operations
+
+
+def _place_preserved(
+    old: list[dict[str, Any]], operations: list[BlockOperation]
+) -> list[BlockOperation]:
+    """Put the preserved blocks right before the operation of the block which followed them,
+    so that they keep their positions among the other blocks."""
+    followed_by: dict[str, list[dict[str, Any]]] = {}
+    waiting: list[dict[str, Any]] = []
+    for block in old:
+        if block["type"] in PRESERVED_BLOCK_TYPES:
+            waiting.append(block)
+        elif waiting:
+            followed_by[block["id"]] = waiting
+            waiting = []
+
+    output: list[BlockOperation] = []
+    for operation in operations:
+        if operation.old is not None:
+            output.extend(
+                BlockOperation(kind="preserve", old=block)
+                for block in followed_by.get(operation.old["id"], [])
+            )
+        output.append(operation)
+    output.extend(BlockOperation(kind="preserve", old=block) for block in waiting)
+    return output
+
+
+def diff_blocks(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[BlockOperation]:
+    """
+    Compute the operations which turn the existing children of a block into the desired ones.
+
+    The blocks are matched by their hashes with `difflib.SequenceMatcher`, and replaced
+    blocks of the same type are updated in place. Child pages and child databases are
+    preserved at their positions among the other existing blocks.
+
+    The API can insert blocks only after an existing block, so every inserted block is
+    appended after the block of the preceding operation, including a deleted block, which
+    must therefore be deleted after the inserts of the level. If new blocks come before
+    every existing block, the first block is updated in place, or deleted after anchoring
+    them if the types differ. Blocks can't be inserted before a child page at the top of
+    the level, so they are placed after it.
+
+    The operations cover a single level. The children of the kept and updated blocks should
+    be compared by calling this function again.
+
+    Parameters
+    ----------
+    old : list[dict[str, Any]]
+        The existing blocks returned by the API, e.g. by `get_all_blocks`.
+    new : list[dict[str, Any]]
+        The desired formatted blocks, expanded by `expand_blocks`.
+
+    Returns
+    -------
+    list[BlockOperation]
+        The operations in the order of the blocks.
+    """
+    editable = [block for block in old if block["type"] not in PRESERVED_BLOCK_TYPES]
+    operations = _align(editable, new)
+    if editable and operations[0].kind == "insert":
+        if _can_pair(editable[0], new[0]):
+            first = BlockOperation(
+                kind="keep" if block_hash(editable[0]) == block_hash(new[0]) else "update",
+                old=editable[0],
+                new=new[0],
+            )
+            operations = [first, *_align(editable[1:], new[1:])]
+        else:
+            first = BlockOperation(kind="delete", old=editable[0])
+            operations = [first, *_align(editable[1:], new)]
+    return _place_preserved(old, operations)
+
+
+def desired_children(block: dict[str, Any]) -> list[dict[str, Any]]:
+    """Get the expanded children of a formatted block."""
+    return expand_blocks(_get_children(block))
+
+
+def sync_children(
+    block_id: str,
+    old: list[dict[str, Any]],
+    new: list[dict[str, Any]],
+    result: PageSyncResult,
+) -> Steps[None]:
+    """
+    Apply the diff of a level of the block tree and recurse into the kept blocks.
+
+    Parameters
+    ----------
+    block_id : str
+        The ID of the block or the page whose children are synchronized.
+    old : list[dict[str, Any]]
+        The existing children with their own children, e.g. from `get_all_blocks`.
+    new : list[dict[str, Any]]
+        The desired children, expanded by `expand_blocks`.
+    result : PageSyncResult
+        The counts of the operations, updated in place.
+
+    Returns
+    -------
+    Steps[None]
+        The procedure applying the operations.
+    """
+    anchor: str | None = None
+    pending: list[dict[str, Any]] = []
+
+    def flush() -> Steps[None]:
+        nonlocal anchor
+        if not pending:
+            return
+        appended, followups = yield from send_append_requests(
+            block_id, plan_append(pending), after=anchor
+        )
+        yield Call("_send_followups", {"followups": followups})
+        result.inserted += len(pending)
+        anchor = appended[-1]["id"]
+        pending.clear()
+
+    deleted: list[str] = []
+    for operation in diff_blocks(old, new):
+        if operation.kind == "insert":
+            assert operation.new is not None
+            pending.append(operation.new)
+            continue
+
+        assert operation.old is not None
+        yield from flush()
+        # The following blocks are inserted after this block, even if it is deleted.
+        anchor = operation.old["id"]
+        if operation.kind == "delete":
+            deleted.append(operation.old["id"])
+        elif operation.kind in ("keep", "update"):
+            assert operation.new is not None
+            if operation.kind == "update":
+                yield Call(
+                    "blocks.update",
+                    {"block_id": operation.old["id"], **update_payload(operation.new)},
+                )
+                result.updated += 1
+            else:
+                result.kept += 1
+            yield from sync_children(
+                operation.old["id"],
+                operation.old.get("children", []),
+                desired_children(operation.new),
+                result,
+            )
+    yield from flush()
+
+    # The anchors are deleted after all the blocks of the level are inserted.
+    for deleted_id in deleted:
+        yield Call("blocks.delete", {"block_id": deleted_id})
+        result.deleted += 1
@@ -0,0 +1,215 @@
+import bisect
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+from pydantic import BaseModel, Field
+
+# Upper bounds of the latency histogram buckets in seconds.
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Path segments following these segments are object IDs.
+_ID_PARENTS = {"blocks", "pages", "databases", "users", "properties", "comments"}
+_NAMED_PATHS = {"me"}
+
+
+class RequestEvent(BaseModel):
+    endpoint: str = Field(..., description="The endpoint, e.g. 'GET blocks/{id}/children'.")
+    method: str = Field(..., description="The HTTP method.")
+    path: str = Field(..., description="The path of the request.")
+    status: int | None = Field(
+        ..., description="The HTTP status. None if the request failed without a response."
+    )
+    error: str | None = Field(
+        default=None,
+        description="The kind of the failure without a response: 'timeout' or "
+        "'transport_error', e.g. a refused connection.",
+    )
+    latency: float = Field(..., description="The seconds from sending to receiving.")
+    attempt: int = Field(..., description="The number of attempts before this one.")
+    request_bytes: int = Field(..., description="The size of the request body.")
+    response_bytes: int = Field(..., description="The size of the response body.")
+
+
+class EndpointStats(BaseModel):
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    transport_errors: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    latency_histogram: list[int] = Field(default_factory=list)
+
+
+def normalize_endpoint(method: str, path: str) -> str:
+    """
+    Replace the object IDs in the path with `{id}` to aggregate requests by endpoint.
+
+    Parameters
+    ----------
+    method : str
+        The HTTP method.
+    path : str
+        The path of the request, e.g. `blocks/<block_id>/children`.
+
+    Returns
+    -------
+    str
+        The endpoint, e.g. `GET blocks/{id}/children`.
+    """
+    segments = path.strip("/").split("/")
+    for i in range(1, len(segments)):
+        if segments[i - 1] in _ID_PARENTS and segments[i] not in _NAMED_PATHS:
+            segments[i] = "{id}"
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class RequestMetrics:
+    """
+    Collects the metrics of the requests per endpoint. Pass an instance to the `metrics`
+    argument of `Client` or `AsyncClient` to enable the instrumentation. An instance can be
+    shared by several clients and threads.
+
+    Parameters
+    ----------
+    latency_buckets : tuple[float, ...], optional
+        The upper bounds of the latency histogram buckets in seconds. Latencies over the last
+        bound are counted in the overflow bucket. By default DEFAULT_LATENCY_BUCKETS.
+
+    Examples
+    --------
+    >>> metrics = RequestMetrics()
+    >>> metrics.add_hook(lambda event: print(event.endpoint, event.latency))
+    >>> client = Client(auth=api_key, metrics=metrics)
+    >>> client.get_all_blocks(page_id)
+    >>> metrics.dump("metrics.json")
+    """
+
+    def __init__(self, latency_buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self._stats: dict[str, EndpointStats] = {}
+        self._hooks: list[Callable[[RequestEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[RequestEvent], None]) -> None:
+        """
+        Register a callback called with every request event.
+
+        Parameters
+        ----------
+        hook : Callable[[RequestEvent], None]
+            The callback. It is called in the thread or the event loop sending the request,
+            so it should return quickly.
+        """
+        with self._lock:
+            self._hooks.append(hook)
+
+    def observe(
+        self,
+        method: str,
+        path: str,
+        attempt: int,
+        latency: float,
+        request: httpx.Request,
+        response: httpx.Response | None,
+        error: Exception | None = None,
+    ) -> None:
+        """
+        Record a request. This is called by the client after every attempt.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        path : str
+            The path of the request.
+        attempt : int
+            The number of attempts before this one.
+        latency : float
+            The seconds from sending to receiving.
+        request : httpx.Request
+            The sent request.
+        response : httpx.Response | None
+            The received response. None if the request failed without a response.
+        error : Exception | None, optional
+            The error raised instead of the response, by default None. A request without
+            both is counted as timed out.
+        """
+        failure = None
+        if response is None:
+            is_timeout = error is None or isinstance(error, httpx.TimeoutException)
+            failure = "timeout" if is_timeout else "transport_error"
+        event = RequestEvent(
+            endpoint=normalize_endpoint(method, path),
+            method=method,
+            path=path,
+            status=response.status_code if response is not None else None,
+            latency=latency,
+            attempt=attempt,
+            request_bytes=len(request.content),
+            response_bytes=len(response.content) if response is not None else 0,
+            error=failure,
+        )
+
+        with self._lock:
+            stats = self._stats.get(event.endpoint)
+            if stats is None:
+                stats = EndpointStats(latency_histogram=[0] * (len(self.latency_buckets) + 1))
+                self._stats[event.endpoint] = stats
+
+            stats.requests += 1
+            stats.retries += int(attempt > 0)
+            stats.rate_limited += int(event.status == 429)
+            stats.errors += int(event.status is not None and event.status >= 400)
+            stats.timeouts += int(event.error == "timeout")
+            stats.transport_errors += int(event.error == "transport_error")
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            stats.latency_histogram[bisect.bisect_left(self.latency_buckets, latency)] += 1
+
+            hooks = list(self._hooks)
+
+        for hook in hooks:
+            hook(event)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Get the metrics collected so far as a JSON serializable object.
+
+        Returns
+        -------
+        dict[str, Any]
+            The latency buckets and the metrics of each endpoint.
+        """
+        with self._lock:
+            return {
+                "latency_buckets": list(self.latency_buckets),
+                "endpoints": {
+                    endpoint: stats.model_dump() for endpoint, stats in self._stats.items()
+                },
+            }
+
+    def dump(self, path: str | Path) -> None:
+        """
+        Write the snapshot to the JSON file.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path to the JSON file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self) -> None:
+        """Discard the metrics collected so far."""
+        with self._lock:
+            self._stats = {}
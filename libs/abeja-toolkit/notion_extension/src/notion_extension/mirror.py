@@ -0,0 +1,275 @@
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Generator
+
+from pydantic import BaseModel, Field
+
+from .client import Client
+from .pagination import iterate_paginated_api
+from .sharding import combine_filters
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id TEXT PRIMARY KEY,
+    database_id TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL,
+    deleted_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_database_id ON pages (database_id, deleted_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    database_id TEXT PRIMARY KEY,
+    cursor TEXT,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+class SyncResult(BaseModel):
+    upserted: int = Field(default=0, description="The number of pages inserted or updated.")
+    deleted: int = Field(default=0, description="The number of pages newly marked as deleted.")
+    cursor: str | None = Field(default=None, description="The last_edited_time checkpoint.")
+
+
+class DatabaseMirror:
+    """
+    A local SQLite mirror of a Notion database which is synchronized incrementally.
+
+    The first sync fetches the entire database. Later syncs query only the pages edited on or
+    after the `last_edited_time` checkpoint, so the number of requests is proportional to the
+    number of changes rather than the size of the database.
+
+    Pages archived or removed from the database are not returned by the query API, so by
+    default every sync also sweeps the page IDs of the database to mark them as deleted. The
+    sweep requests only the title property to keep the responses small, but it still reads
+    every page of the database. Syncs with `detect_deletions=False` skip it and cost only
+    the changes, but then the mirror keeps the archived pages until the next sweep.
+
+    Parameters
+    ----------
+    client : Client
+        The Notion client.
+    database_id : str
+        The ID of the database to mirror.
+    path : str | Path
+        The path to the SQLite file. A file can hold the mirrors of several databases.
+    filter : dict[str, Any] | None, optional
+        The filter to mirror only a part of the database, by default None.
+        See: https://developers.notion.com/reference/post-database-query-filter
+
+    Examples
+    --------
+    >>> with DatabaseMirror(client, database_id, "mirror.db") as mirror:
+    ...     mirror.sync()
+    ...     pages = list(mirror.iter_pages())
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        database_id: str,
+        path: str | Path,
+        filter: dict[str, Any] | None = None,
+    ):
+        self.client = client
+        self.database_id = database_id
+        self.filter = filter
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "DatabaseMirror":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection to the SQLite file."""
+        self.connection.close()
+
+    @property
+    def cursor(self) -> str | None:
+        """The `last_edited_time` of the latest page synchronized so far."""
+        row = self.connection.execute(
+            "SELECT cursor FROM checkpoints WHERE database_id = ?", (self.database_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _save_checkpoint(self, cursor: str | None) -> None:
+        self.connection.execute(
+            "INSERT INTO checkpoints (database_id, cursor, synced_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (database_id) DO UPDATE SET cursor = excluded.cursor, "
+            "synced_at = excluded.synced_at",
+            (self.database_id, cursor, datetime.now(timezone.utc).isoformat()),
+        )
+
+    def sync(self, detect_deletions: bool = True) -> SyncResult:
+        """
+        Synchronize the mirror with the database.
+
+        Parameters
+        ----------
+        detect_deletions : bool, optional
+            Whether to sweep the page IDs of the database to detect deleted pages, by default
+            True. If False, only the edited pages are fetched, and the pages archived since
+            the last sweep stay in the mirror.
+
+        Returns
+        -------
+        SyncResult
+            The summary of the synchronization.
+
+        Raises
+        ------
+        ValueError
+            If the filter of the mirror combined with the checkpoint nests compound filters
+            deeper than the API allows.
+        """
+        cursor = self.cursor
+        # The last_edited_time is rounded to the minute, so pages edited in the same minute as
+        # the checkpoint are fetched again by `on_or_after` and simply overwritten.
+        extra_filter = (
+            {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": cursor}}
+            if cursor
+            else None
+        )
+        kwargs: dict[str, Any] = {
+            "database_id": self.database_id,
+            "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+        }
+        query_filter = combine_filters(self.filter, extra_filter)
+        if query_filter:
+            kwargs["filter"] = query_filter
+
+        result = SyncResult(cursor=cursor)
+        batch: list[tuple[str, str, str, str]] = []
+        for page in iterate_paginated_api(self.client.databases.query, **kwargs):
+            batch.append((page["id"], self.database_id, page["last_edited_time"], json.dumps(page)))
+            if result.cursor is None or page["last_edited_time"] > result.cursor:
+                result.cursor = page["last_edited_time"]
+
+            # Commit every page of the query so that an interrupted sync resumes from here.
+            if len(batch) >= 100:
+                self._upsert(batch, result.cursor)
+                result.upserted += len(batch)
+                batch = []
+
+        self._upsert(batch, result.cursor)
+        result.upserted += len(batch)
+
+        if detect_deletions:
+            result.deleted = self.detect_deletions()
+
+        return result
+
+    def _upsert(self, batch: list[tuple[str, str, str, str]], cursor: str | None) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO pages (id, database_id, last_edited_time, deleted_at, data) "
+                "VALUES (?, ?, ?, NULL, ?) ON CONFLICT (id) DO UPDATE SET "
+                "last_edited_time = excluded.last_edited_time, deleted_at = NULL, "
+                "data = excluded.data",
+                batch,
+            )
+            self._save_checkpoint(cursor)
+
+    def detect_deletions(self) -> int:
+        """
+        Mark the pages which no longer exist in the database as deleted.
+
+        Returns
+        -------
+        int
+            The number of pages newly marked as deleted.
+        """
+        kwargs: dict[str, Any] = {
+            "database_id": self.database_id,
+            # Every database has the title property whose ID is always "title".
+            "filter_properties": ["title"],
+        }
+        query_filter = combine_filters(self.filter)
+        if query_filter:
+            kwargs["filter"] = query_filter
+
+        alive_ids = {
+            page["id"] for page in iterate_paginated_api(self.client.databases.query, **kwargs)
+        }
+        mirrored_ids = {
+            row[0]
+            for row in self.connection.execute(
+                "SELECT id FROM pages WHERE database_id = ? AND deleted_at IS NULL",
+                (self.database_id,),
+            )
+        }
+        deleted_ids = mirrored_ids - alive_ids
+
+        deleted_at = datetime.now(timezone.utc).isoformat()
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE pages SET deleted_at = ? WHERE id = ?",
+                [(deleted_at, page_id) for page_id in deleted_ids],
+            )
+        return len(deleted_ids)
+
+    def get(self, page_id: str) -> dict[str, Any] | None:
+        """
+        Get a page from the mirror.
+
+        Parameters
+        ----------
+        page_id : str
+            The ID of the page.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            The page object, or None if the page is not mirrored or deleted.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM pages WHERE id = ? AND deleted_at IS NULL", (page_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        page: dict[str, Any] = json.loads(row[0])
+        return page
+
+    def iter_pages(self) -> Generator[dict[str, Any], None, None]:
+        """
+        Iterate over the pages in the mirror which are not deleted.
+
+        Yields
+        ------
+        dict[str, Any]
+            The page object.
+        """
+        rows = self.connection.execute(
+            "SELECT data FROM pages WHERE database_id = ? AND deleted_at IS NULL "
+            "ORDER BY last_edited_time",
+            (self.database_id,),
+        )
+        for row in rows:
+            yield json.loads(row[0])
+
+    def deleted_ids(self) -> list[str]:
+        """
+        Get the IDs of the pages detected as deleted.
+
+        Returns
+        -------
+        list[str]
+            The IDs of the deleted pages.
+        """
+        rows = self.connection.execute(
+            "SELECT id FROM pages WHERE database_id = ? AND deleted_at IS NOT NULL",
+            (self.database_id,),
+        )
+        return [row[0] for row in rows]
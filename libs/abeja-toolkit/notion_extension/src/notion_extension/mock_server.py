@@ -0,0 +1,1132 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+from pydantic import BaseModel, Field
+
+from .planner import (
+    MAX_BLOCKS_PER_REQUEST,
+    MAX_ELEMENTS_PER_REQUEST,
+    MAX_RICH_TEXT_ITEMS,
+    MAX_RICH_TEXT_LENGTH,
+)
+
+# The size limit of the request body.
+# See: https://developers.notion.com/reference/request-limits
+MAX_REQUEST_SIZE = 500_000
+MAX_PAGE_SIZE = 100
+
+DEFAULT_MOCK_BURST = 10
+
+# The properties of the databases created by `seed_workspace`.
+DEFAULT_MOCK_SCHEMA = {
+    "Name": "title",
+    "Status": "select",
+    "Tags": "multi_select",
+    "Score": "number",
+    "Done": "checkbox",
+    "Notes": "rich_text",
+    "Due": "date",
+}
+
+_MOCK_OPTIONS = {
+    "select": ["Not started", "In progress", "Done"],
+    "status": ["Not started", "In progress", "Done"],
+    "multi_select": ["bug", "feature", "docs", "test"],
+}
+_WORDS = (
+    "notion page block database query cursor latency request response export notebook cell "
+    "markdown table column index cache batch shard mirror sync token limit retry"
+).split()
+_SEEDED_BLOCK_TYPES = ("paragraph", "heading_2", "bulleted_list_item", "toggle", "to_do", "code")
+_BLOCK_TYPES_WITH_CHILDREN = {"paragraph", "bulleted_list_item", "numbered_list_item", "toggle"}
+_DEFAULT_ANNOTATIONS = {
+    "bold": False,
+    "italic": False,
+    "strikethrough": False,
+    "underline": False,
+    "code": False,
+    "color": "default",
+}
+_SEED_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class MockError(Exception):
+    """An error response of the mock API."""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def body(self) -> dict[str, Any]:
+        return {
+            "object": "error",
+            "status": self.status,
+            "code": self.code,
+            "message": self.message,
+        }
+
+
+class MockWorkspace(BaseModel):
+    database_ids: list[str] = Field(default_factory=list, description="The seeded databases.")
+    page_ids: list[str] = Field(default_factory=list, description="The seeded database pages.")
+    user_ids: list[str] = Field(default_factory=list, description="The seeded users.")
+
+
+def _format_time(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+def _rich_text(content: str) -> dict[str, Any]:
+    return {
+        "type": "text",
+        "text": {"content": content, "link": None},
+        "annotations": dict(_DEFAULT_ANNOTATIONS),
+        "plain_text": content,
+        "href": None,
+    }
+
+
+def _normalize_rich_text(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Fill the fields of the rich text objects which the API adds to the responses."""
+    output = []
+    for item in items:
+        text = item.get("text")
+        if isinstance(text, dict):
+            link = text.get("link")
+            output.append(
+                {
+                    "type": "text",
+                    "text": {"content": text["content"], "link": link},
+                    "annotations": {**_DEFAULT_ANNOTATIONS, **item.get("annotations", {})},
+                    "plain_text": text["content"],
+                    "href": link.get("url") if isinstance(link, dict) else None,
+                }
+            )
+        else:
+            output.append({"plain_text": "", "href": None, **item})
+    return output
+
+
+def _match_condition(value: Any, condition: dict[str, Any]) -> bool:
+    """Check a value against a filter condition such as `{"equals": "Done"}`."""
+    for operator, operand in condition.items():
+        if operator == "is_empty":
+            if bool(value) or value is False or value == 0:
+                return False
+        elif operator == "is_not_empty":
+            if not (bool(value) or value is False or value == 0):
+                return False
+        elif operator == "equals":
+            if value != operand:
+                return False
+        elif operator == "does_not_equal":
+            if value == operand:
+                return False
+        elif operator == "contains":
+            if value is None or operand not in value:
+                return False
+        elif operator == "does_not_contain":
+            if value is not None and operand in value:
+                return False
+        elif operator in ("greater_than", "after"):
+            if value is None or not value > operand:
+                return False
+        elif operator in ("less_than", "before"):
+            if value is None or not value < operand:
+                return False
+        elif operator in ("greater_than_or_equal_to", "on_or_after"):
+            if value is None or not value >= operand:
+                return False
+        elif operator in ("less_than_or_equal_to", "on_or_before"):
+            if value is None or not value <= operand:
+                return False
+        else:
+            raise MockError(400, "validation_error", f"Unsupported filter condition: {operator}")
+    return True
+
+
+def _filter_depth(filter: dict[str, Any]) -> int:
+    """The number of nested compound filters, which the API limits to two."""
+    for kind in ("and", "or"):
+        if kind in filter:
+            return 1 + max((_filter_depth(sub) for sub in filter[kind]), default=0)
+    return 0
+
+
+def _property_filter_value(prop: dict[str, Any]) -> Any:
+    """Get the value of the page property compared by the filter conditions."""
+    value = prop.get(prop["type"])
+    if prop["type"] in ("title", "rich_text"):
+        return "".join(item["plain_text"] for item in value or [])
+    if prop["type"] in ("select", "status"):
+        return value["name"] if value else None
+    if prop["type"] == "multi_select":
+        return [option["name"] for option in value or []]
+    if prop["type"] == "people":
+        return [person["id"] for person in value or []]
+    if prop["type"] == "date":
+        return value["start"] if value else None
+    return value
+
+
+def _sort_key(sort: dict[str, Any]) -> Callable[[dict[str, Any]], Any]:
+    """Get the key function of a sort of the database query."""
+    if "timestamp" in sort:
+        return lambda page: page[sort["timestamp"]]
+
+    def key(page: dict[str, Any]) -> tuple[bool, str]:
+        value = _property_filter_value(page["properties"][sort["property"]])
+        return value is None, str(value)
+
+    return key
+
+
+class MockNotionBackend:
+    """
+    The state and the request handling of a local stand-in of the Notion API.
+
+    The backend implements the endpoints used by `notion_extension` with the cursor
+    pagination, the request limits and the rate limiting of the real API, so that the clients
+    can be tested and benchmarked reproducibly without the network. Connect a client to the
+    backend with `MockTransport`, `AsyncMockTransport` or `MockNotionServer`.
+
+    Supported endpoints:
+        - POST pages, GET/PATCH pages/{id}
+        - GET/PATCH/DELETE blocks/{id}, GET/PATCH blocks/{id}/children
+        - GET databases/{id}, POST databases/{id}/query
+        - GET users, GET users/{id}
+        - POST search
+
+    Parameters
+    ----------
+    latency : float, optional
+        The seconds to wait before every response, by default 0.0.
+    rate : float | None, optional
+        The number of requests allowed per second. Requests over the rate are rejected with
+        HTTP 429 and a `Retry-After` header. If None, requests are not limited, by default None.
+    burst : int, optional
+        The number of requests allowed at once under the rate limit, by default
+        DEFAULT_MOCK_BURST.
+    seed : int, optional
+        The seed of the random generator for the IDs and the synthetic contents, by default 0.
+
+    Examples
+    --------
+    >>> backend = MockNotionBackend(latency=0.05, rate=3.0)
+    >>> workspace = backend.seed_workspace(pages_per_database=200, blocks_per_page=50)
+    >>> client = Client(auth="secret", client=httpx.Client(transport=MockTransport(backend)))
+    >>> pages = client.get_entire_database(workspace.database_ids[0])
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate: float | None = None,
+        burst: int = DEFAULT_MOCK_BURST,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.rate = rate
+        self.burst = burst
+
+        self.objects: dict[str, dict[str, Any]] = {}
+        self.children: dict[str, list[str]] = {}
+        self.database_pages: dict[str, list[str]] = {}
+        self.users: list[dict[str, Any]] = []
+        self.request_count = 0
+        self.rate_limited_count = 0
+
+        self._random = random.Random(seed)
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.RLock()
+        self._routes: list[tuple[str, re.Pattern[str], Callable[..., dict[str, Any]]]] = [
+            ("POST", re.compile(r"pages"), self._create_page),
+            ("GET", re.compile(r"pages/([^/]+)"), self._retrieve_page),
+            ("PATCH", re.compile(r"pages/([^/]+)"), self._update_page),
+            ("GET", re.compile(r"blocks/([^/]+)"), self._retrieve_block),
+            ("PATCH", re.compile(r"blocks/([^/]+)"), self._update_block),
+            ("DELETE", re.compile(r"blocks/([^/]+)"), self._delete_block),
+            ("GET", re.compile(r"blocks/([^/]+)/children"), self._list_children),
+            ("PATCH", re.compile(r"blocks/([^/]+)/children"), self._append_children),
+            ("GET", re.compile(r"databases/([^/]+)"), self._retrieve_database),
+            ("POST", re.compile(r"databases/([^/]+)/query"), self._query_database),
+            ("GET", re.compile(r"users"), self._list_users),
+            ("GET", re.compile(r"users/([^/]+)"), self._retrieve_user),
+            ("POST", re.compile(r"search"), self._search),
+        ]
+
+    def _new_id(self) -> str:
+        return str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+
+    def _words(self, length: int) -> str:
+        words: list[str] = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(self._random.choice(_WORDS))
+        return " ".join(words)[:length]
+
+    def _allow(self) -> float:
+        """Take a token from the rate limit bucket and return the seconds to wait if empty."""
+        if self.rate is None:
+            return 0.0
+
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def handle(
+        self, method: str, path: str, params: dict[str, list[str]], content: bytes
+    ) -> tuple[int, bytes, dict[str, str]]:
+        """
+        Handle a request of the API.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        path : str
+            The path of the request without the version prefix, e.g. `blocks/<id>/children`.
+        params : dict[str, list[str]]
+            The query parameters.
+        content : bytes
+            The request body.
+
+        Returns
+        -------
+        tuple[int, bytes, dict[str, str]]
+            The HTTP status, the JSON response body and the response headers.
+        """
+        path = path.strip("/")
+        with self._lock:
+            self.request_count += 1
+            status, body, headers = self._dispatch(method, path, params, content)
+            # Serialize under the lock, since the objects in the state are returned as they are.
+            return status, json.dumps(body).encode(), headers
+
+    def _dispatch(
+        self, method: str, path: str, params: dict[str, list[str]], content: bytes
+    ) -> tuple[int, dict[str, Any], dict[str, str]]:
+        wait = self._allow()
+        if wait > 0:
+            self.rate_limited_count += 1
+            error = MockError(429, "rate_limited", "You have been rate limited.")
+            return 429, error.body(), {"Retry-After": f"{wait:.3f}"}
+
+        try:
+            if len(content) > MAX_REQUEST_SIZE:
+                raise MockError(413, "payload_too_large", "The request body is too large.")
+            body = json.loads(content) if content else {}
+
+            for route_method, pattern, handler in self._routes:
+                match = pattern.fullmatch(path)
+                if route_method == method and match:
+                    return 200, handler(*match.groups(), params=params, body=body), {}
+            raise MockError(400, "invalid_request_url", f"Invalid request URL: {path}")
+        except MockError as error:
+            return error.status, error.body(), {}
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+            return 400, MockError(400, "validation_error", repr(error)).body(), {}
+
+    def _get(
+        self, object_id: str, object_type: str | tuple[str, ...], archived: bool = False
+    ) -> dict[str, Any]:
+        obj = self.objects.get(object_id)
+        types = (object_type,) if isinstance(object_type, str) else object_type
+        if obj is None or obj["object"] not in types or (obj.get("archived") and not archived):
+            raise MockError(404, "object_not_found", f"Could not find object: {object_id}")
+        return obj
+
+    def _paginate(
+        self, items: list[dict[str, Any]], start_cursor: str | None, page_size: int | None
+    ) -> dict[str, Any]:
+        page_size = MAX_PAGE_SIZE if page_size is None else int(page_size)
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise MockError(400, "validation_error", f"page_size should be ≤ {MAX_PAGE_SIZE}.")
+        start = int(start_cursor) if start_cursor else 0
+        end = start + page_size
+        has_more = end < len(items)
+        return {
+            "object": "list",
+            "results": items[start:end],
+            "next_cursor": str(end) if has_more else None,
+            "has_more": has_more,
+        }
+
+    # Synthetic workspace
+
+    def add_user(self, name: str, email: str | None = None, bot: bool = False) -> str:
+        """
+        Add a user to the workspace.
+
+        Parameters
+        ----------
+        name : str
+            The name of the user.
+        email : str | None, optional
+            The email address of the person, by default None.
+        bot : bool, optional
+            Whether the user is a bot, by default False.
+
+        Returns
+        -------
+        str
+            The ID of the user.
+        """
+        with self._lock:
+            user_id = self._new_id()
+            user: dict[str, Any] = {
+                "object": "user",
+                "id": user_id,
+                "name": name,
+                "avatar_url": None,
+                "type": "bot" if bot else "person",
+            }
+            user[user["type"]] = {} if bot else {"email": email}
+            self.users.append(user)
+            return user_id
+
+    def add_database(
+        self, title: str, schema: dict[str, str] | None = None, parent_id: str | None = None
+    ) -> str:
+        """
+        Add a database to the workspace.
+
+        Parameters
+        ----------
+        title : str
+            The title of the database.
+        schema : dict[str, str] | None, optional
+            The types of the properties keyed by the names, by default DEFAULT_MOCK_SCHEMA.
+        parent_id : str | None, optional
+            The ID of the parent page, by default None, the workspace.
+
+        Returns
+        -------
+        str
+            The ID of the database.
+        """
+        with self._lock:
+            database_id = self._new_id()
+            now = _format_time(datetime.now(timezone.utc))
+            properties = {}
+            for name, prop_type in (schema or DEFAULT_MOCK_SCHEMA).items():
+                config: dict[str, Any] = {}
+                if prop_type in _MOCK_OPTIONS:
+                    config["options"] = [
+                        {"id": f"{prop_type}-{i}", "name": option, "color": "default"}
+                        for i, option in enumerate(_MOCK_OPTIONS[prop_type])
+                    ]
+                prop_id = "title" if prop_type == "title" else self._new_id()[:4]
+                properties[name] = {
+                    "id": prop_id,
+                    "name": name,
+                    "type": prop_type,
+                    prop_type: config,
+                }
+
+            self.objects[database_id] = {
+                "object": "database",
+                "id": database_id,
+                "created_time": now,
+                "last_edited_time": now,
+                "title": [_rich_text(title)],
+                "parent": (
+                    {"type": "page_id", "page_id": parent_id}
+                    if parent_id
+                    else {"type": "workspace", "workspace": True}
+                ),
+                "properties": properties,
+                "archived": False,
+            }
+            self.database_pages[database_id] = []
+            if parent_id:
+                self.children[parent_id].append(database_id)
+            return database_id
+
+    def _random_property(self, prop_type: str, index: int) -> dict[str, Any]:
+        if prop_type == "title":
+            return {"title": [{"text": {"content": f"Page {index}"}}]}
+        if prop_type == "rich_text":
+            return {"rich_text": [{"text": {"content": self._words(40)}}]}
+        if prop_type in ("select", "status"):
+            option = self._random.choice([*_MOCK_OPTIONS[prop_type], None])
+            return {prop_type: {"name": option} if option else None}
+        if prop_type == "multi_select":
+            options = self._random.sample(_MOCK_OPTIONS["multi_select"], self._random.randint(0, 2))
+            return {"multi_select": [{"name": option} for option in options]}
+        if prop_type == "number":
+            return {"number": self._random.randint(0, 100)}
+        if prop_type == "checkbox":
+            return {"checkbox": self._random.random() < 0.5}
+        if prop_type == "date":
+            day = _SEED_TIME + timedelta(days=self._random.randint(0, 365))
+            return {"date": {"start": day.strftime("%Y-%m-%d")}}
+        return {prop_type: None}
+
+    def _random_blocks(self, count: int, depth: int, fanout: int, text_length: int) -> list[Any]:
+        blocks = []
+        for _ in range(count):
+            block_type = self._random.choice(_SEEDED_BLOCK_TYPES)
+            content: dict[str, Any] = {
+                "rich_text": [{"text": {"content": self._words(text_length)}}]
+            }
+            if block_type == "code":
+                content["language"] = "python"
+            if block_type == "to_do":
+                content["checked"] = False
+            if depth > 0 and block_type in _BLOCK_TYPES_WITH_CHILDREN:
+                content["children"] = self._random_blocks(fanout, depth - 1, fanout, text_length)
+            blocks.append({"object": "block", "type": block_type, block_type: content})
+        return blocks
+
+    def seed_workspace(
+        self,
+        num_databases: int = 1,
+        pages_per_database: int = 100,
+        blocks_per_page: int = 10,
+        depth: int = 1,
+        fanout: int = 3,
+        num_users: int = 10,
+        text_length: int = 80,
+    ) -> MockWorkspace:
+        """
+        Fill the workspace with synthetic users, databases and pages.
+
+        The pages are created one minute apart from 2024-01-01, and the contents are generated
+        from the seed of the backend, so the same arguments always make the same workspace.
+
+        Parameters
+        ----------
+        num_databases : int, optional
+            The number of databases, by default 1.
+        pages_per_database : int, optional
+            The number of pages in each database, by default 100.
+        blocks_per_page : int, optional
+            The number of top-level blocks of each page, by default 10.
+        depth : int, optional
+            The nesting depth of the blocks which can have children, by default 1.
+        fanout : int, optional
+            The number of children of such blocks, by default 3.
+        num_users : int, optional
+            The number of users, by default 10.
+        text_length : int, optional
+            The number of characters of the text of each block, by default 80.
+
+        Returns
+        -------
+        MockWorkspace
+            The IDs of the seeded objects.
+        """
+        workspace = MockWorkspace()
+        with self._lock:
+            for i in range(num_users):
+                workspace.user_ids.append(self.add_user(f"User {i}", f"user{i}@example.com"))
+
+            for i in range(num_databases):
+                database_id = self.add_database(f"Database {i}")
+                workspace.database_ids.append(database_id)
+                schema = self.objects[database_id]["properties"]
+                for j in range(pages_per_database):
+                    created_time = _SEED_TIME + timedelta(minutes=j)
+                    edited_time = created_time + timedelta(minutes=self._random.randint(0, 60))
+                    properties: dict[str, Any] = {}
+                    for name, prop in schema.items():
+                        properties.update({name: self._random_property(prop["type"], j)})
+                    page = self._insert_page(
+                        {"type": "database_id", "database_id": database_id},
+                        properties,
+                        self._random_blocks(blocks_per_page, depth, fanout, text_length),
+                        _format_time(created_time),
+                    )
+                    page["last_edited_time"] = _format_time(edited_time)
+                    workspace.page_ids.append(page["id"])
+        return workspace
+
+    # Pages
+
+    def _page_properties(
+        self, database_id: str | None, properties: dict[str, Any]
+    ) -> dict[str, Any]:
+        if database_id is None:
+            title = properties.get("title") or properties.get("Name") or {"title": []}
+            return {
+                "title": {
+                    "id": "title",
+                    "type": "title",
+                    "title": _normalize_rich_text(title.get("title") or []),
+                }
+            }
+
+        schema = self._get(database_id, "database")["properties"]
+        output = {}
+        for name, prop in schema.items():
+            prop_type = prop["type"]
+            value = properties.get(name, {}).get(prop_type)
+            if prop_type in ("title", "rich_text"):
+                value = _normalize_rich_text(value or [])
+            elif prop_type in ("select", "status") and value is not None:
+                value = {"id": f"{prop_type}-{value['name']}", "color": "default", **value}
+            elif prop_type == "multi_select":
+                value = [
+                    {"id": f"multi_select-{option['name']}", "color": "default", **option}
+                    for option in value or []
+                ]
+            elif prop_type == "checkbox":
+                value = bool(value)
+            elif prop_type == "people":
+                value = value or []
+            output[name] = {"id": prop["id"], "type": prop_type, prop_type: value}
+
+        for name in properties:
+            if name not in schema:
+                raise MockError(400, "validation_error", f"{name} is not a property that exists.")
+        return output
+
+    def _insert_page(
+        self,
+        parent: dict[str, Any],
+        properties: dict[str, Any],
+        children: list[dict[str, Any]],
+        created_time: str,
+    ) -> dict[str, Any]:
+        database_id = parent.get("database_id")
+        if database_id is None and "page_id" in parent:
+            self._get(parent["page_id"], "page")
+
+        page_id = self._new_id()
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": created_time,
+            "last_edited_time": created_time,
+            "archived": False,
+            "parent": parent,
+            "properties": self._page_properties(database_id, properties),
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+        }
+        self.objects[page_id] = page
+        self.children[page_id] = []
+        if database_id is not None:
+            self.database_pages[database_id].append(page_id)
+        else:
+            # A page created in a page is a `child_page` block at the end of the parent.
+            self.children[parent["page_id"]].append(page_id)
+        self._insert_blocks(page_id, children, None, created_time)
+        return page
+
+    def _create_page(self, params: dict[str, list[str]], body: dict[str, Any]) -> dict[str, Any]:
+        children = body.get("children") or []
+        self._validate_children(children)
+        page = self._insert_page(
+            body["parent"],
+            body.get("properties") or {},
+            children,
+            _format_time(datetime.now(timezone.utc)),
+        )
+        return page
+
+    def _retrieve_page(
+        self, page_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        # Archived pages can be retrieved and restored like in the API.
+        return self._get(page_id, "page", archived=True)
+
+    def _update_page(
+        self, page_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        page = self._get(page_id, "page", archived=True)
+        properties = body.get("properties") or {}
+        if properties:
+            database_id = page["parent"].get("database_id")
+            normalized = self._page_properties(database_id, properties)
+            page["properties"] = {
+                **page["properties"],
+                **{name: normalized[name] for name in properties if name in normalized},
+            }
+        if "archived" in body:
+            page["archived"] = bool(body["archived"])
+        page["last_edited_time"] = _format_time(datetime.now(timezone.utc))
+        return page
+
+    # Blocks
+
+    def _validate_children(self, children: list[dict[str, Any]]) -> None:
+        if len(children) > MAX_BLOCKS_PER_REQUEST:
+            raise MockError(
+                400,
+                "validation_error",
+                f"body.children.length should be ≤ {MAX_BLOCKS_PER_REQUEST}, "
+                f"instead was {len(children)}.",
+            )
+
+        num_elements = 0
+        stack = [(block, 1) for block in children]
+        while stack:
+            block, depth = stack.pop()
+            num_elements += 1
+            content = block.get(block["type"])
+            if not isinstance(content, dict):
+                continue
+
+            for key in ("rich_text", "caption"):
+                rich_text = content.get(key) or []
+                if len(rich_text) > MAX_RICH_TEXT_ITEMS:
+                    raise MockError(
+                        400,
+                        "validation_error",
+                        f"{key}.length should be ≤ {MAX_RICH_TEXT_ITEMS}, "
+                        f"instead was {len(rich_text)}.",
+                    )
+                for item in rich_text:
+                    text = item.get("text") or {}
+                    if len(text.get("content", "")) > MAX_RICH_TEXT_LENGTH:
+                        raise MockError(
+                            400,
+                            "validation_error",
+                            f"text.content.length should be ≤ {MAX_RICH_TEXT_LENGTH}.",
+                        )
+
+            grandchildren = content.get("children") or []
+            if grandchildren:
+                if depth >= 3:
+                    raise MockError(
+                        400,
+                        "validation_error",
+                        "Blocks can be nested at most two levels in a request.",
+                    )
+                if len(grandchildren) > MAX_BLOCKS_PER_REQUEST:
+                    raise MockError(
+                        400,
+                        "validation_error",
+                        f"children.length should be ≤ {MAX_BLOCKS_PER_REQUEST}.",
+                    )
+                stack.extend((child, depth + 1) for child in grandchildren)
+
+        if num_elements > MAX_ELEMENTS_PER_REQUEST:
+            raise MockError(
+                400,
+                "validation_error",
+                f"The request has {num_elements} blocks, over {MAX_ELEMENTS_PER_REQUEST}.",
+            )
+
+    def _insert_blocks(
+        self,
+        parent_id: str,
+        blocks: list[dict[str, Any]],
+        after: str | None,
+        created_time: str,
+    ) -> list[dict[str, Any]]:
+        parent = self.objects[parent_id]
+        parent_ref = (
+            {"type": "page_id", "page_id": parent_id}
+            if parent["object"] == "page"
+            else {"type": "block_id", "block_id": parent_id}
+        )
+
+        created = []
+        for block in blocks:
+            block_type = block["type"]
+            content = dict(block.get(block_type) or {})
+            children = content.pop("children", None) or []
+            for key in ("rich_text", "caption"):
+                if key in content:
+                    content[key] = _normalize_rich_text(content[key])
+
+            block_id = self._new_id()
+            self.objects[block_id] = {
+                "object": "block",
+                "id": block_id,
+                "parent": parent_ref,
+                "created_time": created_time,
+                "last_edited_time": created_time,
+                "has_children": False,
+                "archived": False,
+                "type": block_type,
+                block_type: content,
+            }
+            self.children[block_id] = []
+            self._insert_blocks(block_id, children, None, created_time)
+            created.append(self.objects[block_id])
+
+        siblings = self.children[parent_id]
+        position = siblings.index(after) + 1 if after is not None else len(siblings)
+        siblings[position:position] = [block["id"] for block in created]
+        if parent["object"] == "block":
+            parent["has_children"] = bool(siblings)
+        return created
+
+    def _retrieve_block(
+        self, block_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        return self._as_block(self._get(block_id, ("block", "page", "database")))
+
+    def _as_block(self, obj: dict[str, Any]) -> dict[str, Any]:
+        if obj["object"] == "block":
+            return obj
+        # Pages and databases are also blocks of the type `child_page` or `child_database`.
+        block_type = f"child_{obj['object']}"
+        return {
+            "object": "block",
+            "id": obj["id"],
+            "parent": obj["parent"],
+            "created_time": obj["created_time"],
+            "last_edited_time": obj["last_edited_time"],
+            "has_children": bool(self.children.get(obj["id"])),
+            "archived": obj["archived"],
+            "type": block_type,
+            block_type: {"title": self._title(obj)},
+        }
+
+    def _touch_page(self, obj: dict[str, Any], now: str) -> None:
+        """Update the `last_edited_time` of the page containing the block. Like the real API,
+        the `last_edited_time` of the ancestor blocks is not changed."""
+        while obj["object"] == "block":
+            parent_ref = obj["parent"]
+            obj = self.objects[parent_ref[parent_ref["type"]]]
+        obj["last_edited_time"] = now
+
+    def _touch_parent(self, block: dict[str, Any], now: str) -> None:
+        parent_ref = block["parent"]
+        parent = self.objects[parent_ref[parent_ref["type"]]]
+        self._touch_page(parent, now)
+        if parent["object"] == "block":
+            parent["has_children"] = any(
+                not self.objects[child_id]["archived"] for child_id in self.children[parent["id"]]
+            )
+
+    def _update_block(
+        self, block_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        block = self._get(block_id, "block")
+        now = _format_time(datetime.now(timezone.utc))
+        block_type = block["type"]
+        if block_type in body:
+            content = dict(body[block_type])
+            if "children" in content:
+                raise MockError(400, "validation_error", "children cannot be updated.")
+            for key in ("rich_text", "caption"):
+                if key in content:
+                    content[key] = _normalize_rich_text(content[key])
+            block[block_type] = {**block[block_type], **content}
+        elif any(key in body for key in _SEEDED_BLOCK_TYPES):
+            raise MockError(400, "validation_error", f"The block type {block_type} cannot change.")
+        if body.get("archived"):
+            block["archived"] = True
+        block["last_edited_time"] = now
+        self._touch_parent(block, now)
+        return block
+
+    def _delete_block(
+        self, block_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        block = self._get(block_id, "block")
+        block["archived"] = True
+        self._touch_parent(block, _format_time(datetime.now(timezone.utc)))
+        return block
+
+    def _list_children(
+        self, block_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        self._get(block_id, ("page", "block"))
+        children = [self._as_block(self.objects[child_id]) for child_id in self.children[block_id]]
+        response = self._paginate(
+            [child for child in children if not child["archived"]],
+            params.get("start_cursor", [None])[0],
+            int(params["page_size"][0]) if "page_size" in params else None,
+        )
+        return {**response, "type": "block", "block": {}}
+
+    def _append_children(
+        self, block_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        parent = self._get(block_id, ("page", "block"))
+        after = body.get("after")
+        if after is not None and after not in self.children[block_id]:
+            raise MockError(400, "validation_error", f"Block {after} is not a child of the parent.")
+
+        children = body["children"]
+        self._validate_children(children)
+        now = _format_time(datetime.now(timezone.utc))
+        created = self._insert_blocks(block_id, children, after, now)
+        self._touch_page(parent, now)
+        return {
+            "object": "list",
+            "results": created,
+            "next_cursor": None,
+            "has_more": False,
+            "type": "block",
+            "block": {},
+        }
+
+    # Databases
+
+    def _retrieve_database(
+        self, database_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        return self._get(database_id, "database")
+
+    def _match_filter(self, page: dict[str, Any], filter: dict[str, Any]) -> bool:
+        if "and" in filter:
+            return all(self._match_filter(page, sub) for sub in filter["and"])
+        if "or" in filter:
+            return any(self._match_filter(page, sub) for sub in filter["or"])
+        if "timestamp" in filter:
+            timestamp = filter["timestamp"]
+            return _match_condition(page[timestamp], filter[timestamp])
+
+        prop = page["properties"].get(filter["property"])
+        if prop is None:
+            raise MockError(
+                400,
+                "validation_error",
+                f"Could not find property with name or id: {filter['property']}",
+            )
+        condition = filter.get(prop["type"])
+        if condition is None:
+            raise MockError(
+                400, "validation_error", f"The filter of {filter['property']} has a wrong type."
+            )
+        value = _property_filter_value(prop)
+        if prop["type"] in ("title", "rich_text", "select", "status") and "contains" in condition:
+            value = value or ""
+        return _match_condition(value, condition)
+
+    def _query_database(
+        self, database_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        self._get(database_id, "database")
+        pages = [
+            self.objects[page_id]
+            for page_id in self.database_pages[database_id]
+            if not self.objects[page_id]["archived"]
+        ]
+        if body.get("filter"):
+            if _filter_depth(body["filter"]) > 2:
+                raise MockError(
+                    400, "validation_error", "Compound filters can be nested at most 2 levels."
+                )
+            pages = [page for page in pages if self._match_filter(page, body["filter"])]
+
+        for sort in reversed(body.get("sorts") or []):
+            pages = sorted(
+                pages, key=_sort_key(sort), reverse=sort.get("direction") == "descending"
+            )
+
+        filter_properties = params.get("filter_properties")
+        if filter_properties:
+            pages = [
+                {
+                    **page,
+                    "properties": {
+                        name: prop
+                        for name, prop in page["properties"].items()
+                        if name in filter_properties or prop["id"] in filter_properties
+                    },
+                }
+                for page in pages
+            ]
+
+        response = self._paginate(pages, body.get("start_cursor"), body.get("page_size"))
+        return {**response, "type": "page_or_database", "page_or_database": {}}
+
+    # Users
+
+    def _list_users(self, params: dict[str, list[str]], body: dict[str, Any]) -> dict[str, Any]:
+        response = self._paginate(
+            self.users,
+            params.get("start_cursor", [None])[0],
+            int(params["page_size"][0]) if "page_size" in params else None,
+        )
+        return {**response, "type": "user", "user": {}}
+
+    def _retrieve_user(
+        self, user_id: str, params: dict[str, list[str]], body: dict[str, Any]
+    ) -> dict[str, Any]:
+        for user in self.users:
+            if user["id"] == user_id:
+                return user
+        raise MockError(404, "object_not_found", f"Could not find user: {user_id}")
+
+    # Search
+
+    def _title(self, obj: dict[str, Any]) -> str:
+        if obj["object"] == "database":
+            items = obj["title"]
+        else:
+            items = next(
+                (prop["title"] for prop in obj["properties"].values() if prop["type"] == "title"),
+                [],
+            )
+        return "".join(item.get("plain_text", "") for item in items)
+
+    def _search(self, params: dict[str, list[str]], body: dict[str, Any]) -> dict[str, Any]:
+        object_filter = body.get("filter")
+        if object_filter is not None and object_filter.get("property") != "object":
+            raise MockError(400, "validation_error", "The filter property must be object.")
+        object_types = (object_filter["value"],) if object_filter else ("page", "database")
+
+        query = (body.get("query") or "").lower()
+        results = [
+            obj
+            for obj in self.objects.values()
+            if obj["object"] in object_types
+            and not obj["archived"]
+            and query in self._title(obj).lower()
+        ]
+        sort = body.get("sort")
+        if sort is not None:
+            results = sorted(
+                results,
+                key=lambda obj: obj[sort["timestamp"]],
+                reverse=sort.get("direction") == "descending",
+            )
+
+        response = self._paginate(results, body.get("start_cursor"), body.get("page_size"))
+        return {**response, "type": "page_or_database", "page_or_database": {}}
+
+
+def _handle_httpx_request(backend: MockNotionBackend, request: httpx.Request) -> httpx.Response:
+    path = re.sub(r"^/v1/", "", request.url.path)
+    params = {key: request.url.params.get_list(key) for key in request.url.params.keys()}
+    status, content, headers = backend.handle(request.method, path, params, request.read())
+    return httpx.Response(
+        status, content=content, headers={"Content-Type": "application/json", **headers}
+    )
+
+
+class MockTransport(httpx.BaseTransport):
+    """
+    The httpx transport sending the requests of `Client` to the mock backend.
+
+    Parameters
+    ----------
+    backend : MockNotionBackend
+        The mock backend.
+    """
+
+    def __init__(self, backend: MockNotionBackend):
+        self.backend = backend
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.backend.latency > 0:
+            time.sleep(self.backend.latency)
+        return _handle_httpx_request(self.backend, request)
+
+
+class AsyncMockTransport(httpx.AsyncBaseTransport):
+    """
+    The httpx transport sending the requests of `AsyncClient` to the mock backend.
+
+    Parameters
+    ----------
+    backend : MockNotionBackend
+        The mock backend.
+    """
+
+    def __init__(self, backend: MockNotionBackend):
+        self.backend = backend
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.backend.latency > 0:
+            await asyncio.sleep(self.backend.latency)
+        await request.aread()
+        return _handle_httpx_request(self.backend, request)
+
+
+class MockNotionServer:
+    """
+    A local HTTP server serving the mock backend, for clients which cannot take a transport.
+    Pass `base_url` to the `base_url` option of the client.
+
+    Parameters
+    ----------
+    backend : MockNotionBackend
+        The mock backend.
+    host : str, optional
+        The host to listen on, by default "127.0.0.1".
+    port : int, optional
+        The port to listen on. If 0, a free port is chosen, by default 0.
+
+    Examples
+    --------
+    >>> with MockNotionServer(MockNotionBackend()) as server:
+    ...     client = Client(auth="secret", base_url=server.base_url)
+    """
+
+    def __init__(self, backend: MockNotionBackend, host: str = "127.0.0.1", port: int = 0):
+        self.backend = backend
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self) -> None:
+                if backend.latency > 0:
+                    time.sleep(backend.latency)
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                status, content, headers = backend.handle(
+                    self.command,
+                    re.sub(r"^/v1/", "", url.path),
+                    parse_qs(url.query),
+                    self.rfile.read(length),
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """The root URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockNotionServer":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
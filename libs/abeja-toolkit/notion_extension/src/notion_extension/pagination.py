@@ -0,0 +1,76 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator
+
+
+def iterate_paginated_api(
+    function: Callable[..., Any], **kwargs: Any
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Iterate over the results of the paginated API. The next page is requested in a background
+    thread while the results of the current page are consumed, so that the processing of the
+    caller overlaps with the network I/O. Only two pages are held in memory at the same time.
+
+    Parameters
+    ----------
+    function : Callable[..., Any]
+        The paginated API to call, for example `client.databases.query`.
+    **kwargs : Any
+        The arguments passed to the API.
+
+    Yields
+    ------
+    dict[str, Any]
+        The result objects of the API.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(function, **kwargs)
+        while True:
+            response = future.result()
+            next_cursor = response.get("next_cursor")
+            has_more = bool(response.get("has_more")) and next_cursor is not None
+            if has_more:
+                future = executor.submit(function, **{**kwargs, "start_cursor": next_cursor})
+
+            yield from response.get("results", [])
+
+            if not has_more:
+                return
+
+
+async def async_iterate_paginated_api(
+    function: Callable[..., Awaitable[Any]], **kwargs: Any
+) -> AsyncGenerator[dict[str, Any], None]:
+    """
+    Iterate asynchronously over the results of the paginated API. The next page is requested
+    in a background task while the results of the current page are consumed.
+
+    Parameters
+    ----------
+    function : Callable[..., Awaitable[Any]]
+        The paginated API to call, for example `client.databases.query`.
+    **kwargs : Any
+        The arguments passed to the API.
+
+    Yields
+    ------
+    dict[str, Any]
+        The result objects of the API.
+    """
+    task = asyncio.ensure_future(function(**kwargs))
+    try:
+        while True:
+            response = await task
+            next_cursor = response.get("next_cursor")
+            has_more = bool(response.get("has_more")) and next_cursor is not None
+            if has_more:
+                task = asyncio.ensure_future(function(**{**kwargs, "start_cursor": next_cursor}))
+
+            for result in response.get("results", []):
+                yield result
+
+            if not has_more:
+                return
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,397 @@
+import json
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .steps import Call, Steps
+
+# Request limits of the Notion API.
+# See: https://developers.notion.com/reference/request-limits
+MAX_BLOCKS_PER_REQUEST = 100
+MAX_ELEMENTS_PER_REQUEST = 1000
+MAX_RICH_TEXT_LENGTH = 2000
+MAX_RICH_TEXT_ITEMS = 100
+MAX_EQUATION_LENGTH = 1000
+# The limit of the payload is 500KB. Leave a margin for the rest of the request body.
+MAX_PAYLOAD_SIZE = 450_000
+
+# The blocks which can be split into several sibling blocks of the same type without changing
+# the look of the page. Splitting the others would break a code block into several ones, or
+# turn a list item into several items.
+_SPLITTABLE_TYPES = frozenset({"paragraph"})
+
+
+class DeferredChildren(BaseModel):
+    index: int = Field(..., description="The index of the top-level block in the request.")
+    child_index: int | None = Field(
+        default=None,
+        description="The index of the child of the top-level block. If None, the children "
+        "are appended to the top-level block itself.",
+    )
+    grandchild_index: int | None = Field(
+        default=None,
+        description="The index of the child of `child_index`. If None, the children are "
+        "appended to the child itself.",
+    )
+    children: list[dict[str, Any]] = Field(
+        ..., description="The blocks to append after the parent is created."
+    )
+
+    @property
+    def path(self) -> tuple[int, ...]:
+        """The indices of the parent from the top-level block down."""
+        indices = (self.index, self.child_index, self.grandchild_index)
+        return tuple(index for index in indices if index is not None)
+
+
+class AppendRequest(BaseModel):
+    children: list[dict[str, Any]] = Field(
+        default_factory=list, description="The blocks sent in the request."
+    )
+    deferred: list[DeferredChildren] = Field(
+        default_factory=list,
+        description="The blocks which are appended to the created blocks by follow-up requests.",
+    )
+
+
+def _get_children(block: dict[str, Any]) -> list[dict[str, Any]]:
+    content = block.get(block["type"])
+    if not isinstance(content, dict):
+        return []
+    children: list[dict[str, Any]] = content.get("children") or []
+    return children
+
+
+def _set_children(block: dict[str, Any], children: list[dict[str, Any]] | None) -> dict[str, Any]:
+    content = block.get(block["type"])
+    if not isinstance(content, dict):
+        return block
+
+    content = {key: value for key, value in content.items() if key != "children"}
+    if children:
+        content["children"] = children
+    return {**block, block["type"]: content}
+
+
+def _check_equation(expression: str) -> None:
+    if len(expression) > MAX_EQUATION_LENGTH:
+        raise ValueError(
+            f"The equation has {len(expression)} characters, which exceeds the limit of "
+            f"{MAX_EQUATION_LENGTH}. An equation cannot be split."
+        )
+
+
+def split_rich_text(rich_text: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Split the text objects whose content exceeds the length limit into several text objects
+    with the same annotations and link.
+
+    Parameters
+    ----------
+    rich_text : list[dict[str, Any]]
+        The formatted rich text objects.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The rich text objects which meet the length limit.
+
+    Raises
+    ------
+    ValueError
+        If an inline equation exceeds the length limit.
+    """
+    output = []
+    for item in rich_text:
+        if item.get("type") == "equation":
+            _check_equation(item["equation"]["expression"])
+        text = item.get("text")
+        if item.get("type") != "text" or not text or len(text["content"]) <= MAX_RICH_TEXT_LENGTH:
+            output.append(item)
+            continue
+
+        content = text["content"]
+        for st in range(0, len(content), MAX_RICH_TEXT_LENGTH):
+            output.append(
+                {**item, "text": {**text, "content": content[st : st + MAX_RICH_TEXT_LENGTH]}}
+            )
+    return output
+
+
+def _merge_rich_text(rich_text: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Merge the adjacent text objects with the same annotations and link, as long as the
+    merged content meets the length limit."""
+    output: list[dict[str, Any]] = []
+    for item in rich_text:
+        last = output[-1] if output else None
+        if (
+            last is not None
+            and item.get("type") == last.get("type") == "text"
+            and {**item, "text": {**item["text"], "content": ""}}
+            == {**last, "text": {**last["text"], "content": ""}}
+            and len(last["text"]["content"]) + len(item["text"]["content"]) <= MAX_RICH_TEXT_LENGTH
+        ):
+            content = last["text"]["content"] + item["text"]["content"]
+            output[-1] = {**last, "text": {**last["text"], "content": content}}
+        else:
+            output.append(item)
+    return output
+
+
+def split_block(block: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Split the rich text of the block to meet the limits. If the rich text has too many
+    objects, the adjacent objects with the same style are merged, and if it still has too
+    many, a paragraph is split into several paragraphs, and the children are kept in the last
+    one.
+
+    Parameters
+    ----------
+    block : dict[str, Any]
+        The formatted block.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The blocks which meet the limits of the rich text.
+
+    Raises
+    ------
+    ValueError
+        If the rich text of a block other than a paragraph has too many objects, or if an
+        equation exceeds the length limit.
+    """
+    content = block.get(block["type"])
+    if block["type"] == "equation" and isinstance(content, dict):
+        _check_equation(content["expression"])
+    if not isinstance(content, dict) or "rich_text" not in content:
+        return [block]
+
+    content = {**content, "rich_text": split_rich_text(content["rich_text"])}
+    if content.get("caption"):
+        content["caption"] = split_rich_text(content["caption"])[:MAX_RICH_TEXT_ITEMS]
+
+    rich_text = content["rich_text"]
+    if len(rich_text) > MAX_RICH_TEXT_ITEMS:
+        rich_text = content["rich_text"] = _merge_rich_text(rich_text)
+    if len(rich_text) <= MAX_RICH_TEXT_ITEMS:
+        return [{**block, block["type"]: content}]
+    if block["type"] not in _SPLITTABLE_TYPES:
+        raise ValueError(
+            f"The rich text of the {block['type']} block has {len(rich_text)} objects, which "
+            f"exceeds the limit of {MAX_RICH_TEXT_ITEMS}. Only a paragraph can be split into "
+            "several blocks."
+        )
+
+    blocks = []
+    for st in range(0, len(rich_text), MAX_RICH_TEXT_ITEMS):
+        is_last = st + MAX_RICH_TEXT_ITEMS >= len(rich_text)
+        split_content = {
+            key: value for key, value in content.items() if is_last or key != "children"
+        }
+        split_content["rich_text"] = rich_text[st : st + MAX_RICH_TEXT_ITEMS]
+        blocks.append({**block, block["type"]: split_content})
+    return blocks
+
+
+# The child index, the grandchild index and the children of a deferred follow-up.
+_Deferred = tuple[int | None, int | None, list[dict[str, Any]]]
+
+
+def _split_children(block: dict[str, Any]) -> list[dict[str, Any]]:
+    return [split for child in _get_children(block) for split in split_block(child)]
+
+
+def _plan_block(block: dict[str, Any]) -> tuple[dict[str, Any], int, int, list[_Deferred]]:
+    """Build the payload of a top-level block with its children and grandchildren, which is
+    the nesting limit of a request, and return it with its number of elements, its size and
+    the deferred children. Grandchildren are deferred as a whole per child when they don't fit
+    in the limits of a request, and so are the children."""
+    children = _split_children(block)
+    kept_children = children[:MAX_BLOCKS_PER_REQUEST]
+    deferred: list[_Deferred] = []
+    if len(children) > MAX_BLOCKS_PER_REQUEST:
+        deferred.append((None, None, children[MAX_BLOCKS_PER_REQUEST:]))
+
+    payload_children = []
+    nested_deferred: list[_Deferred] = []
+    budget = MAX_ELEMENTS_PER_REQUEST - 1 - len(kept_children)
+    for child_index, child in enumerate(kept_children):
+        grandchildren = _split_children(child)
+        kept_grandchildren = grandchildren[:MAX_BLOCKS_PER_REQUEST]
+        if not grandchildren or len(kept_grandchildren) > budget:
+            payload_children.append(_set_children(child, None))
+            if grandchildren:
+                nested_deferred.append((child_index, None, grandchildren))
+            continue
+
+        budget -= len(kept_grandchildren)
+        payload_children.append(
+            _set_children(child, [_set_children(item, None) for item in kept_grandchildren])
+        )
+        if len(grandchildren) > MAX_BLOCKS_PER_REQUEST:
+            nested_deferred.append((child_index, None, grandchildren[MAX_BLOCKS_PER_REQUEST:]))
+        for grandchild_index, grandchild in enumerate(kept_grandchildren):
+            great_grandchildren = _get_children(grandchild)
+            if great_grandchildren:
+                nested_deferred.append((child_index, grandchild_index, great_grandchildren))
+
+    payload_block = _set_children(block, payload_children)
+    num_elements = MAX_ELEMENTS_PER_REQUEST - budget
+    if len(json.dumps(payload_block)) > MAX_PAYLOAD_SIZE:
+        # Too large with the grandchildren; send the children alone.
+        payload_block = _set_children(
+            block, [_set_children(child, None) for child in kept_children]
+        )
+        num_elements = 1 + len(kept_children)
+        nested_deferred = [
+            (child_index, None, grandchildren)
+            for child_index, child in enumerate(kept_children)
+            if (grandchildren := _split_children(child))
+        ]
+    if len(json.dumps(payload_block)) > MAX_PAYLOAD_SIZE:
+        # Still too large; send the block alone.
+        payload_block = _set_children(block, None)
+        num_elements = 1
+        deferred = [(None, None, children)] if children else []
+        nested_deferred = []
+
+    size = len(json.dumps(payload_block))
+    if size > MAX_PAYLOAD_SIZE:
+        raise ValueError(
+            f"A {block['type']} block is {size} bytes without its children, which exceeds "
+            f"the payload limit of {MAX_PAYLOAD_SIZE} bytes of a request."
+        )
+    return payload_block, num_elements, size, deferred + nested_deferred
+
+
+def plan_append(blocks: list[dict[str, Any]]) -> list[AppendRequest]:
+    """
+    Split the blocks into the fewest requests which meet the request limits of the Notion API.
+
+    A request contains the top-level blocks with their children and grandchildren, which is
+    the nesting limit of the API. The deeper children and the children exceeding the limits
+    are deferred, and should be appended to the created blocks by follow-up requests, which
+    can be planned by this function again.
+
+    Parameters
+    ----------
+    blocks : list[dict[str, Any]]
+        The formatted blocks, for example the output of `Blocks.format()`.
+
+    Returns
+    -------
+    list[AppendRequest]
+        The requests to send in order to the same parent.
+
+    Raises
+    ------
+    ValueError
+        If a single block exceeds the payload limit of a request even without its children,
+        or its rich text cannot be split to meet the limits (see `split_block`).
+    """
+    requests: list[AppendRequest] = []
+    current = AppendRequest()
+    num_elements = 0
+    payload_size = 0
+
+    for block in [split for original in blocks for split in split_block(original)]:
+        payload_block, block_elements, block_size, deferred = _plan_block(block)
+
+        if current.children and (
+            len(current.children) >= MAX_BLOCKS_PER_REQUEST
+            or num_elements + block_elements > MAX_ELEMENTS_PER_REQUEST
+            or payload_size + block_size > MAX_PAYLOAD_SIZE
+        ):
+            requests.append(current)
+            current = AppendRequest()
+            num_elements = 0
+            payload_size = 0
+
+        index = len(current.children)
+        current.children.append(payload_block)
+        current.deferred.extend(
+            DeferredChildren(
+                index=index,
+                child_index=child_index,
+                grandchild_index=grandchild_index,
+                children=deferred_children,
+            )
+            for child_index, grandchild_index, deferred_children in deferred
+        )
+        num_elements += block_elements
+        payload_size += block_size
+
+    if current.children:
+        requests.append(current)
+
+    return requests
+
+
+def resolve_deferred(
+    created_blocks: list[dict[str, Any]], deferred: list[DeferredChildren]
+) -> Steps[list[tuple[str, list[dict[str, Any]]]]]:
+    """
+    Find the IDs of the created blocks to which the deferred children are appended.
+
+    Parameters
+    ----------
+    created_blocks : list[dict[str, Any]]
+        The top-level blocks created by the request, in the order of the request.
+    deferred : list[DeferredChildren]
+        The deferred children of the request.
+
+    Returns
+    -------
+    Steps[list[tuple[str, list[dict[str, Any]]]]]
+        The procedure returning the follow-ups, the pairs of the ID of the parent block and
+        the children to append to it. The children of the created blocks are listed when
+        the parent is nested.
+    """
+    followups = []
+    # The IDs of the children of the created blocks by their indices.
+    child_ids: dict[tuple[int, ...], list[str]] = {(): [block["id"] for block in created_blocks]}
+    for item in deferred:
+        path = item.path
+        for depth in range(1, len(path)):
+            if path[:depth] not in child_ids:
+                parent_id = child_ids[path[: depth - 1]][path[depth - 1]]
+                children = yield Call("_fetch_children", {"block_id": parent_id, "version": None})
+                child_ids[path[:depth]] = [child["id"] for child in children]
+        followups.append((child_ids[path[:-1]][path[-1]], item.children))
+    return followups
+
+
+def send_append_requests(
+    block_id: str, requests: list[AppendRequest], after: str | None = None
+) -> Steps[tuple[list[dict[str, Any]], list[tuple[str, list[dict[str, Any]]]]]]:
+    """
+    Send the planned requests to the block in order.
+
+    Parameters
+    ----------
+    block_id : str
+        The ID of the block or the page to which the blocks are appended.
+    requests : list[AppendRequest]
+        The requests from `plan_append`.
+    after : str | None, optional
+        The ID of the child block after which the blocks are inserted, by default None, the
+        end of the children.
+
+    Returns
+    -------
+    Steps[tuple[list[dict[str, Any]], list[tuple[str, list[dict[str, Any]]]]]]
+        The procedure returning the appended blocks and the follow-ups to append the deferred
+        children.
+    """
+    appended = []
+    followups = []
+    for request in requests:
+        kwargs: dict[str, Any] = {"block_id": block_id, "children": request.children}
+        if after:
+            kwargs["after"] = after
+        response = yield Call("blocks.children.append", kwargs)
+        appended.extend(response["results"])
+        after = response["results"][-1]["id"] if after else None
+        followups.extend((yield from resolve_deferred(response["results"], request.deferred)))
+    return appended, followups
@@ -0,0 +1,244 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+# Notion API allows an average of three requests per second per integration.
+# See: https://developers.notion.com/reference/request-limits
+DEFAULT_RATE = 3.0
+DEFAULT_BURST = 3
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """
+    A token bucket rate limiter which can be shared by threads and event loops.
+
+    Every request takes one token from the bucket, and the bucket is refilled by `rate`
+    tokens per second up to `burst` tokens. The limiter reserves the time slot of each
+    request under a lock, so both synchronous and asynchronous callers wait only for
+    their own slot.
+
+    Parameters
+    ----------
+    rate : float, optional
+        The number of requests allowed per second, by default DEFAULT_RATE.
+    burst : int, optional
+        The number of requests allowed to be sent at once, by default DEFAULT_BURST.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be greater than 0")
+
+        self.rate = rate
+        self.burst = burst
+
+        self._interval = 1.0 / rate
+        self._theoretical_arrival = 0.0
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of callers waiting for their turn to send a request."""
+        return self._waiting
+
+    def _reserve(self) -> float:
+        """Reserve the next time slot and return the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            arrival = max(self._theoretical_arrival, now)
+            send_at = max(now, self._paused_until, arrival - (self.burst - 1) * self._interval)
+            self._theoretical_arrival = max(arrival, send_at) + self._interval
+            return send_at - now
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop issuing tokens for a while. This is used to honor the `Retry-After` header.
+
+        Parameters
+        ----------
+        seconds : float
+            The number of seconds to pause.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> None:
+        """Block the current thread until a request is allowed to be sent."""
+        delay = self._reserve()
+        if delay <= 0:
+            return
+
+        with self._lock:
+            self._waiting += 1
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    async def async_acquire(self) -> None:
+        """Wait until a request is allowed to be sent without blocking the event loop."""
+        delay = self._reserve()
+        if delay <= 0:
+            return
+
+        with self._lock:
+            self._waiting += 1
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+
+_shared_rate_limiter: RateLimiter | None = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Get the rate limiter shared by all clients in the process.
+
+    Returns
+    -------
+    RateLimiter
+        The shared rate limiter.
+    """
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
+
+
+def parse_retry_after(response: httpx.Response) -> float | None:
+    """
+    Parse the `Retry-After` header of the response.
+
+    Parameters
+    ----------
+    response : httpx.Response
+        The response of the API request.
+
+    Returns
+    -------
+    float | None
+        The seconds to wait before retrying, or None if the header is missing or invalid.
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(
+    attempt: int, base: float = DEFAULT_BACKOFF_BASE, maximum: float = DEFAULT_BACKOFF_MAX
+) -> float:
+    """
+    Calculate the delay of exponential backoff with full jitter.
+
+    Parameters
+    ----------
+    attempt : int
+        The number of attempts already failed, starting from 0.
+    base : float, optional
+        The base delay in seconds, by default DEFAULT_BACKOFF_BASE.
+    maximum : float, optional
+        The upper bound of the delay in seconds, by default DEFAULT_BACKOFF_MAX.
+
+    Returns
+    -------
+    float
+        The seconds to wait before retrying.
+    """
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+def transport_retry_delay(
+    error: Exception, idempotent: bool, attempt: int, max_retries: int
+) -> float | None:
+    """
+    Decide whether to retry a request which failed without a response.
+
+    A request which timed out may have been processed, so it is retried only if it is
+    idempotent. A request which failed to connect was never sent, so it is always retried.
+
+    Parameters
+    ----------
+    error : Exception
+        The transport error, e.g. `httpx.TimeoutException` or `httpx.ConnectError`.
+    idempotent : bool
+        Whether the request can be sent again after it may have been processed.
+    attempt : int
+        The number of attempts already failed, starting from 0.
+    max_retries : int
+        The maximum number of retries.
+
+    Returns
+    -------
+    float | None
+        The seconds to wait before retrying, or None if the request must not be retried.
+    """
+    never_sent = isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+    if attempt >= max_retries or not (idempotent or never_sent):
+        return None
+    return backoff_delay(attempt)
+
+
+def response_retry_delay(
+    response: httpx.Response, idempotent: bool, attempt: int, max_retries: int
+) -> float | None:
+    """
+    Decide whether to retry a request which failed with a transient error response.
+
+    A rate limited request was rejected, so it is always retried after `Retry-After`. A
+    request which failed with a server error may have been processed, so it is retried only
+    if it is idempotent.
+
+    Parameters
+    ----------
+    response : httpx.Response
+        The response of the request.
+    idempotent : bool
+        Whether the request can be sent again after it may have been processed.
+    attempt : int
+        The number of attempts already failed, starting from 0.
+    max_retries : int
+        The maximum number of retries.
+
+    Returns
+    -------
+    float | None
+        The seconds to wait before retrying, or None if the response must be returned. For
+        HTTP 429, the rate limiter should be paused for the delay instead of sleeping.
+    """
+    if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+        return None
+    if response.status_code == 429:
+        retry_after = parse_retry_after(response)
+        return retry_after if retry_after is not None else backoff_delay(attempt)
+    return backoff_delay(attempt) if idempotent else None
@@ -0,0 +1,310 @@
+import json
+import sys
+from typing import Any, Iterator
+
+from .db_properties import extract_property_value
+
+# The tuples of the property names shared by the records of the same schema.
+_shared_names: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+def _share_names(names: tuple[str, ...]) -> tuple[str, ...]:
+    shared = _shared_names.get(names)
+    if shared is None:
+        shared = tuple(sys.intern(name) for name in names)
+        _shared_names[shared] = shared
+    return shared
+
+
+def _user_id(user: dict[str, Any] | None) -> str | None:
+    # Interned strings are never freed on Python 3.12+, so only the values from a small set,
+    # e.g. the members of the workspace, are interned, and never the IDs of pages or the
+    # timestamps.
+    user_id = user.get("id") if user else None
+    return sys.intern(user_id) if user_id is not None else None
+
+
+def _parent_id(parent: dict[str, Any] | None) -> str | None:
+    if not parent:
+        return None
+    value = parent.get(parent["type"])
+    # The workspace parent has `True` instead of an ID.
+    return value if isinstance(value, str) else None
+
+
+def _compact_value(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _encode_raw(obj: dict[str, Any]) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class PageRecord:
+    """
+    A compact record of a page in the database query results.
+
+    The nested property objects are reduced to their plain values, the same as
+    `extract_property_value` except that lists are stored as tuples. The values are stored in
+    a tuple aligned with a tuple of the property names shared by all records of the same
+    schema, and the repeated strings such as user IDs and option names are interned, so a large
+    number of records takes a fraction of the memory of the response dicts. The raw JSON is
+    kept only if requested.
+
+    Examples
+    --------
+    >>> records = client.get_database_records(database_id)
+    >>> records[0]["Status"]
+    'Done'
+    >>> records[0].properties
+    {'Name': 'Page 0', 'Status': 'Done', ...}
+    """
+
+    __slots__ = (
+        "id",
+        "created_time",
+        "last_edited_time",
+        "created_by",
+        "last_edited_by",
+        "parent_id",
+        "archived",
+        "url",
+        "_names",
+        "_values",
+        "_raw",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        created_time: str | None,
+        last_edited_time: str | None,
+        created_by: str | None,
+        last_edited_by: str | None,
+        parent_id: str | None,
+        archived: bool,
+        url: str | None,
+        names: tuple[str, ...],
+        values: tuple[Any, ...],
+        raw: bytes | None = None,
+    ):
+        self.id = id
+        self.created_time = created_time
+        self.last_edited_time = last_edited_time
+        self.created_by = created_by
+        self.last_edited_by = last_edited_by
+        self.parent_id = parent_id
+        self.archived = archived
+        self.url = url
+        self._names = _share_names(names)
+        self._values = values
+        self._raw = raw
+
+    @classmethod
+    def from_dict(cls, page: dict[str, Any], keep_raw: bool = False) -> "PageRecord":
+        """
+        Make a record from a page object in the API response.
+
+        Parameters
+        ----------
+        page : dict[str, Any]
+            The page object.
+        keep_raw : bool, optional
+            Whether to keep the JSON of the page to restore it by `raw`, by default False.
+
+        Returns
+        -------
+        PageRecord
+            The record of the page.
+        """
+        properties = page.get("properties", {})
+        return cls(
+            id=page["id"],
+            created_time=page.get("created_time"),
+            last_edited_time=page.get("last_edited_time"),
+            created_by=_user_id(page.get("created_by")),
+            last_edited_by=_user_id(page.get("last_edited_by")),
+            parent_id=_parent_id(page.get("parent")),
+            archived=bool(page.get("archived")),
+            url=page.get("url"),
+            names=tuple(properties),
+            values=tuple(
+                _compact_value(extract_property_value(value)) for value in properties.values()
+            ),
+            raw=_encode_raw(page) if keep_raw else None,
+        )
+
+    def __repr__(self) -> str:
+        return f"PageRecord(id={self.id!r}, properties={self.properties!r})"
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._values[self._names.index(name)]
+        except ValueError:
+            raise KeyError(name) from None
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        Get the value of a property.
+
+        Parameters
+        ----------
+        name : str
+            The name of the property.
+        default : Any, optional
+            The value returned if the page has no such property, by default None.
+
+        Returns
+        -------
+        Any
+            The plain value of the property.
+        """
+        return self[name] if name in self._names else default
+
+    @property
+    def properties(self) -> dict[str, Any]:
+        """The plain values of the properties keyed by the names."""
+        return dict(zip(self._names, self._values, strict=True))
+
+    @property
+    def raw(self) -> dict[str, Any] | None:
+        """The page object as returned by the API, or None if it was not kept."""
+        if self._raw is None:
+            return None
+        page: dict[str, Any] = json.loads(self._raw)
+        return page
+
+
+class BlockRecord:
+    """
+    A compact record of a block in the response of `get_all_blocks`.
+
+    The rich text of the block is reduced to its plain text, and the other fields of the
+    block content, such as the language of a code block, are kept in `content`. The raw JSON
+    of the block, without the children, is kept only if requested.
+    """
+
+    __slots__ = (
+        "id",
+        "type",
+        "parent_id",
+        "created_time",
+        "last_edited_time",
+        "has_children",
+        "archived",
+        "text",
+        "content",
+        "children",
+        "_raw",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        type: str,
+        parent_id: str | None,
+        created_time: str | None,
+        last_edited_time: str | None,
+        has_children: bool,
+        archived: bool,
+        text: str,
+        content: dict[str, Any] | None,
+        children: tuple["BlockRecord", ...] = (),
+        raw: bytes | None = None,
+    ):
+        self.id = id
+        self.type = type
+        self.parent_id = parent_id
+        self.created_time = created_time
+        self.last_edited_time = last_edited_time
+        self.has_children = has_children
+        self.archived = archived
+        self.text = text
+        self.content = content
+        self.children = children
+        self._raw = raw
+
+    @classmethod
+    def from_dict(cls, block: dict[str, Any], keep_raw: bool = False) -> "BlockRecord":
+        """
+        Make a record from a block object, including the nested `children`.
+
+        Parameters
+        ----------
+        block : dict[str, Any]
+            The block object.
+        keep_raw : bool, optional
+            Whether to keep the JSON of the block to restore it by `raw`, by default False.
+
+        Returns
+        -------
+        BlockRecord
+            The record of the block.
+        """
+        block_type = block["type"]
+        body = block.get(block_type)
+        text = ""
+        content: dict[str, Any] | None = None
+        if isinstance(body, dict):
+            text = "".join(item.get("plain_text", "") for item in body.get("rich_text", []))
+            content = {
+                sys.intern(key): value
+                for key, value in body.items()
+                if key not in ("rich_text", "children")
+            } or None
+
+        raw = None
+        if keep_raw:
+            raw = _encode_raw({key: value for key, value in block.items() if key != "children"})
+        return cls(
+            id=block["id"],
+            type=sys.intern(block_type),
+            parent_id=_parent_id(block.get("parent")),
+            created_time=block.get("created_time"),
+            last_edited_time=block.get("last_edited_time"),
+            has_children=bool(block.get("has_children")),
+            archived=bool(block.get("archived")),
+            text=text,
+            content=content,
+            children=tuple(
+                cls.from_dict(child, keep_raw=keep_raw) for child in block.get("children", [])
+            ),
+            raw=raw,
+        )
+
+    def __repr__(self) -> str:
+        return f"BlockRecord(id={self.id!r}, type={self.type!r}, text={self.text!r})"
+
+    @property
+    def raw(self) -> dict[str, Any] | None:
+        """The block object as returned by the API without the children, or None if it was
+        not kept."""
+        if self._raw is None:
+            return None
+        block: dict[str, Any] = json.loads(self._raw)
+        return block
+
+
+def to_block_records(blocks: list[dict[str, Any]], keep_raw: bool = False) -> list[BlockRecord]:
+    """
+    Convert the blocks returned by `get_all_blocks` to compact records.
+
+    Parameters
+    ----------
+    blocks : list[dict[str, Any]]
+        The blocks with the nested `children`.
+    keep_raw : bool, optional
+        Whether to keep the JSON of each block, by default False.
+
+    Returns
+    -------
+    list[BlockRecord]
+        The records of the top-level blocks, with the nested records in `children`.
+    """
+    return [BlockRecord.from_dict(block, keep_raw=keep_raw) for block in blocks]
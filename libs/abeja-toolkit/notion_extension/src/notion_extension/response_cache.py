@@ -0,0 +1,453 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any, NamedTuple
+
+from .cache import is_settled
+from .codec import JSONCodec
+from .steps import Blocking, Call, Steps
+
+# The total size of the cached responses above which the least recently used are evicted.
+DEFAULT_RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# The seconds for which a validated `last_edited_time` is trusted without another request.
+DEFAULT_VALIDATION_TTL = 10.0
+
+_CACHEABLE_PATH = re.compile(r"(?:blocks/([^/]+)/children)|(?:(?:pages|databases)/([^/]+))")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    object_id TEXT NOT NULL,
+    page_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+-- The total size is kept by the triggers so that no insert has to sum the sizes.
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total_size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats SELECT 0, COALESCE(SUM(size), 0) FROM responses;
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE stats SET total_size = total_size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN
+    UPDATE stats SET total_size = total_size + NEW.size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE stats SET total_size = total_size - OLD.size;
+END;
+"""
+
+
+class CacheKey(NamedTuple):
+    object_id: str
+    key: str
+    # Whether the response is the children of the object, whose version is that of the page
+    # containing the object, rather than the object itself.
+    children: bool
+
+
+class ResponseCache:
+    """
+    A persistent cache of the responses of the read endpoints, shared across processes
+    through a SQLite file.
+
+    The responses of `pages.retrieve` and `databases.retrieve` are stored with the
+    `last_edited_time` of the object, and the responses of `blocks.children.list` with the
+    `last_edited_time` of the page containing the block, since Notion updates it whenever any
+    block in the page is edited but does not update that of the parent blocks. A cached
+    response is returned only while the version is unchanged. The version is validated by
+    retrieving the page or the database as a block, which is a small response, and is then
+    trusted for `validation_ttl` seconds, so the children of all the blocks of an unchanged
+    page are served with a single request, e.g. when `get_all_blocks` is called again. Since
+    `last_edited_time` has the resolution of a minute, the responses of the objects edited in
+    the current minute are not stored.
+
+    Write requests sent by the client clear the trusted versions, so the client reads its own
+    writes. Changes made by others are seen after `validation_ttl` at the latest.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path to the SQLite file.
+    max_bytes : int, optional
+        The total size of the responses to keep. The least recently used responses are
+        evicted above it, by default DEFAULT_RESPONSE_CACHE_MAX_BYTES.
+    validation_ttl : float, optional
+        The seconds for which a validated `last_edited_time` is trusted, by default
+        DEFAULT_VALIDATION_TTL. 0 validates every cached response.
+
+    Examples
+    --------
+    >>> cache = ResponseCache(".cache/notion.db")
+    >>> client = Client(auth=token, response_cache=cache)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = DEFAULT_RESPONSE_CACHE_MAX_BYTES,
+        validation_ttl: float = DEFAULT_VALIDATION_TTL,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be greater than 0")
+        self.max_bytes = max_bytes
+        self.validation_ttl = validation_ttl
+        self.hits = 0
+        self.misses = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # The connection is shared by the threads of the client under the lock, and the
+        # processes sharing the file wait for each other's writes.
+        self.connection = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._versions: dict[str, tuple[str, float]] = {}
+        # The ID of the page containing each block seen in the responses.
+        self._pages: dict[str, str] = {}
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection to the SQLite file."""
+        with self._lock:
+            self.connection.close()
+
+    def match(
+        self, method: str, path: str, query: dict[Any, Any] | None, auth: str | None
+    ) -> CacheKey | None:
+        """
+        Get the cache key of a request, or None if the response of the request is not cached.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        path : str
+            The path of the endpoint, e.g. `blocks/{id}/children`.
+        query : dict[Any, Any] | None
+            The query parameters.
+        auth : str | None
+            The token of the request. Integrations can see different objects, so the responses
+            are cached per token.
+
+        Returns
+        -------
+        CacheKey | None
+            The key of the response.
+        """
+        if method != "GET":
+            return None
+        match = _CACHEABLE_PATH.fullmatch(path.strip("/"))
+        if match is None:
+            return None
+
+        children_of, object_id = match.groups()
+        params = sorted((str(key), str(value)) for key, value in (query or {}).items())
+        token = hashlib.sha256((auth or "").encode()).hexdigest()[:16]
+        key = f"{token} {path.strip('/')} {params}"
+        return CacheKey(object_id=children_of or object_id, key=key, children=bool(children_of))
+
+    def known_version(self, object_id: str) -> str | None:
+        """
+        Get the trusted `last_edited_time` of an object.
+
+        Parameters
+        ----------
+        object_id : str
+            The ID of the page, the database or the block.
+
+        Returns
+        -------
+        str | None
+            The `last_edited_time`, or None if it is not known or expired.
+        """
+        with self._lock:
+            entry = self._versions.get(object_id)
+        if entry is None or time.monotonic() - entry[1] > self.validation_ttl:
+            return None
+        return entry[0]
+
+    def remember(self, object_id: str, version: str) -> None:
+        """
+        Trust the `last_edited_time` of a page or a database just retrieved from the API.
+
+        Parameters
+        ----------
+        object_id : str
+            The ID of the page or the database.
+        version : str
+            The `last_edited_time` in the response.
+        """
+        with self._lock:
+            self._versions[object_id] = (version, time.monotonic())
+
+    def page_of(self, key: CacheKey) -> str | None:
+        """
+        Get the ID of the object whose `last_edited_time` validates the response.
+
+        Parameters
+        ----------
+        key : CacheKey
+            The key of the response.
+
+        Returns
+        -------
+        str | None
+            The ID of the object itself, or of the page containing the block whose children
+            are requested. None if the page is not known yet.
+        """
+        if not key.children:
+            return key.object_id
+        with self._lock:
+            page_id = self._pages.get(key.object_id)
+            if page_id is None:
+                row = self.connection.execute(
+                    "SELECT page_id FROM responses WHERE key = ?", (key.key,)
+                ).fetchone()
+                page_id = None if row is None else row[0]
+        return page_id
+
+    def locate(self, block: dict[str, Any]) -> str | None:
+        """
+        Record the page containing a block just retrieved from the API.
+
+        Parameters
+        ----------
+        block : dict[str, Any]
+            The block. A page retrieved as a block is a `child_page` block.
+
+        Returns
+        -------
+        str | None
+            The ID of the page containing the children of the block, or None if it is not
+            known.
+        """
+        if block.get("type") == "child_page":
+            self.remember(block["id"], block["last_edited_time"])
+            page_id: str | None = block["id"]
+        else:
+            parent = block.get("parent") or {}
+            with self._lock:
+                page_id = parent.get("page_id") or self._pages.get(parent.get("block_id", ""))
+        if page_id is not None:
+            with self._lock:
+                self._pages[block["id"]] = page_id
+        return page_id
+
+    def learn(self, key: CacheKey, response: dict[str, Any]) -> None:
+        """
+        Record the page containing the blocks in a response, so that their children can be
+        validated by the page.
+
+        Parameters
+        ----------
+        key : CacheKey
+            The key of the response.
+        response : dict[str, Any]
+            The response, fetched or validated.
+        """
+        with self._lock:
+            if not key.children:
+                if response.get("object") == "page":
+                    self._pages[key.object_id] = key.object_id
+                return
+            page_id = self._pages.get(key.object_id)
+            for block in response.get("results") or []:
+                parent = block.get("parent") or {}
+                if parent.get("type") == "page_id":
+                    page_id = self._pages[key.object_id] = parent["page_id"]
+                if block.get("type") == "child_page":
+                    # The children of a child page are in the child page.
+                    self._pages[block["id"]] = block["id"]
+                elif page_id is not None and block.get("type") != "child_database":
+                    self._pages[block["id"]] = page_id
+
+    def forget(self) -> None:
+        """Stop trusting the validated versions, e.g. after a write request."""
+        with self._lock:
+            self._versions.clear()
+
+    def contains(self, key: str) -> bool:
+        """Whether a response is stored for the key, in any version."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, key: str, version: str) -> bytes | None:
+        """
+        Get the response stored for the key if it has the version.
+
+        Parameters
+        ----------
+        key : str
+            The key of the response.
+        version : str
+            The current `last_edited_time` of the object.
+
+        Returns
+        -------
+        bytes | None
+            The encoded response, or None if it is not stored or stale.
+        """
+        with self._lock, self.connection:
+            row = self.connection.execute(
+                "SELECT body FROM responses WHERE key = ? AND version = ?", (key, version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self.hits += 1
+        body: bytes = row[0]
+        return body
+
+    def set(self, key: CacheKey, page_id: str, version: str, body: bytes) -> None:
+        """
+        Store a response, unless the version is in the current minute, evicting the least
+        recently used responses over `max_bytes`.
+
+        Parameters
+        ----------
+        key : CacheKey
+            The key of the response.
+        page_id : str
+            The ID of the object whose version validates the response, from `page_of`.
+        version : str
+            The `last_edited_time` of the object, retrieved before the response was made.
+        body : bytes
+            The encoded response.
+        """
+        if len(body) > self.max_bytes or not is_settled(version):
+            return
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO responses "
+                "(key, object_id, page_id, version, body, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "page_id = excluded.page_id, version = excluded.version, body = excluded.body, "
+                "size = excluded.size, accessed_at = excluded.accessed_at",
+                (key.key, key.object_id, page_id, version, body, len(body), time.time()),
+            )
+            total = self._total_size()
+            if total > self.max_bytes:
+                self._evict(total - self.max_bytes)
+
+    def _total_size(self) -> int:
+        total: int = self.connection.execute("SELECT total_size FROM stats").fetchone()[0]
+        return total
+
+    def _evict(self, excess: int) -> None:
+        freed = 0
+        keys = []
+        for key, size in self.connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            if freed >= excess:
+                break
+            keys.append((key,))
+            freed += size
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", keys)
+
+    def clear(self) -> None:
+        """Remove all responses."""
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+        self.forget()
+
+    @property
+    def size(self) -> int:
+        """The total size of the stored responses in bytes."""
+        with self._lock:
+            return self._total_size()
+
+
+def cached_request(
+    cache: ResponseCache,
+    codec: JSONCodec,
+    key: CacheKey,
+    path: str,
+    method: str,
+    query: dict[Any, Any] | None,
+    auth: str | None,
+) -> Steps[Any]:
+    """
+    Serve a read request from the cache while it is valid, or send it and store the response.
+
+    Parameters
+    ----------
+    cache : ResponseCache
+        The response cache.
+    codec : JSONCodec
+        The codec encoding the stored responses.
+    key : CacheKey
+        The key of the request from `ResponseCache.match`.
+    path : str
+        The path of the endpoint.
+    method : str
+        The HTTP method.
+    query : dict[Any, Any] | None
+        The query parameters.
+    auth : str | None
+        The token of the request.
+
+    Returns
+    -------
+    Steps[Any]
+        The procedure returning the response.
+    """
+    page_id = yield Blocking(cache.page_of, (key,))
+    if page_id is None:
+        block = yield Call(
+            "_send_request", {"path": f"blocks/{key.object_id}", "method": "GET", "auth": auth}
+        )
+        page_id = cache.locate(block)
+    version = None if page_id is None else cache.known_version(page_id)
+    # The version of the children is known only from the page, which is retrieved before
+    # the children so that an edit in between makes the stored version stale, not newer.
+    if page_id is not None and version is None:
+        if key.children or (yield Blocking(cache.contains, (key.key,))):
+            page = yield Call(
+                "_send_request", {"path": f"blocks/{page_id}", "method": "GET", "auth": auth}
+            )
+            version = page["last_edited_time"]
+            cache.remember(page_id, version)
+    if version is not None:
+        content = yield Blocking(cache.get, (key.key, version))
+        if content is not None:
+            response = codec.loads(content)
+            cache.learn(key, response)
+            return response
+
+    response = yield Call(
+        "_send_request", {"path": path, "method": method, "query": query, "auth": auth}
+    )
+    cache.learn(key, response)
+    if not key.children and "last_edited_time" in response:
+        version = response["last_edited_time"]
+        cache.remember(key.object_id, version)
+    if page_id is not None and version is not None:
+        yield Blocking(cache.set, (key, page_id, version, codec.dumps(response)))
+    return response
@@ -0,0 +1,204 @@
+from datetime import datetime, timezone
+from typing import Any, Iterable, Literal
+
+# Compound filters of the database query can be nested at most two levels.
+# See: https://developers.notion.com/reference/post-database-query-filter#compound-filter-conditions
+MAX_COMPOUND_FILTER_DEPTH = 2
+
+
+def _flatten_filter(f: dict[str, Any]) -> dict[str, Any]:
+    """Flatten the compound filters nested directly in a compound filter of the same kind."""
+    for key in ("and", "or"):
+        if list(f) == [key]:
+            conditions = []
+            for condition in f[key]:
+                condition = _flatten_filter(condition)
+                if list(condition) == [key]:
+                    conditions.extend(condition[key])
+                else:
+                    conditions.append(condition)
+            return {key: conditions}
+    return f
+
+
+def _compound_depth(f: dict[str, Any]) -> int:
+    for key in ("and", "or"):
+        if list(f) == [key]:
+            return 1 + max((_compound_depth(condition) for condition in f[key]), default=0)
+    return 0
+
+
+def combine_filters(*filters: dict[str, Any] | None) -> dict[str, Any] | None:
+    """
+    Combine the filters of the database query with `and`. Compound filters nested in a
+    compound filter of the same kind, e.g. `and` in `and`, are flattened to keep the nesting
+    within the limit of the API.
+
+    Parameters
+    ----------
+    *filters : dict[str, Any] | None
+        The filters. None is ignored.
+
+    Returns
+    -------
+    dict[str, Any] | None
+        The combined filter, or None if no filter is given.
+
+    Raises
+    ------
+    ValueError
+        If the combined filter still nests compound filters deeper than
+        MAX_COMPOUND_FILTER_DEPTH, e.g. an `or` of `and` filters combined with another filter.
+    """
+    conditions: list[dict[str, Any]] = []
+    for f in filters:
+        if not f:
+            continue
+        f = _flatten_filter(f)
+        if list(f) == ["and"]:
+            conditions.extend(f["and"])
+        else:
+            conditions.append(f)
+
+    if not conditions:
+        return None
+    combined = conditions[0] if len(conditions) == 1 else {"and": conditions}
+    depth = _compound_depth(combined)
+    if depth > MAX_COMPOUND_FILTER_DEPTH:
+        raise ValueError(
+            f"The combined filter nests compound filters {depth} levels deep, but the API "
+            f"allows at most {MAX_COMPOUND_FILTER_DEPTH}. Simplify the filter or the shards."
+        )
+    return combined
+
+
+def _format_timestamp(value: datetime | str) -> str:
+    if isinstance(value, str):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def split_time_range(start: datetime, end: datetime, num_partitions: int) -> list[str]:
+    """
+    Split the time range into equal intervals and return the boundaries between them.
+
+    Parameters
+    ----------
+    start : datetime
+        The start of the range, e.g. the creation time of the database. Naive datetimes are
+        regarded as UTC.
+    end : datetime
+        The end of the range, e.g. the current time.
+    num_partitions : int
+        The number of intervals.
+
+    Returns
+    -------
+    list[str]
+        The `num_partitions - 1` boundaries in ISO 8601, which can be passed to
+        `partition_by_timestamp`.
+    """
+    if num_partitions < 1:
+        raise ValueError("num_partitions must be greater than 0")
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+
+    step = (end - start) / num_partitions
+    return [_format_timestamp(start + step * i) for i in range(1, num_partitions)]
+
+
+def partition_by_timestamp(
+    boundaries: Iterable[datetime | str],
+    timestamp: Literal["created_time", "last_edited_time"] = "created_time",
+) -> list[dict[str, Any]]:
+    """
+    Make disjoint filters which cover all pages by splitting the timestamp at the boundaries.
+
+    Parameters
+    ----------
+    boundaries : Iterable[datetime | str]
+        The boundaries in ascending order. Strings must be ISO 8601 timestamps.
+    timestamp : Literal["created_time", "last_edited_time"], optional
+        The timestamp to split, by default "created_time". The `last_edited_time` of a page
+        can change during the query and move the page to another partition, so
+        `created_time` is preferred.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The `len(boundaries) + 1` filters from the oldest to the newest partition.
+    """
+    bounds = [_format_timestamp(boundary) for boundary in boundaries]
+    if bounds != sorted(bounds):
+        raise ValueError("boundaries must be in ascending order")
+
+    partitions = []
+    lower: str | None = None
+    for upper in [*bounds, None]:
+        conditions = []
+        if lower is not None:
+            conditions.append({"timestamp": timestamp, timestamp: {"on_or_after": lower}})
+        if upper is not None:
+            conditions.append({"timestamp": timestamp, timestamp: {"before": upper}})
+        # Without boundaries, the only partition is the empty filter matching all pages.
+        partitions.append(combine_filters(*conditions) or {})
+        lower = upper
+    return partitions
+
+
+def partition_by_select(database: dict[str, Any], property_name: str) -> list[dict[str, Any]]:
+    """
+    Make disjoint filters which cover all pages by the options of a select or status property,
+    plus the pages where the property is empty.
+
+    Parameters
+    ----------
+    database : dict[str, Any]
+        The database object returned by `client.databases.retrieve`, which has the options.
+    property_name : str
+        The name of the select or status property.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        A filter per option and the filter of the empty property.
+    """
+    prop = database["properties"][property_name]
+    prop_type = prop["type"]
+    if prop_type not in ("select", "status"):
+        raise ValueError(f"{property_name} is a {prop_type} property, not select or status")
+
+    partitions: list[dict[str, Any]] = [
+        {"property": property_name, prop_type: {"equals": option["name"]}}
+        for option in prop[prop_type]["options"]
+    ]
+    partitions.append({"property": property_name, prop_type: {"is_empty": True}})
+    return partitions
+
+
+def merge_shards(shards: Iterable[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """
+    Concatenate the pages of the shards, dropping the pages seen in the earlier shards.
+
+    Parameters
+    ----------
+    shards : Iterable[list[dict[str, Any]]]
+        The pages of each partition.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The unique pages in the order of the shards.
+    """
+    seen: set[str] = set()
+    pages = []
+    for shard in shards:
+        for page in shard:
+            if page["id"] not in seen:
+                seen.add(page["id"])
+                pages.append(page)
+    return pages
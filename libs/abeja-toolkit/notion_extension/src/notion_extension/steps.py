@@ -0,0 +1,95 @@
+import asyncio
+import operator
+from typing import Any, Callable, Generator, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Call(NamedTuple):
+    """A call of a method of the client, e.g. `blocks.children.append`, which is awaited by
+    `AsyncClient`."""
+
+    name: str
+    kwargs: dict[str, Any]
+
+
+class Blocking(NamedTuple):
+    """A call of a blocking function, which `AsyncClient` runs in a thread not to stall the
+    event loop."""
+
+    function: Callable[..., Any]
+    args: tuple[Any, ...]
+
+
+Step = Call | Blocking
+# A procedure shared by `Client` and `AsyncClient`, written once as a generator which yields
+# the steps doing I/O and receives their results. The clients differ only in how they run
+# the steps, by `run_steps` or `arun_steps`.
+Steps = Generator[Step, Any, T]
+
+
+def run_steps(client: Any, steps: Steps[T]) -> T:
+    """
+    Run a procedure by calling the methods of a synchronous client.
+
+    Parameters
+    ----------
+    client : Any
+        The client whose methods the `Call` steps name.
+    steps : Steps[T]
+        The procedure.
+
+    Returns
+    -------
+    T
+        The return value of the procedure.
+    """
+    result: Any = None
+    error: Exception | None = None
+    while True:
+        try:
+            step = steps.send(result) if error is None else steps.throw(error)
+        except StopIteration as stop:
+            return stop.value  # type: ignore[no-any-return]
+        error = None
+        try:
+            if isinstance(step, Call):
+                result = operator.attrgetter(step.name)(client)(**step.kwargs)
+            else:
+                result = step.function(*step.args)
+        except Exception as step_error:
+            # The procedure can handle the error as if it had made the call itself.
+            error = step_error
+
+
+async def arun_steps(client: Any, steps: Steps[T]) -> T:
+    """
+    Run a procedure by awaiting the methods of an asynchronous client.
+
+    Parameters
+    ----------
+    client : Any
+        The client whose methods the `Call` steps name.
+    steps : Steps[T]
+        The procedure.
+
+    Returns
+    -------
+    T
+        The return value of the procedure.
+    """
+    result: Any = None
+    error: Exception | None = None
+    while True:
+        try:
+            step = steps.send(result) if error is None else steps.throw(error)
+        except StopIteration as stop:
+            return stop.value  # type: ignore[no-any-return]
+        error = None
+        try:
+            if isinstance(step, Call):
+                result = await operator.attrgetter(step.name)(client)(**step.kwargs)
+            else:
+                result = await asyncio.to_thread(step.function, *step.args)
+        except Exception as step_error:
+            error = step_error
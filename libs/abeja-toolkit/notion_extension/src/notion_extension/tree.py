@@ -0,0 +1,429 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator
+
+from .cache import children_version
+
+
+class _Loader:
+    """The shared state of a lazy tree: how to fetch children and the prefetcher."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str | None], list[dict[str, Any]]],
+        executor: ThreadPoolExecutor | None,
+    ):
+        self.fetch = fetch
+        self.executor = executor
+
+    def wrap(self, blocks: list[dict[str, Any]], version: str | None) -> list["BlockNode"]:
+        nodes = [BlockNode(block, self, version) for block in blocks]
+        if self.executor is not None:
+            for node in nodes:
+                node.prefetch()
+        return nodes
+
+
+class BlockNode:
+    """
+    A block whose children are fetched on the first access to `children` and then kept.
+
+    The node is created by `Client.get_block_tree`, and is not meant to be shared between
+    threads.
+
+    Attributes
+    ----------
+    block : dict[str, Any]
+        The block object returned by the API, without the `children` key.
+    """
+
+    def __init__(self, block: dict[str, Any], loader: _Loader, version: str | None = None):
+        self.block = {key: value for key, value in block.items() if key != "children"}
+        self._loader = loader
+        # The version of the page validating the cached children of the block.
+        self._version = children_version(block, version)
+        self._children: list[BlockNode] | None = None
+        self._future: Future[list[dict[str, Any]]] | None = None
+        if not self.has_children:
+            self._children = []
+
+    def __repr__(self) -> str:
+        return f"BlockNode(id={self.id!r}, type={self.type!r}, loaded={self.is_loaded})"
+
+    @property
+    def id(self) -> str:
+        """The ID of the block."""
+        block_id: str = self.block["id"]
+        return block_id
+
+    @property
+    def type(self) -> str:
+        """The type of the block, e.g. paragraph."""
+        block_type: str = self.block["type"]
+        return block_type
+
+    @property
+    def has_children(self) -> bool:
+        """Whether the block has children, known without fetching them."""
+        return bool(self.block.get("has_children"))
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the children have been fetched."""
+        return self._children is not None
+
+    @property
+    def children(self) -> list["BlockNode"]:
+        """The children of the block, fetched on the first access."""
+        if self._children is None:
+            # The prefetch is cancelled when the tree is closed.
+            if self._future is not None and not self._future.cancelled():
+                blocks = self._future.result()
+            else:
+                blocks = self._loader.fetch(self.id, self._version)
+            self._children = self._loader.wrap(blocks, self._version)
+        return self._children
+
+    def prefetch(self) -> None:
+        """Start fetching the children in the background if the tree has a prefetcher."""
+        executor = self._loader.executor
+        if self._children is None and self._future is None and executor is not None:
+            self._future = executor.submit(self._loader.fetch, self.id, self._version)
+
+    def walk(self, max_depth: int | None = None) -> Generator["BlockNode", None, None]:
+        """
+        Iterate over the descendants in depth-first order, fetching the children on the way.
+
+        Parameters
+        ----------
+        max_depth : int | None, optional
+            The depth of the deepest descendants to visit, where the children are at depth 1.
+            Deeper blocks are not fetched. If None, the whole subtree is visited, by default
+            None.
+
+        Yields
+        ------
+        BlockNode
+            The descendant.
+        """
+        if max_depth is not None and max_depth < 1:
+            return
+        for child in self.children:
+            yield child
+            yield from child.walk(None if max_depth is None else max_depth - 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the node to a block object in the same form as `get_all_blocks`, fetching
+        the whole subtree.
+
+        Returns
+        -------
+        dict[str, Any]
+            The block object with the nested `children` key if it has children.
+        """
+        block = dict(self.block)
+        if self.has_children:
+            block["children"] = [child.to_dict() for child in self.children]
+        return block
+
+
+class BlockTree:
+    """
+    The lazy block tree of a page returned by `Client.get_block_tree`.
+
+    Only the top-level blocks are fetched when the tree is created. The children of each
+    block are fetched on the first access to `BlockNode.children`, so reading a part of a
+    large page costs only the requests for that part. With prefetching, whenever a level of
+    blocks is accessed, the children of all its blocks are fetched in the background, which
+    hides the latency of the next level at the cost of requests which may not be needed.
+
+    Close the tree, or use it as a context manager, to stop the prefetching threads.
+
+    Attributes
+    ----------
+    page_id : str
+        The ID of the page.
+    children : list[BlockNode]
+        The top-level blocks of the page.
+    """
+
+    def __init__(
+        self,
+        page_id: str,
+        children: list[dict[str, Any]],
+        fetch: Callable[[str, str | None], list[dict[str, Any]]],
+        version: str | None = None,
+        executor: ThreadPoolExecutor | None = None,
+    ):
+        self.page_id = page_id
+        self._loader = _Loader(fetch, executor)
+        self.children = self._loader.wrap(children, version)
+
+    def __enter__(self) -> "BlockTree":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the prefetching threads. Pending prefetches are cancelled."""
+        executor = self._loader.executor
+        if executor is not None:
+            self._loader.executor = None
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def walk(self, max_depth: int | None = None) -> Generator[BlockNode, None, None]:
+        """
+        Iterate over the blocks of the page in depth-first order, fetching the children on
+        the way.
+
+        Parameters
+        ----------
+        max_depth : int | None, optional
+            The depth of the deepest blocks to visit, where the top-level blocks are at depth
+            1. Deeper blocks are not fetched. If None, all blocks are visited, by default None.
+
+        Yields
+        ------
+        BlockNode
+            The block.
+        """
+        if max_depth is not None and max_depth < 1:
+            return
+        for child in self.children:
+            yield child
+            yield from child.walk(None if max_depth is None else max_depth - 1)
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """
+        Fetch the whole tree and convert it to the same form as `get_all_blocks`.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            The list of blocks of the page.
+        """
+        return [child.to_dict() for child in self.children]
+
+
+class _AsyncLoader:
+    def __init__(
+        self,
+        fetch: Callable[[str, str | None], Awaitable[list[dict[str, Any]]]],
+        semaphore: asyncio.Semaphore | None,
+    ):
+        self.fetch = fetch
+        self.semaphore = semaphore
+        self.tasks: set[asyncio.Task[list[dict[str, Any]]]] = set()
+
+    async def load(self, block_id: str, version: str | None) -> list[dict[str, Any]]:
+        if self.semaphore is None:
+            return await self.fetch(block_id, version)
+        async with self.semaphore:
+            return await self.fetch(block_id, version)
+
+    def wrap(self, blocks: list[dict[str, Any]], version: str | None) -> list["AsyncBlockNode"]:
+        nodes = [AsyncBlockNode(block, self, version) for block in blocks]
+        if self.semaphore is not None:
+            for node in nodes:
+                node.prefetch()
+        return nodes
+
+
+class AsyncBlockNode:
+    """
+    A block whose children are fetched on the first call of `get_children` and then kept.
+    The asynchronous version of `BlockNode`, created by `AsyncClient.get_block_tree`.
+
+    Attributes
+    ----------
+    block : dict[str, Any]
+        The block object returned by the API, without the `children` key.
+    """
+
+    def __init__(self, block: dict[str, Any], loader: _AsyncLoader, version: str | None = None):
+        self.block = {key: value for key, value in block.items() if key != "children"}
+        self._loader = loader
+        self._version = children_version(block, version)
+        self._children: list[AsyncBlockNode] | None = None
+        self._task: asyncio.Task[list[dict[str, Any]]] | None = None
+        if not self.has_children:
+            self._children = []
+
+    def __repr__(self) -> str:
+        return f"AsyncBlockNode(id={self.id!r}, type={self.type!r}, loaded={self.is_loaded})"
+
+    @property
+    def id(self) -> str:
+        """The ID of the block."""
+        block_id: str = self.block["id"]
+        return block_id
+
+    @property
+    def type(self) -> str:
+        """The type of the block, e.g. paragraph."""
+        block_type: str = self.block["type"]
+        return block_type
+
+    @property
+    def has_children(self) -> bool:
+        """Whether the block has children, known without fetching them."""
+        return bool(self.block.get("has_children"))
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the children have been fetched."""
+        return self._children is not None
+
+    async def get_children(self) -> list["AsyncBlockNode"]:
+        """
+        Get the children of the block, fetching them on the first call.
+
+        Returns
+        -------
+        list[AsyncBlockNode]
+            The children of the block.
+        """
+        if self._children is None:
+            # The prefetch is cancelled when the tree is closed.
+            if self._task is None or self._task.cancelled():
+                self._task = asyncio.ensure_future(self._loader.load(self.id, self._version))
+            blocks = await self._task
+            if self._children is None:
+                self._children = self._loader.wrap(blocks, self._version)
+        return self._children
+
+    def prefetch(self) -> None:
+        """Start fetching the children in a task if the tree has a prefetcher."""
+        if self._children is None and self._task is None and self._loader.semaphore is not None:
+            self._task = asyncio.ensure_future(self._loader.load(self.id, self._version))
+            self._loader.tasks.add(self._task)
+            self._task.add_done_callback(self._loader.tasks.discard)
+
+    async def walk(self, max_depth: int | None = None) -> AsyncGenerator["AsyncBlockNode", None]:
+        """
+        Iterate over the descendants in depth-first order, fetching the children on the way.
+
+        Parameters
+        ----------
+        max_depth : int | None, optional
+            The depth of the deepest descendants to visit, where the children are at depth 1.
+            If None, the whole subtree is visited, by default None.
+
+        Yields
+        ------
+        AsyncBlockNode
+            The descendant.
+        """
+        if max_depth is not None and max_depth < 1:
+            return
+        for child in await self.get_children():
+            yield child
+            async for descendant in child.walk(None if max_depth is None else max_depth - 1):
+                yield descendant
+
+    async def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the node to a block object in the same form as `get_all_blocks`, fetching
+        the whole subtree.
+
+        Returns
+        -------
+        dict[str, Any]
+            The block object with the nested `children` key if it has children.
+        """
+        block = dict(self.block)
+        if self.has_children:
+            children = await self.get_children()
+            block["children"] = await asyncio.gather(*(child.to_dict() for child in children))
+        return block
+
+
+class AsyncBlockTree:
+    """
+    The lazy block tree of a page returned by `AsyncClient.get_block_tree`. The asynchronous
+    version of `BlockTree`, whose prefetches run as tasks in the event loop.
+
+    Close the tree with `aclose`, or use it as an async context manager, to cancel the
+    outstanding prefetches.
+
+    Attributes
+    ----------
+    page_id : str
+        The ID of the page.
+    children : list[AsyncBlockNode]
+        The top-level blocks of the page.
+    """
+
+    def __init__(
+        self,
+        page_id: str,
+        children: list[dict[str, Any]],
+        fetch: Callable[[str, str | None], Awaitable[list[dict[str, Any]]]],
+        version: str | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ):
+        self.page_id = page_id
+        self._loader = _AsyncLoader(fetch, semaphore)
+        self.children = self._loader.wrap(children, version)
+
+    async def __aenter__(self) -> "AsyncBlockTree":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop prefetching. Outstanding prefetches are cancelled, and the children which
+        were not fetched are fetched on access as without prefetching."""
+        self._loader.semaphore = None
+        tasks = list(self._loader.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def walk(self, max_depth: int | None = None) -> AsyncGenerator[AsyncBlockNode, None]:
+        """
+        Iterate over the blocks of the page in depth-first order, fetching the children on
+        the way.
+
+        Parameters
+        ----------
+        max_depth : int | None, optional
+            The depth of the deepest blocks to visit, where the top-level blocks are at depth
+            1. If None, all blocks are visited, by default None.
+
+        Yields
+        ------
+        AsyncBlockNode
+            The block.
+        """
+        if max_depth is not None and max_depth < 1:
+            return
+        for child in self.children:
+            yield child
+            async for descendant in child.walk(None if max_depth is None else max_depth - 1):
+                yield descendant
+
+    async def to_list(self) -> list[dict[str, Any]]:
+        """
+        Fetch the whole tree and convert it to the same form as `get_all_blocks`.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            The list of blocks of the page.
+        """
+        return list(await asyncio.gather(*(child.to_dict() for child in self.children)))
@@ -0,0 +1,59 @@
+from typing import Any
+
+from .db_properties import Properties
+from .diff import _canonical_rich_text
+
+
+def _comparable_value(prop_type: str, value: Any) -> Any:
+    """Reduce a property value in a request or a response to what is visible in Notion."""
+    if prop_type in ("title", "rich_text"):
+        return _canonical_rich_text(value or [])
+    if prop_type in ("select", "status"):
+        return value.get("name") if value else None
+    if prop_type == "multi_select":
+        return [option["name"] for option in value or []]
+    if prop_type == "people":
+        return [person["id"] for person in value or []]
+    if prop_type == "relation":
+        return [page["id"] for page in value or []]
+    if prop_type == "date":
+        return (value["start"], value.get("end")) if value else None
+    if prop_type == "checkbox":
+        return bool(value)
+    return value
+
+
+def changed_properties(page: dict[str, Any], properties: Properties) -> dict[str, Any]:
+    """
+    Select the properties whose desired values differ from the current values of the page.
+
+    The values are compared by what is visible in Notion, e.g. the names of the select
+    options and the text with its styles, so that the fields which the API adds to the
+    responses, such as option IDs and colors, are not regarded as changes. A property which
+    the page doesn't have, e.g. because it was excluded by `filter_properties`, is regarded
+    as changed.
+
+    Parameters
+    ----------
+    page : dict[str, Any]
+        The last known page object, e.g. from a database query or `DatabaseMirror.get`.
+    properties : Properties
+        The desired properties.
+
+    Returns
+    -------
+    dict[str, Any]
+        The formatted properties which need to be updated. Empty if nothing changed.
+    """
+    current = page.get("properties", {})
+    changed = {}
+    for prop in properties.properties:
+        payload = prop.format()[prop.name]
+        existing = current.get(prop.name)
+        if existing is None or existing.get("type") != prop.type:
+            changed[prop.name] = payload
+        elif _comparable_value(prop.type, existing.get(prop.type)) != _comparable_value(
+            prop.type, payload.get(prop.type)
+        ):
+            changed[prop.name] = payload
+    return changed
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+# Users of the workspace rarely change, so the directory is refreshed once an hour by default.
+DEFAULT_USER_CACHE_TTL = 3600.0
+
+
+class UserNotFoundError(KeyError, IndexError):
+    """
+    The error raised when no user in the workspace has the email. It is also an `IndexError`,
+    which `get_user_info` raised before the users were indexed.
+    """
+
+
+class UserDirectory:
+    """
+    A cache of the users in the workspace indexed by email address.
+
+    The directory is filled by the whole user list fetched from the API, and looking up a user
+    by email is a dictionary access. Emails are matched case-insensitively. Once `ttl`
+    seconds have passed since the last update, the directory is regarded as expired and
+    should be filled again by the client.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        The number of seconds the users are regarded as fresh, by default DEFAULT_USER_CACHE_TTL.
+    cache_path : str | Path | None, optional
+        The path to the JSON file to persist the users. If given, the users saved by the
+        previous process are loaded on instantiation, by default None.
+    auth : str | None, optional
+        The token of the integration. Integrations can be in different workspaces, so the
+        users are persisted to a file per token, named with a hash of the token after the
+        stem of `cache_path`, by default None.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_USER_CACHE_TTL,
+        cache_path: str | Path | None = None,
+        auth: str | None = None,
+    ):
+        self.ttl = ttl
+        self.cache_path = None
+        if cache_path is not None:
+            cache_path = Path(cache_path)
+            token = hashlib.sha256((auth or "").encode()).hexdigest()[:16]
+            self.cache_path = cache_path.with_name(f"{cache_path.stem}.{token}{cache_path.suffix}")
+
+        self._users_by_email: dict[str, dict[str, Any]] = {}
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+
+        if self.cache_path is not None and self.cache_path.exists():
+            self._load()
+
+    @staticmethod
+    def _normalize(email: str) -> str:
+        return email.strip().lower()
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether the users should be fetched again."""
+        return self._fetched_at is None or time.time() - self._fetched_at >= self.ttl
+
+    def update(self, users: Iterable[dict[str, Any]]) -> None:
+        """
+        Replace the cached users and save them to the cache file if it is set.
+
+        Parameters
+        ----------
+        users : Iterable[dict[str, Any]]
+            The user objects of the workspace.
+        """
+        users_by_email = {}
+        for user in users:
+            email = (user.get("person") or {}).get("email")
+            if email:
+                users_by_email[self._normalize(email)] = user
+
+        with self._lock:
+            self._users_by_email = users_by_email
+            self._fetched_at = time.time()
+
+        if self.cache_path is not None:
+            self._save()
+
+    def get(self, email: str) -> dict[str, Any] | None:
+        """
+        Look up a user by email.
+
+        Parameters
+        ----------
+        email : str
+            The email of the user.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            The user object, or None if the user is not found.
+        """
+        return self._users_by_email.get(self._normalize(email))
+
+    def invalidate(self) -> None:
+        """Mark the cached users as expired so that they are fetched on the next lookup."""
+        with self._lock:
+            self._fetched_at = None
+
+    def _load(self) -> None:
+        assert self.cache_path is not None
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        self._users_by_email = data.get("users", {})
+        self._fetched_at = data.get("fetched_at")
+
+    def _save(self) -> None:
+        assert self.cache_path is not None
+        with self._lock:
+            data = {"fetched_at": self._fetched_at, "users": self._users_by_email}
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that other processes never read a partial file.
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
@@ -1,23 +1,8 @@
 from typing import Any, Generator
 
 
-def block2markdown(block: dict[str, Any], level: int = 0) -> str:
-    """
-    Convert a Notion block to markdown format.
-
-    Parameters
-    ----------
-    block : dict[str, Any]
-        The Notion block to convert.
-    level : int, optional
-        The indentation level of the block, by default 0.
-
-    Returns
-    -------
-    str
-        The markdown representation of the Notion block.
-
-    """
+def _markdown_head(block: dict[str, Any], level: int = 0) -> str:
+    """The markdown of the block written before its children."""
     indent = "  " * level
     markdown = indent
     if block["type"] == "heading_1":
@@ -109,11 +94,12 @@ def block2markdown(block: dict[str, Any], level: int = 0) -> str:
         markdown += "$" + expression + "$\n"
     elif block["type"] == "divider":
         markdown += "---\n"
+    return markdown
 
-    if block.get("children", []):
-        for child in block["children"]:
-            markdown += block2markdown(child, level=level + 1)
 
+def _markdown_tail(block: dict[str, Any], level: int = 0) -> str:
+    """The markdown of the block written after its children."""
+    markdown = ""
     if block["type"] == "toggle":
         markdown += "</details>\n"
 
@@ -123,6 +109,32 @@ def block2markdown(block: dict[str, Any], level: int = 0) -> str:
     return markdown
 
 
+def block2markdown(block: dict[str, Any], level: int = 0) -> str:
+    """
+    Convert a Notion block to markdown format.
+
+    Parameters
+    ----------
+    block : dict[str, Any]
+        The Notion block to convert.
+    level : int, optional
+        The indentation level of the block, by default 0.
+
+    Returns
+    -------
+    str
+        The markdown representation of the Notion block.
+
+    """
+    markdown = _markdown_head(block, level)
+
+    if block.get("children", []):
+        for child in block["children"]:
+            markdown += block2markdown(child, level=level + 1)
+
+    return markdown + _markdown_tail(block, level)
+
+
 def blocks2markdown(blocks: list[dict[str, Any]]) -> str:
     markdown = ""
     for block in blocks:
@@ -0,0 +1,57 @@
+from typing import Any, Callable
+
+import httpx
+import pytest
+from notion_extension import AsyncClient, Client, RateLimiter
+from notion_extension.mock_server import (
+    AsyncMockTransport,
+    MockNotionBackend,
+    MockTransport,
+    MockWorkspace,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("notion_extension.ratelimit.backoff_delay", lambda attempt: 0.0)
+
+
+@pytest.fixture
+def backend() -> MockNotionBackend:
+    return MockNotionBackend()
+
+
+@pytest.fixture
+def workspace(backend: MockNotionBackend) -> MockWorkspace:
+    return backend.seed_workspace(pages_per_database=3, blocks_per_page=5, depth=2, fanout=2)
+
+
+@pytest.fixture
+def make_client(backend: MockNotionBackend) -> Callable[..., Client]:
+    def make(transport: httpx.BaseTransport | None = None, **kwargs: Any) -> Client:
+        kwargs.setdefault("auth", "secret")
+        return Client(
+            client=httpx.Client(transport=transport or MockTransport(backend)),
+            rate_limiter=RateLimiter(rate=10000, burst=100),
+            **kwargs,
+        )
+
+    return make
+
+
+@pytest.fixture
+def make_async_client(backend: MockNotionBackend) -> Callable[..., AsyncClient]:
+    def make(transport: httpx.AsyncBaseTransport | None = None, **kwargs: Any) -> AsyncClient:
+        kwargs.setdefault("auth", "secret")
+        return AsyncClient(
+            client=httpx.AsyncClient(transport=transport or AsyncMockTransport(backend)),
+            rate_limiter=RateLimiter(rate=10000, burst=100),
+            **kwargs,
+        )
+
+    return make
+
+
+@pytest.fixture
+def client(make_client: Callable[..., Client]) -> Client:
+    return make_client()
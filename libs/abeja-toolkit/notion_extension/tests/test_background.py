@@ -0,0 +1,100 @@
+import inspect
+import threading
+from typing import Any, Callable
+
+import httpx
+import pytest
+from notion_extension import BackgroundClient, Client, RateLimiter, RequestMetrics
+from notion_extension.mock_server import AsyncMockTransport, MockNotionBackend, MockWorkspace
+
+
+@pytest.fixture
+def make_background(backend: MockNotionBackend) -> Callable[..., BackgroundClient]:
+    def make(**kwargs: Any) -> BackgroundClient:
+        return BackgroundClient(
+            auth="secret",
+            client=httpx.AsyncClient(transport=AsyncMockTransport(backend)),
+            rate_limiter=RateLimiter(rate=10000, burst=100),
+            **kwargs,
+        )
+
+    return make
+
+
+def test_methods_have_the_parameters_of_client() -> None:
+    names = [
+        name
+        for name, method in vars(Client).items()
+        if callable(method) and not name.startswith("_") and name != "get_block_tree"
+    ]
+
+    for name in names:
+        expected = list(inspect.signature(getattr(Client, name)).parameters)
+        assert list(inspect.signature(getattr(BackgroundClient, name)).parameters) == expected
+
+
+def test_methods_run_in_the_background_loop(
+    workspace: MockWorkspace,
+    client: Client,
+    make_background: Callable[..., BackgroundClient],
+) -> None:
+    metrics = RequestMetrics()
+    threads: set[str] = set()
+    metrics.add_hook(lambda event: threads.add(threading.current_thread().name))
+    page_id = workspace.page_ids[0]
+
+    with make_background(metrics=metrics) as background:
+        assert background.get_all_blocks(page_id, max_workers=4) == client.get_all_blocks(page_id)
+        assert background.pages.retrieve(page_id=page_id) == client.pages.retrieve(page_id=page_id)
+        assert background.blocks.children.list(block_id=page_id)["results"]
+        assert background.search(query="")["results"]
+        assert background.get_user_info("user0@example.com")["id"] == workspace.user_ids[0]
+        with pytest.raises(ValueError, match="max_workers"):
+            background.get_entire_database(workspace.database_ids[0], max_workers=0)
+
+    assert threads == {"notion-extension-loop"}
+
+
+def test_iterators_pull_the_async_generators(
+    workspace: MockWorkspace, client: Client, make_background: Callable[..., BackgroundClient]
+) -> None:
+    database_id = workspace.database_ids[0]
+
+    with make_background() as background:
+        assert list(background.iter_database(database_id)) == client.get_entire_database(
+            database_id
+        )
+        assert list(background.iter_users()) == client.get_all_users()
+        # Stopping early closes the async generator in the loop.
+        rows = background.iter_database(database_id)
+        assert next(rows)["id"] == workspace.page_ids[0]
+        rows.close()
+
+
+def test_close_stops_the_loop(
+    workspace: MockWorkspace, make_background: Callable[..., BackgroundClient]
+) -> None:
+    background = make_background()
+    background.get_all_users()
+
+    background.close()
+    background.close()
+
+    assert not background._thread.is_alive()
+    assert background.async_client.client.is_closed
+    with pytest.raises(RuntimeError, match="closed"):
+        background.get_all_users()
+
+
+def test_calls_from_the_loop_thread_raise(
+    workspace: MockWorkspace, make_background: Callable[..., BackgroundClient]
+) -> None:
+    with make_background() as background:
+
+        async def call_back() -> list[dict[str, Any]]:
+            # Blocking the loop on itself would deadlock.
+            return background.get_all_users()
+
+        with pytest.raises(RuntimeError, match="own event loop"):
+            background.run(call_back())
+        assert background.get_all_users()
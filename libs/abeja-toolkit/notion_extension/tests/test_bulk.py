@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any, Callable
+
+import httpx
+import pytest
+from notion_extension import AsyncClient, Properties, Property
+from notion_extension.bulk import BulkReport
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace, _handle_httpx_request
+from notion_extension.planner import _get_children
+
+
+class FailingAppendTransport(httpx.AsyncBaseTransport):
+    """Fail the n-th append request with HTTP 503 before the backend processes it, or with a
+    timeout after it."""
+
+    def __init__(self, backend: MockNotionBackend, nth: int, processed: bool):
+        self.backend = backend
+        self.nth = nth
+        self.processed = processed
+        self.appends = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "PATCH" and request.url.path.endswith("/children"):
+            self.appends += 1
+            if self.appends == self.nth:
+                if self.processed:
+                    _handle_httpx_request(self.backend, request)
+                    raise httpx.ReadTimeout("timed out", request=request)
+                return httpx.Response(
+                    503,
+                    json={
+                        "object": "error",
+                        "status": 503,
+                        "code": "service_unavailable",
+                        "message": "unavailable",
+                    },
+                )
+        return _handle_httpx_request(self.backend, request)
+
+
+def _item(text: str, children: list[dict[str, Any]] | None = None) -> dict[str, Any]:
+    content: dict[str, Any] = {"rich_text": [{"type": "text", "text": {"content": text}}]}
+    if children:
+        content["children"] = children
+    return {"type": "bulleted_list_item", "bulleted_list_item": content}
+
+
+def _outline(blocks: list[dict[str, Any]]) -> list[Any]:
+    output = []
+    for block in blocks:
+        texts = [item["text"]["content"] for item in block[block["type"]]["rich_text"]]
+        children = block.get("children") or _get_children(block)
+        output.append(("".join(texts), _outline(children)))
+    return output
+
+
+class _Formatted:
+    def __init__(self, blocks: list[dict[str, Any]]):
+        self.blocks = blocks
+
+    def format(self) -> list[dict[str, Any]]:
+        return self.blocks
+
+
+def _create_and_resume(
+    backend: MockNotionBackend,
+    database_id: str,
+    make_async_client: Callable[..., AsyncClient],
+    blocks: list[dict[str, Any]],
+    transport: FailingAppendTransport,
+) -> tuple[BulkReport, BulkReport, list[dict[str, Any]]]:
+    rows = [(Properties(properties=[Property.title("Name", "Bulk")]), _Formatted(blocks))]
+
+    async def run() -> tuple[BulkReport, BulkReport, list[dict[str, Any]]]:
+        failing = make_async_client(transport=transport)
+        failed = await failing.create_pages(database_id, rows)  # type: ignore[arg-type]
+        client = make_async_client()
+        resumed = await client.create_pages(
+            database_id,
+            rows,  # type: ignore[arg-type]
+            resume_from=failed,
+        )
+        page_id = resumed.results[0].page_id
+        assert page_id is not None
+        return failed, resumed, await client.get_all_blocks(page_id)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("processed", [False, True])
+def test_resume_continues_the_appends_on_the_created_page(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_async_client: Callable[..., AsyncClient],
+    processed: bool,
+) -> None:
+    database_id = workspace.database_ids[0]
+    before = len(backend.database_pages[database_id])
+    blocks = [_item(f"item {i}") for i in range(250)]
+    # The page is created with the first 100 blocks, and the second append fails.
+    transport = FailingAppendTransport(backend, nth=2, processed=processed)
+
+    failed, resumed, content = _create_and_resume(
+        backend, database_id, make_async_client, blocks, transport
+    )
+
+    [result] = failed.failed
+    assert result.page_id is not None
+    assert result.completed_requests == 2
+    assert resumed.results[0].success
+    assert resumed.results[0].page_id == result.page_id
+    assert resumed.results[0].completed_requests == 3
+    assert len(backend.database_pages[database_id]) == before + 1
+    assert _outline(content) == _outline(blocks)
+
+
+def test_resume_completes_the_failed_followups(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    database_id = workspace.database_ids[0]
+    before = len(backend.database_pages[database_id])
+    chain = _item("a", [_item("b", [_item("c", [_item("d", [_item("e")])])])])
+    blocks = [chain, _item("last")]
+    # Everything fits in the page creation except the follow-up to "c", which fails.
+    transport = FailingAppendTransport(backend, nth=1, processed=False)
+
+    failed, resumed, content = _create_and_resume(
+        backend, database_id, make_async_client, blocks, transport
+    )
+
+    assert failed.failed[0].completed_requests == 1
+    assert resumed.results[0].success
+    assert len(backend.database_pages[database_id]) == before + 1
+    assert _outline(content) == _outline(blocks)
@@ -0,0 +1,155 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from notion_extension import AsyncClient, Client, DiskBlockCache, MemoryBlockCache
+from notion_extension.cache import children_version, is_settled
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+def _deepest(blocks: list[dict[str, Any]]) -> dict[str, Any]:
+    for block in blocks:
+        for child in block.get("children", []):
+            if child.get("children"):
+                return child["children"][0]
+    raise AssertionError("no block at depth 3")
+
+
+def test_unchanged_page_is_served_from_cache(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    page_id = workspace.page_ids[0]
+    expected = make_client().get_all_blocks(page_id)
+    client = make_client(block_cache=MemoryBlockCache())
+
+    assert client.get_all_blocks(page_id) == expected
+    count = backend.request_count
+    assert client.get_all_blocks(page_id) == expected
+    # Only the page is retrieved to validate the cache.
+    assert backend.request_count - count == 1
+
+
+def test_entries_hold_direct_children(
+    workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    cache = MemoryBlockCache()
+    page_id = workspace.page_ids[0]
+    make_client(block_cache=cache).get_all_blocks(page_id)
+
+    version = make_client().pages.retrieve(page_id=page_id)["last_edited_time"]
+    top_level = cache.get(page_id, version)
+    assert top_level is not None
+    assert all("children" not in block for block in top_level)
+
+
+def test_deep_edit_is_not_served_stale(
+    backend: MockNotionBackend, make_client: Callable[..., Client]
+) -> None:
+    deep = backend.seed_workspace(pages_per_database=1, blocks_per_page=20, depth=3, fanout=2)
+    page_id = deep.page_ids[0]
+    client = make_client(block_cache=MemoryBlockCache())
+    deepest = _deepest(client.get_all_blocks(page_id))
+
+    block_type = deepest["type"]
+    make_client().blocks.update(
+        block_id=deepest["id"], **{block_type: {"rich_text": [{"text": {"content": "edited"}}]}}
+    )
+
+    blocks = client.get_all_blocks(page_id)
+    assert blocks == make_client().get_all_blocks(page_id)
+    assert _deepest(blocks)["last_edited_time"] != deepest["last_edited_time"]
+
+
+def test_page_edited_in_current_minute_is_not_stored(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    page_id = workspace.page_ids[0]
+    make_client().pages.update(page_id=page_id, properties={})
+    client = make_client(block_cache=MemoryBlockCache())
+
+    client.get_all_blocks(page_id)
+    count = backend.request_count
+    client.get_all_blocks(page_id)
+    assert backend.request_count - count > 1
+
+
+def test_disk_cache_is_shared_between_clients(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    tmp_path: Path,
+) -> None:
+    page_id = workspace.page_ids[0]
+    expected = make_client(block_cache=DiskBlockCache(tmp_path)).get_all_blocks(page_id)
+
+    count = backend.request_count
+    assert make_client(block_cache=DiskBlockCache(tmp_path)).get_all_blocks(page_id) == expected
+    assert backend.request_count - count == 1
+
+
+def test_block_tree_uses_cache(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    page_id = workspace.page_ids[0]
+    client = make_client(block_cache=MemoryBlockCache())
+    expected = client.get_all_blocks(page_id)
+
+    count = backend.request_count
+    with client.get_block_tree(page_id) as tree:
+        assert tree.to_list() == expected
+    assert backend.request_count - count == 1
+
+
+def test_async_client_uses_cache(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    page_id = workspace.page_ids[0]
+    expected = make_client().get_all_blocks(page_id)
+    client = make_async_client(block_cache=MemoryBlockCache())
+
+    async def read() -> list[dict[str, Any]]:
+        return await client.get_all_blocks(page_id)
+
+    assert asyncio.run(read()) == expected
+    count = backend.request_count
+    assert asyncio.run(read()) == expected
+    assert backend.request_count - count == 1
+
+
+def test_is_settled() -> None:
+    now = datetime.now(timezone.utc)
+    assert is_settled("2024-01-01T00:00:00.000Z")
+    assert not is_settled(now.strftime("%Y-%m-%dT%H:%M:00.000Z"))
+    assert is_settled((now - timedelta(minutes=1)).strftime("%Y-%m-%dT%H:%M:00.000Z"))
+
+
+def test_children_in_another_page_are_not_versioned() -> None:
+    version = "2024-01-01T00:00:00.000Z"
+    synced = {"type": "synced_block", "synced_block": {"synced_from": {"block_id": "b"}}}
+
+    assert children_version({"type": "paragraph"}, version) == version
+    assert children_version({"type": "child_page"}, version) is None
+    assert children_version(synced, version) is None
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    version = "2024-01-01T00:00:00.000Z"
+    cache = DiskBlockCache(tmp_path, maxsize=10)
+    for i in range(10):
+        cache.set(f"block{i}", version, [{"id": str(i)}])
+        os.utime(tmp_path / f"block{i}.json", ns=(i, i))
+    assert cache.get("block0", version) == [{"id": "0"}]
+
+    cache.set("block10", version, [])
+
+    assert len(list(tmp_path.glob("*.json"))) == 9
+    assert cache.get("block0", version) is not None
+    assert cache.get("block1", version) is None
+    assert cache.get("block10", version) == []
+    # A new instance counts the entries already stored.
+    assert DiskBlockCache(tmp_path, maxsize=10)._size == 9
@@ -0,0 +1,27 @@
+import asyncio
+from typing import Callable
+
+import pytest
+from notion_extension import AsyncClient
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+@pytest.mark.parametrize(("coalesce_reads", "expected"), [(None, 5), (False, 5), (True, 1)])
+def test_identical_reads_are_coalesced_only_when_enabled(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_async_client: Callable[..., AsyncClient],
+    coalesce_reads: bool | None,
+    expected: int,
+) -> None:
+    kwargs = {} if coalesce_reads is None else {"coalesce_reads": coalesce_reads}
+    client = make_async_client(**kwargs)
+    page_id = workspace.page_ids[0]
+
+    async def read() -> None:
+        pages = await asyncio.gather(*(client.pages.retrieve(page_id=page_id) for _ in range(5)))
+        assert all(page["id"] == page_id for page in pages)
+
+    count = backend.request_count
+    asyncio.run(read())
+    assert backend.request_count - count == expected
@@ -0,0 +1,68 @@
+import json
+from typing import Any, Callable
+
+import pytest
+from notion_extension import Client
+from notion_extension.codec import JSONCodec, OrjsonCodec, StdlibCodec, get_default_codec
+from notion_extension.mock_server import MockWorkspace
+
+
+def _orjson() -> JSONCodec:
+    pytest.importorskip("orjson")
+    return OrjsonCodec()
+
+
+CODECS = [pytest.param(StdlibCodec, id="stdlib"), pytest.param(_orjson, id="orjson")]
+
+BODY: dict[str, Any] = {
+    "children": [
+        {
+            "type": "paragraph",
+            "paragraph": {"rich_text": [{"text": {"content": '日本語のテキスト 🚀 "quoted"\n'}}]},
+        }
+    ],
+    "archived": False,
+    "number": 1.5,
+    "count": 3,
+    "empty": None,
+}
+
+
+@pytest.mark.parametrize("make_codec", CODECS)
+def test_round_trip(make_codec: Callable[[], JSONCodec]) -> None:
+    codec = make_codec()
+
+    data = codec.dumps(BODY)
+
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == BODY
+    assert json.loads(data) == BODY
+    # Non-ASCII characters are written as UTF-8 rather than escaped.
+    assert "日本語".encode() in data
+
+
+@pytest.mark.parametrize("make_codec", CODECS)
+def test_loads_accepts_bytes_and_str(make_codec: Callable[[], JSONCodec]) -> None:
+    codec = make_codec()
+    text = json.dumps(BODY, ensure_ascii=False)
+
+    assert codec.loads(text) == BODY
+    assert codec.loads(text.encode()) == BODY
+    assert codec.loads(json.dumps(BODY).encode()) == BODY
+
+
+def test_codecs_encode_the_same_json() -> None:
+    assert json.loads(_orjson().dumps(BODY)) == json.loads(StdlibCodec().dumps(BODY))
+
+
+def test_stdlib_codec_is_the_default(workspace: MockWorkspace, client: Client) -> None:
+    assert isinstance(get_default_codec(), StdlibCodec)
+    assert isinstance(client.codec, StdlibCodec)
+
+
+def test_client_with_orjson(workspace: MockWorkspace, make_client: Callable[..., Client]) -> None:
+    page_id = workspace.page_ids[0]
+
+    blocks = make_client(codec=_orjson()).get_all_blocks(page_id)
+
+    assert blocks == make_client().get_all_blocks(page_id)
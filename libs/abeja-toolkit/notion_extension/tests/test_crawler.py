@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import pytest
+from notion_extension import Client, WorkspaceCrawler
+from notion_extension.mock_server import MockNotionBackend, MockTransport, MockWorkspace
+
+
+class _Interrupting(MockTransport):
+    """Raise instead of sending the requests to the path after `after` of them were sent, as if
+    the process were killed."""
+
+    def __init__(self, backend: MockNotionBackend, path: str, after: int):
+        super().__init__(backend)
+        self.path = path
+        self.after = after
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith(self.path):
+            if self.after == 0:
+                raise RuntimeError("interrupted")
+            self.after -= 1
+        return super().handle_request(request)
+
+
+def _fetched(crawler: WorkspaceCrawler) -> int:
+    return sum(crawler.get_blocks(page["id"]) is not None for page in crawler.iter_objects("page"))
+
+
+def test_crawl_stores_the_pages_and_their_blocks(
+    workspace: MockWorkspace, client: Client, tmp_path: Path
+) -> None:
+    with WorkspaceCrawler(client, tmp_path / "workspace.db") as crawler:
+        result = crawler.crawl()
+
+        assert result.discovered == len(workspace.page_ids) + len(workspace.database_ids)
+        assert result.fetched == len(workspace.page_ids)
+        assert result.failed == []
+        assert not crawler.in_progress
+        assert [db["id"] for db in crawler.iter_objects("database")] == workspace.database_ids
+        for page_id in workspace.page_ids:
+            assert crawler.get_blocks(page_id) == client.get_all_blocks(page_id)
+            assert crawler.get(page_id) == client.pages.retrieve(page_id=page_id)
+
+
+def test_recrawl_fetches_only_the_edited_pages(
+    backend: MockNotionBackend, workspace: MockWorkspace, client: Client, tmp_path: Path
+) -> None:
+    crawler = WorkspaceCrawler(client, tmp_path / "workspace.db")
+    first = crawler.crawl()
+    edited_id = workspace.page_ids[1]
+    client.pages.update(page_id=edited_id, properties={"Score": {"number": 42}})
+
+    count = backend.request_count
+    result = crawler.crawl()
+
+    crawl_requests = backend.request_count - count
+    count = backend.request_count
+    client.get_all_blocks(edited_id, skip_children_of=["child_page", "child_database"])
+
+    assert result.fetched == 1
+    # A single search request, which stops at the objects edited before the first crawl.
+    assert crawl_requests == 1 + backend.request_count - count
+    assert result.since is not None and first.since is not None
+    assert result.since > first.since
+    edited = crawler.get(edited_id)
+    assert edited is not None and edited["properties"]["Score"]["number"] == 42
+
+
+@pytest.mark.parametrize(
+    "path, after", [("/search", 1), ("/children", 40)], ids=["discovery", "fetch"]
+)
+def test_interrupted_crawl_resumes_where_it_stopped(
+    backend: MockNotionBackend,
+    make_client: Callable[..., Client],
+    tmp_path: Path,
+    path: str,
+    after: int,
+) -> None:
+    workspace = backend.seed_workspace(pages_per_database=150, blocks_per_page=1, depth=0)
+    num_objects = len(workspace.page_ids) + len(workspace.database_ids)
+    interrupted = WorkspaceCrawler(
+        make_client(_Interrupting(backend, path, after)), tmp_path / "workspace.db", max_workers=2
+    )
+    with pytest.raises(RuntimeError, match="interrupted"):
+        interrupted.crawl()
+    assert interrupted.in_progress
+    stored = len(list(interrupted.iter_objects()))
+    fetched = _fetched(interrupted)
+    interrupted.close()
+
+    count = backend.request_count
+    with WorkspaceCrawler(make_client(), tmp_path / "workspace.db") as crawler:
+        result = crawler.crawl()
+
+        assert result.discovered == num_objects - stored
+        assert result.fetched == len(workspace.page_ids) - fetched
+        assert _fetched(crawler) == len(workspace.page_ids)
+        assert not crawler.in_progress
+    if path == "/search":
+        assert stored == 100
+    else:
+        assert stored == num_objects and 0 < fetched < len(workspace.page_ids)
+        # Only the pages not fetched yet are requested again.
+        assert backend.request_count - count == len(workspace.page_ids) - fetched
+
+
+def test_export_jsonl_writes_the_objects_with_their_blocks(
+    workspace: MockWorkspace, client: Client, tmp_path: Path
+) -> None:
+    with WorkspaceCrawler(client, tmp_path / "workspace.db") as crawler:
+        crawler.crawl()
+        count = crawler.export_jsonl(tmp_path / "workspace.jsonl")
+
+        lines = (tmp_path / "workspace.jsonl").read_text(encoding="utf-8").splitlines()
+        objects = [json.loads(line) for line in lines]
+        assert count == len(objects) == len(list(crawler.iter_objects()))
+        for obj in objects:
+            if obj["object"] == "page":
+                assert obj["children"] == crawler.get_blocks(obj["id"])
+            else:
+                assert "children" not in obj
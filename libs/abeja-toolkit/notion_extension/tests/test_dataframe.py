@@ -0,0 +1,72 @@
+from typing import Any
+
+import pytest
+from notion_extension import Client, DatabaseTable
+from notion_extension.db_properties import extract_property_value
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+def test_table_round_trips_to_arrow_and_pandas(workspace: MockWorkspace, client: Client) -> None:
+    pa = pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    database_id = workspace.database_ids[0]
+    pages = client.get_entire_database(database_id)
+
+    table = client.get_database_table(database_id)
+    arrow = table.to_arrow()
+    df = table.to_pandas()
+
+    assert len(table) == arrow.num_rows == len(df) == len(pages)
+    assert arrow.column_names == list(df.columns) == list(table.columns)
+    assert arrow.schema.field("Score").type == pa.float64()
+    assert arrow.schema.field("Tags").type == pa.list_(pa.string())
+    assert arrow.column("_id").to_pylist() == df["_id"].tolist() == [page["id"] for page in pages]
+    for row, page in zip(arrow.to_pylist(), pages, strict=True):
+        for name in ("Name", "Status", "Score", "Done", "Notes"):
+            assert row[name] == extract_property_value(page["properties"][name])
+        assert row["Tags"] == (extract_property_value(page["properties"]["Tags"]) or [])
+        assert row["_last_edited_time"].isoformat().startswith(page["last_edited_time"][:16])
+    assert df["Done"].dtype == "boolean"
+    assert str(df["_created_time"].dt.tz) == "UTC"
+
+
+def test_properties_named_like_page_fields_are_kept(
+    backend: MockNotionBackend, client: Client
+) -> None:
+    pytest.importorskip("pyarrow")
+    schema = {"Name": "title", "id": "rich_text", "created_time": "created_time"}
+    database_id = backend.add_database("Clashing", schema)
+    page = client.pages.create(
+        parent={"database_id": database_id},
+        properties={
+            "Name": {"title": [{"text": {"content": "first"}}]},
+            "id": {"rich_text": [{"text": {"content": "ABC-1"}}]},
+        },
+    )
+
+    table = client.get_database_table(database_id)
+    [row] = table.to_arrow().to_pylist()
+
+    # Each column holds one value, rather than the property and the field appended twice.
+    assert all(len(values) == 1 for values in table.columns.values())
+    assert row["_id"] == page["id"]
+    assert row["id"] == "ABC-1"
+    assert "created_time" in row and row["_created_time"] is not None
+
+
+def test_properties_named_like_page_columns_raise() -> None:
+    database: dict[str, Any] = {
+        "properties": {
+            "Name": {"id": "title", "type": "title"},
+            "_id": {"id": "abcd", "type": "rich_text"},
+        }
+    }
+
+    with pytest.raises(ValueError, match="_id"):
+        DatabaseTable(database)
+    assert list(DatabaseTable(database, properties=["Name"]).columns) == [
+        "_id",
+        "_created_time",
+        "_last_edited_time",
+        "Name",
+    ]
@@ -0,0 +1,228 @@
+import asyncio
+import threading
+from typing import Any, Callable
+
+import httpx
+import pytest
+from notion_extension import AsyncClient, Client, MemoryBlockCache
+from notion_extension.mock_server import AsyncMockTransport, MockNotionBackend, MockTransport
+
+
+class _Probe(MockTransport):
+    """A transport recording the largest number of requests in flight at once."""
+
+    def __init__(self, backend: MockNotionBackend):
+        super().__init__(backend)
+        self.inflight = 0
+        self.max_inflight = 0
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            return super().handle_request(request)
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+
+class _AsyncProbe(AsyncMockTransport):
+    """A transport recording the largest number of requests in flight at once."""
+
+    def __init__(self, backend: MockNotionBackend):
+        super().__init__(backend)
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.inflight -= 1
+
+
+def _tree(backend: MockNotionBackend, block_id: str) -> list[Any]:
+    """The IDs of the blocks under the block in the backend, nested as `(id, children)`."""
+    return [(child_id, _tree(backend, child_id)) for child_id in backend.children[block_id]]
+
+
+def _ids(blocks: list[dict[str, Any]]) -> list[Any]:
+    return [(block["id"], _ids(block.get("children", []))) for block in blocks]
+
+
+def test_async_blocks_are_nested_in_order(
+    backend: MockNotionBackend, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    deep = backend.seed_workspace(pages_per_database=1, blocks_per_page=20, depth=3, fanout=2)
+    page_id = deep.page_ids[0]
+
+    blocks = asyncio.run(make_async_client().get_all_blocks(page_id))
+
+    assert _ids(blocks) == _tree(backend, page_id)
+
+
+def test_async_levels_are_fetched_concurrently_up_to_the_limit(
+    backend: MockNotionBackend, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    page_id = backend.seed_workspace(pages_per_database=1, blocks_per_page=20).page_ids[0]
+    parents = sum(1 for child_id in backend.children[page_id] if backend.children.get(child_id))
+    assert parents > 2
+    backend.latency = 0.01
+
+    probe = _AsyncProbe(backend)
+    asyncio.run(make_async_client(transport=probe).get_all_blocks(page_id, max_concurrency=2))
+    assert probe.max_inflight == 2
+
+    probe = _AsyncProbe(backend)
+    asyncio.run(make_async_client(transport=probe).get_all_blocks(page_id))
+    assert probe.max_inflight == parents
+
+
+def test_async_children_over_a_page_of_results_are_collected(
+    backend: MockNotionBackend, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    page_id = backend.seed_workspace(pages_per_database=1, blocks_per_page=250).page_ids[0]
+
+    blocks = asyncio.run(make_async_client().get_all_blocks(page_id))
+
+    assert _ids(blocks) == _tree(backend, page_id)
+    assert len(blocks) == 250
+
+
+def test_parallel_blocks_match_the_sequential_blocks(
+    backend: MockNotionBackend, make_client: Callable[..., Client]
+) -> None:
+    deep = backend.seed_workspace(pages_per_database=1, blocks_per_page=20, depth=3, fanout=2)
+    page_id = deep.page_ids[0]
+    client = make_client()
+
+    sequential = client.get_all_blocks(page_id)
+    parallel = client.get_all_blocks(page_id, max_workers=4)
+
+    assert parallel == sequential
+    assert _ids(parallel) == _tree(backend, page_id)
+
+
+def test_parallel_threads_are_limited_by_max_workers(
+    backend: MockNotionBackend, make_client: Callable[..., Client]
+) -> None:
+    page_id = backend.seed_workspace(pages_per_database=1, blocks_per_page=20).page_ids[0]
+    backend.latency = 0.01
+
+    probe = _Probe(backend)
+    make_client(transport=probe).get_all_blocks(page_id)
+    assert probe.max_inflight == 1
+
+    probe = _Probe(backend)
+    make_client(transport=probe).get_all_blocks(page_id, max_workers=3)
+    assert probe.max_inflight == 3
+
+    with pytest.raises(ValueError):
+        make_client().get_all_blocks(page_id, max_workers=0)
+
+
+class _Recorder(MockTransport):
+    """A transport recording the IDs of the blocks whose children are requested."""
+
+    def __init__(self, backend: MockNotionBackend):
+        super().__init__(backend)
+        self.listed: list[str] = []
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        if parts[-1] == "children" and request.method == "GET":
+            self.listed.append(parts[-2])
+        return super().handle_request(request)
+
+
+def _walk(blocks: list[dict[str, Any]], depth: int = 1) -> list[tuple[dict[str, Any], int]]:
+    output = []
+    for block in blocks:
+        output.append((block, depth))
+        output.extend(_walk(block.get("children", []), depth + 1))
+    return output
+
+
+def _deep_page(backend: MockNotionBackend) -> str:
+    return backend.seed_workspace(
+        pages_per_database=1, blocks_per_page=20, depth=3, fanout=2
+    ).page_ids[0]
+
+
+def test_max_depth_stops_the_crawl(
+    backend: MockNotionBackend, make_client: Callable[..., Client]
+) -> None:
+    page_id = _deep_page(backend)
+    full = make_client().get_all_blocks(page_id)
+    recorder = _Recorder(backend)
+
+    blocks = make_client(transport=recorder).get_all_blocks(page_id, max_depth=2)
+
+    assert max(depth for _, depth in _walk(blocks)) == 2
+    assert all("children" not in block for block, depth in _walk(blocks) if depth == 2)
+    assert any(block["has_children"] for block, depth in _walk(blocks) if depth == 2)
+    # Only the page and the blocks at depth 1 are listed.
+    assert sorted(recorder.listed) == sorted(
+        [page_id, *(block["id"] for block in full if block["has_children"])]
+    )
+    with pytest.raises(ValueError):
+        make_client().get_all_blocks(page_id, max_depth=0)
+
+
+def test_type_filters_exclude_subtrees(
+    backend: MockNotionBackend, make_client: Callable[..., Client]
+) -> None:
+    page_id = _deep_page(backend)
+    recorder = _Recorder(backend)
+
+    blocks = make_client(transport=recorder).get_all_blocks(
+        page_id, include_types=["paragraph", "toggle"], skip_children_of=["toggle"]
+    )
+
+    walked = _walk(blocks)
+    assert walked
+    assert {block["type"] for block, _ in walked} <= {"paragraph", "toggle"}
+    assert all("children" not in block for block, _ in walked if block["type"] == "toggle")
+    listed = set(recorder.listed)
+    assert all(block["id"] not in listed for block, _ in walked if block["type"] == "toggle")
+    assert all(
+        block["id"] in listed
+        for block, _ in walked
+        if block["type"] == "paragraph" and block["has_children"]
+    )
+
+
+def test_async_filters_match_the_sync_filters(
+    backend: MockNotionBackend,
+    make_client: Callable[..., Client],
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    page_id = _deep_page(backend)
+    options: dict[str, Any] = {
+        "max_depth": 3,
+        "include_types": ["paragraph", "toggle", "bulleted_list_item"],
+        "skip_children_of": ["bulleted_list_item"],
+    }
+
+    expected = make_client().get_all_blocks(page_id, **options)
+    assert asyncio.run(make_async_client().get_all_blocks(page_id, **options)) == expected
+
+
+def test_filtered_crawls_do_not_truncate_the_block_cache(
+    backend: MockNotionBackend, make_client: Callable[..., Client]
+) -> None:
+    page_id = _deep_page(backend)
+    full = make_client().get_all_blocks(page_id)
+    client = make_client(block_cache=MemoryBlockCache())
+
+    assert client.get_all_blocks(page_id, max_depth=1) == [
+        {key: value for key, value in block.items() if key != "children"} for block in full
+    ]
+    assert client.get_all_blocks(page_id) == full
+    assert client.get_all_blocks(
+        page_id, skip_children_of=["toggle"]
+    ) == make_client().get_all_blocks(page_id, skip_children_of=["toggle"])
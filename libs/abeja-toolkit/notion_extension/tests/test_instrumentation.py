@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+from notion_extension import Client, RequestMetrics
+from notion_extension.instrumentation import RequestEvent
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+from .test_retry import FlakyTransport
+
+
+def test_requests_are_counted_per_endpoint(
+    workspace: MockWorkspace, make_client: Callable[..., Client], tmp_path: Path
+) -> None:
+    metrics = RequestMetrics(latency_buckets=(10.0, 0.001))
+    events: list[RequestEvent] = []
+    metrics.add_hook(events.append)
+    client = make_client(metrics=metrics)
+
+    for page_id in workspace.page_ids:
+        client.pages.retrieve(page_id=page_id)
+    client.blocks.children.list(block_id=workspace.page_ids[0])
+
+    endpoints = metrics.snapshot()["endpoints"]
+    assert set(endpoints) == {"GET pages/{id}", "GET blocks/{id}/children"}
+    pages = endpoints["GET pages/{id}"]
+    assert pages["requests"] == len(workspace.page_ids)
+    assert pages["retries"] == pages["errors"] == pages["timeouts"] == 0
+    assert sum(pages["latency_histogram"]) == pages["requests"]
+    assert pages["max_latency"] <= pages["total_latency"]
+    assert pages["response_bytes"] > 0
+    assert metrics.snapshot()["latency_buckets"] == [0.001, 10.0]
+
+    assert [event.endpoint for event in events][-1] == "GET blocks/{id}/children"
+    assert all(event.status == 200 and event.error is None for event in events)
+
+    metrics.dump(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text()) == metrics.snapshot()
+    metrics.reset()
+    assert metrics.snapshot()["endpoints"] == {}
+
+
+def test_failures_are_counted_by_kind(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    metrics = RequestMetrics()
+    events: list[RequestEvent] = []
+    metrics.add_hook(events.append)
+    transport = FlakyTransport(backend, [429, "connect", "timeout", 500])
+    client = make_client(transport, metrics=metrics)
+
+    client.pages.retrieve(page_id=workspace.page_ids[0])
+
+    stats = metrics.snapshot()["endpoints"]["GET pages/{id}"]
+    assert stats["requests"] == 5
+    assert stats["retries"] == 4
+    assert stats["rate_limited"] == 1
+    assert stats["errors"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["transport_errors"] == 1
+    assert [(event.status, event.error, event.attempt) for event in events] == [
+        (429, None, 0),
+        (None, "transport_error", 1),
+        (None, "timeout", 2),
+        (500, None, 3),
+        (200, None, 4),
+    ]
@@ -0,0 +1,100 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from notion_extension import Client, DatabaseMirror
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+def _checkbox(value: bool) -> dict[str, Any]:
+    return {"property": "Done", "checkbox": {"equals": value}}
+
+
+def test_first_sync_copies_the_database(
+    workspace: MockWorkspace, client: Client, tmp_path: Path
+) -> None:
+    database_id = workspace.database_ids[0]
+
+    with DatabaseMirror(client, database_id, tmp_path / "mirror.db") as mirror:
+        result = mirror.sync()
+        pages = list(mirror.iter_pages())
+
+    expected = client.get_entire_database(database_id)
+    assert result.upserted == len(expected)
+    assert sorted(page["id"] for page in pages) == sorted(page["id"] for page in expected)
+    assert result.cursor == max(page["last_edited_time"] for page in expected)
+
+
+def test_later_syncs_fetch_only_the_edited_pages(
+    backend: MockNotionBackend, workspace: MockWorkspace, client: Client, tmp_path: Path
+) -> None:
+    database_id = workspace.database_ids[0]
+    mirror = DatabaseMirror(client, database_id, tmp_path / "mirror.db")
+    first = mirror.sync()
+
+    # Only the pages edited in the minute of the checkpoint are fetched again.
+    again = mirror.sync(detect_deletions=False)
+    assert again.upserted == sum(
+        page["last_edited_time"] == first.cursor for page in client.get_entire_database(database_id)
+    )
+
+    page_id = workspace.page_ids[0]
+    client.pages.update(page_id=page_id, properties={"Score": {"number": 1234}})
+    count = backend.request_count
+    result = mirror.sync(detect_deletions=False)
+
+    assert backend.request_count - count == 1
+    assert result.upserted == 1
+    assert result.cursor is not None and first.cursor is not None
+    assert result.cursor > first.cursor
+    page = mirror.get(page_id)
+    assert page is not None
+    assert page["properties"]["Score"]["number"] == 1234
+
+    # The checkpoint is persisted, so a new mirror on the file continues from it.
+    assert DatabaseMirror(client, database_id, tmp_path / "mirror.db").cursor == result.cursor
+
+
+def test_archived_pages_are_marked_deleted_by_default(
+    workspace: MockWorkspace, client: Client, tmp_path: Path
+) -> None:
+    database_id = workspace.database_ids[0]
+    mirror = DatabaseMirror(client, database_id, tmp_path / "mirror.db")
+    mirror.sync()
+    archived_id, kept_id = workspace.page_ids[0], workspace.page_ids[1]
+    client.pages.update(page_id=archived_id, archived=True)
+
+    assert mirror.sync(detect_deletions=False).deleted == 0
+    assert mirror.get(archived_id) is not None
+
+    assert mirror.sync().deleted == 1
+    assert mirror.get(archived_id) is None
+    assert mirror.get(kept_id) is not None
+    assert mirror.deleted_ids() == [archived_id]
+
+    # A restored page is mirrored again.
+    client.pages.update(page_id=archived_id, archived=False)
+    mirror.sync()
+    assert mirror.get(archived_id) is not None
+    assert mirror.deleted_ids() == []
+
+
+def test_compound_filters_are_combined_with_the_checkpoint(
+    workspace: MockWorkspace, client: Client, tmp_path: Path
+) -> None:
+    database_id = workspace.database_ids[0]
+    done = {"and": [_checkbox(True), {"property": "Score", "number": {"is_not_empty": True}}]}
+    mirror = DatabaseMirror(client, database_id, tmp_path / "mirror.db", filter=done)
+    mirror.sync()
+    client.pages.update(page_id=workspace.page_ids[0], properties={"Done": {"checkbox": True}})
+
+    result = mirror.sync()
+
+    assert result.upserted >= 1
+    assert all(page["properties"]["Done"]["checkbox"] for page in mirror.iter_pages())
+
+    either = {"or": [{"and": [_checkbox(True)]}, {"and": [_checkbox(False), _checkbox(True)]}]}
+    nested = DatabaseMirror(client, database_id, tmp_path / "nested.db", filter=either)
+    nested.sync()
+    with pytest.raises(ValueError):
+        nested.sync()
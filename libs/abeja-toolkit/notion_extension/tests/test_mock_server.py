@@ -0,0 +1,52 @@
+from typing import Callable
+
+from notion_extension import Client
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+def _paragraph(text: str) -> dict[str, object]:
+    return {"type": "paragraph", "paragraph": {"rich_text": [{"text": {"content": text}}]}}
+
+
+def test_nested_edit_bumps_only_the_page(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    client = make_client()
+    page_id = workspace.page_ids[0]
+    blocks = client.get_all_blocks(page_id)
+    parent = next(block for block in blocks if block.get("children"))
+    child = parent["children"][0]
+    page_before = client.pages.retrieve(page_id=page_id)["last_edited_time"]
+
+    client.blocks.update(block_id=child["id"], **{child["type"]: {"rich_text": []}})
+
+    assert client.blocks.retrieve(block_id=parent["id"]) == {
+        key: value for key, value in parent.items() if key != "children"
+    }
+    assert (
+        client.blocks.retrieve(block_id=child["id"])["last_edited_time"]
+        != child["last_edited_time"]
+    )
+    assert client.pages.retrieve(page_id=page_id)["last_edited_time"] != page_before
+
+
+def test_append_to_block_bumps_only_the_page(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    client = make_client()
+    page_id = workspace.page_ids[0]
+    parent = next(block for block in client.get_all_blocks(page_id) if block["has_children"])
+    page_before = client.pages.retrieve(page_id=page_id)["last_edited_time"]
+
+    client.blocks.children.append(block_id=parent["id"], children=[_paragraph("new")])
+
+    retrieved = client.blocks.retrieve(block_id=parent["id"])
+    assert retrieved["last_edited_time"] == parent["last_edited_time"]
+    assert client.pages.retrieve(page_id=page_id)["last_edited_time"] != page_before
+
+
+def test_page_is_retrieved_as_block(workspace: MockWorkspace, client: Client) -> None:
+    page_id = workspace.page_ids[0]
+    block = client.blocks.retrieve(block_id=page_id)
+    assert block["type"] == "child_page"
+    assert block["last_edited_time"] == client.pages.retrieve(page_id=page_id)["last_edited_time"]
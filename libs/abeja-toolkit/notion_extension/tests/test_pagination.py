@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Any, Callable
+
+from notion_extension import AsyncClient, Client
+from notion_extension.mock_server import MockNotionBackend
+
+
+def _seed(backend: MockNotionBackend) -> str:
+    return backend.seed_workspace(pages_per_database=250, blocks_per_page=0).database_ids[0]
+
+
+def test_rows_are_streamed_in_order(backend: MockNotionBackend, client: Client) -> None:
+    database_id = _seed(backend)
+
+    rows = list(client.iter_database(database_id))
+
+    assert [row["id"] for row in rows] == backend.database_pages[database_id]
+    assert rows == client.get_entire_database(database_id)
+
+
+def test_only_the_next_page_is_prefetched(backend: MockNotionBackend, client: Client) -> None:
+    database_id = _seed(backend)
+    count = backend.request_count
+
+    rows = client.iter_database(database_id)
+    next(rows)
+    time.sleep(0.05)
+    # The first page and the prefetched second page, but not the third page.
+    assert backend.request_count - count == 2
+    rows.close()
+
+
+def test_filter_and_sorts_are_passed(backend: MockNotionBackend, client: Client) -> None:
+    database_id = _seed(backend)
+    sorts = [{"timestamp": "created_time", "direction": "descending"}]
+    checkbox = {"property": "Done", "checkbox": {"equals": True}}
+
+    rows = list(client.iter_database(database_id, filter=checkbox, sorts=sorts))
+
+    assert rows
+    assert all(row["properties"]["Done"]["checkbox"] for row in rows)
+    created = [row["created_time"] for row in rows]
+    assert created == sorted(created, reverse=True)
+
+
+def test_users_are_streamed(backend: MockNotionBackend, client: Client) -> None:
+    for i in range(150):
+        backend.add_user(f"Extra {i}", f"extra{i}@example.com")
+
+    users = list(client.iter_users())
+
+    assert [user["id"] for user in users] == [user["id"] for user in backend.users]
+    assert client.get_all_users() == users
+
+
+def test_async_iterators(
+    backend: MockNotionBackend, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    database_id = _seed(backend)
+    client = make_async_client()
+
+    async def read() -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, Any]]:
+        rows = [row async for row in client.aiter_database(database_id)]
+        users = [user async for user in client.aiter_users()]
+        # Stopping early cancels the prefetch of the next page.
+        partial = client.aiter_database(database_id)
+        first = await partial.__anext__()
+        await partial.aclose()
+        return rows, users, first
+
+    rows, users, first = asyncio.run(read())
+    assert [row["id"] for row in rows] == backend.database_pages[database_id]
+    assert [user["id"] for user in users] == [user["id"] for user in backend.users]
+    assert first == rows[0]
@@ -0,0 +1,187 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+from notion_extension import AsyncClient, Client, Properties, Property
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+from notion_extension.planner import (
+    MAX_ELEMENTS_PER_REQUEST,
+    MAX_PAYLOAD_SIZE,
+    MAX_RICH_TEXT_ITEMS,
+    _get_children,
+    plan_append,
+    split_block,
+)
+
+
+def _item(text: str, children: list[dict[str, Any]] | None = None) -> dict[str, Any]:
+    content: dict[str, Any] = {"rich_text": [{"type": "text", "text": {"content": text}}]}
+    if children:
+        content["children"] = children
+    return {"type": "bulleted_list_item", "bulleted_list_item": content}
+
+
+def _chain(depth: int) -> dict[str, Any]:
+    block = _item(f"level {depth}")
+    for level in reversed(range(depth)):
+        block = _item(f"level {level}", [block])
+    return block
+
+
+def _outline(blocks: list[dict[str, Any]]) -> list[Any]:
+    """The texts of the block tree, from either the request or the response format."""
+    output = []
+    for block in blocks:
+        texts = [item["text"]["content"] for item in block[block["type"]]["rich_text"]]
+        children = block.get("children") or _get_children(block)
+        output.append(("".join(texts), _outline(children)))
+    return output
+
+
+def _count_elements(blocks: list[dict[str, Any]]) -> int:
+    return sum(1 + _count_elements(_get_children(block)) for block in blocks)
+
+
+def test_two_levels_are_sent_in_one_request() -> None:
+    requests = plan_append([_chain(2)])
+
+    assert len(requests) == 1
+    assert requests[0].deferred == []
+    assert _outline(requests[0].children) == _outline([_chain(2)])
+
+
+def test_third_level_is_deferred_to_the_grandchild() -> None:
+    requests = plan_append([_item("first"), _chain(3)])
+
+    assert len(requests) == 1
+    [deferred] = requests[0].deferred
+    assert deferred.path == (1, 0, 0)
+    assert _outline(deferred.children) == [("level 3", [])]
+
+
+def test_grandchildren_over_the_element_limit_are_deferred() -> None:
+    children = [_item(f"{i}", [_item(f"{i}-{j}") for j in range(20)]) for i in range(100)]
+    requests = plan_append([_item("root", children)])
+
+    assert len(requests) == 1
+    assert _count_elements(requests[0].children) <= MAX_ELEMENTS_PER_REQUEST
+    sent = sum(bool(_get_children(child)) for child in _get_children(requests[0].children[0]))
+    assert sent > 0
+    assert len(requests[0].deferred) == 100 - sent
+    assert all(len(item.path) == 2 for item in requests[0].deferred)
+
+
+def test_large_children_are_deferred_to_fit_the_payload() -> None:
+    text = "x" * 2000
+    large = {"rich_text": [{"type": "text", "text": {"content": text}}] * 100}
+    children = [{"type": "paragraph", "paragraph": large} for _ in range(3)]
+    requests = plan_append([_item("root", children)])
+
+    assert len(requests) == 1
+    assert _get_children(requests[0].children[0]) == []
+    [deferred] = requests[0].deferred
+    assert deferred.path == (0,)
+    assert len(deferred.children) == 3
+
+
+def test_oversized_single_block_raises() -> None:
+    block = {"type": "embed", "embed": {"url": "https://example.com/" + "x" * MAX_PAYLOAD_SIZE}}
+
+    with pytest.raises(ValueError, match="payload limit"):
+        plan_append([block])
+
+
+def _styled(num_items: int, block_type: str = "paragraph") -> dict[str, Any]:
+    """A block whose rich text alternates bold and plain text, which cannot be merged."""
+    rich_text = [
+        {"type": "text", "text": {"content": f"{i} "}, "annotations": {"bold": i % 2 == 0}}
+        for i in range(num_items)
+    ]
+    return {"type": block_type, block_type: {"rich_text": rich_text, "children": [_item("c")]}}
+
+
+def test_long_paragraph_is_split_into_paragraphs() -> None:
+    blocks = split_block(_styled(250))
+
+    assert [len(block["paragraph"]["rich_text"]) for block in blocks] == [100, 100, 50]
+    assert [_get_children(block) for block in blocks] == [[], [], [_item("c")]]
+
+
+def test_same_style_text_is_merged_before_splitting() -> None:
+    block = _styled(150, "code")
+    for item in block["code"]["rich_text"]:
+        item["annotations"] = {"bold": False}
+
+    [merged] = split_block(block)
+
+    assert merged["code"]["rich_text"] == [
+        {
+            "type": "text",
+            "text": {"content": "".join(f"{i} " for i in range(150))},
+            "annotations": {"bold": False},
+        }
+    ]
+
+
+@pytest.mark.parametrize("block_type", ["code", "quote", "callout", "bulleted_list_item"])
+def test_other_blocks_with_too_many_objects_raise(block_type: str) -> None:
+    assert len(split_block(_styled(MAX_RICH_TEXT_ITEMS, block_type))) == 1
+    with pytest.raises(ValueError, match="Only a paragraph"):
+        plan_append([_styled(MAX_RICH_TEXT_ITEMS + 1, block_type)])
+
+
+def test_long_equations_raise() -> None:
+    expression = "x" * 1001
+    inline = {"type": "equation", "equation": {"expression": expression}}
+
+    with pytest.raises(ValueError, match="equation"):
+        plan_append([{"type": "equation", "equation": {"expression": expression}}])
+    with pytest.raises(ValueError, match="equation"):
+        plan_append([{"type": "paragraph", "paragraph": {"rich_text": [inline]}}])
+    assert plan_append([{"type": "equation", "equation": {"expression": "x" * 1000}}])
+
+
+def test_deep_blocks_are_appended_by_followups(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    client = make_client()
+    page_id = workspace.page_ids[0]
+    before = client.get_all_blocks(page_id)
+    blocks = [_chain(5), *[_item(f"item {i}") for i in range(150)]]
+
+    count = backend.request_count
+    client.append_blocks_to_page(page_id, _Formatted(blocks))  # type: ignore[arg-type]
+    # Two appends to the page, two lists to find the third level of the chain, and an append
+    # of the rest of the chain, which fits in the nesting limit.
+    assert backend.request_count - count == 2 + 2 + 1
+
+    after = client.get_all_blocks(page_id)
+    assert _outline(after[len(before) :]) == _outline(blocks)
+
+
+def test_async_create_page_with_deep_blocks(
+    workspace: MockWorkspace, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    blocks = [_chain(4), _item("last")]
+    properties = Properties(properties=[Property.title("Name", "Deep")])
+
+    async def create() -> list[dict[str, Any]]:
+        client = make_async_client()
+        page = await client.create_page(
+            workspace.database_ids[0],
+            properties,
+            _Formatted(blocks),  # type: ignore[arg-type]
+        )
+        return await client.get_all_blocks(page["id"])
+
+    assert _outline(asyncio.run(create())) == _outline(blocks)
+
+
+class _Formatted:
+    """Formatted blocks in place of `Blocks`, to build trees of any depth."""
+
+    def __init__(self, blocks: list[dict[str, Any]]):
+        self.blocks = blocks
+
+    def format(self) -> list[dict[str, Any]]:
+        return self.blocks
@@ -0,0 +1,31 @@
+import sys
+import uuid
+
+from notion_extension import Client, PageRecord
+from notion_extension.mock_server import MockWorkspace
+
+
+def _fresh(value: str) -> str:
+    """An equal string which is a different object."""
+    return "".join(list(value))
+
+
+def _is_interned(value: str) -> bool:
+    copy = _fresh(value)
+    return sys.intern(copy) is not copy
+
+
+def test_only_low_cardinality_values_are_interned(workspace: MockWorkspace, client: Client) -> None:
+    page = client.pages.retrieve(page_id=workspace.page_ids[0])
+    # Unique values which no other code has interned.
+    page["created_time"] = f"2024-01-01T00:00:00.000Z {uuid.uuid4()}"
+    page["last_edited_time"] = f"2024-01-01T00:00:00.000Z {uuid.uuid4()}"
+    page["created_by"] = {"object": "user", "id": str(uuid.uuid4())}
+
+    record = PageRecord.from_dict(page)
+
+    assert record.created_time == page["created_time"]
+    assert not _is_interned(page["created_time"])
+    assert not _is_interned(page["last_edited_time"])
+    assert not _is_interned(page["id"])
+    assert _is_interned(page["created_by"]["id"])
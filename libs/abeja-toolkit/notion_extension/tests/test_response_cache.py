@@ -0,0 +1,105 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Callable
+
+from notion_extension import AsyncClient, Client, ResponseCache
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+def _deepest(blocks: list[dict[str, Any]]) -> dict[str, Any]:
+    for block in blocks:
+        for child in block.get("children", []):
+            if child.get("children"):
+                return child["children"][0]
+    raise AssertionError("no block at depth 3")
+
+
+def test_unchanged_page_is_served_from_another_process(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    tmp_path: Path,
+) -> None:
+    page_id = workspace.page_ids[0]
+    expected = make_client().get_all_blocks(page_id)
+    make_client(response_cache=ResponseCache(tmp_path / "notion.db")).get_all_blocks(page_id)
+
+    cache = ResponseCache(tmp_path / "notion.db")
+    count = backend.request_count
+    assert make_client(response_cache=cache).get_all_blocks(page_id) == expected
+    # Only the page is retrieved to validate all the levels.
+    assert backend.request_count - count == 1
+    assert cache.misses == 0
+
+
+def test_deep_edit_is_not_served_stale(
+    backend: MockNotionBackend, make_client: Callable[..., Client], tmp_path: Path
+) -> None:
+    deep = backend.seed_workspace(pages_per_database=1, blocks_per_page=20, depth=3, fanout=2)
+    page_id = deep.page_ids[0]
+    client = make_client(response_cache=ResponseCache(tmp_path / "notion.db", validation_ttl=0))
+    deepest = _deepest(client.get_all_blocks(page_id))
+
+    # The parents of the edited block keep their `last_edited_time`, only the page changes.
+    block_type = deepest["type"]
+    make_client().blocks.update(
+        block_id=deepest["id"], **{block_type: {"rich_text": [{"text": {"content": "edited"}}]}}
+    )
+
+    blocks = client.get_all_blocks(page_id)
+    assert blocks == make_client().get_all_blocks(page_id)
+    assert _deepest(blocks)["last_edited_time"] != deepest["last_edited_time"]
+
+
+def test_page_edited_in_current_minute_is_not_stored(
+    workspace: MockWorkspace, make_client: Callable[..., Client], tmp_path: Path
+) -> None:
+    page_id = workspace.page_ids[0]
+    make_client().pages.update(page_id=page_id, properties={})
+    cache = ResponseCache(tmp_path / "notion.db")
+
+    make_client(response_cache=cache).get_all_blocks(page_id)
+    make_client(response_cache=cache).pages.retrieve(page_id=page_id)
+    assert cache.size == 0
+
+
+def test_size_is_kept_under_max_bytes(
+    workspace: MockWorkspace, make_client: Callable[..., Client], tmp_path: Path
+) -> None:
+    cache = ResponseCache(tmp_path / "notion.db")
+    client = make_client(response_cache=cache)
+    for page_id in workspace.page_ids:
+        client.get_all_blocks(page_id)
+    total = cache.size
+    assert total > 0
+    assert total == cache.connection.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+
+    small = ResponseCache(tmp_path / "small.db", max_bytes=total // 2)
+    client = make_client(response_cache=small)
+    for page_id in workspace.page_ids:
+        client.get_all_blocks(page_id)
+    assert 0 < small.size <= total // 2
+    assert small.size == small.connection.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+
+    small.clear()
+    assert small.size == 0
+
+
+def test_async_client_uses_cache(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    make_async_client: Callable[..., AsyncClient],
+    tmp_path: Path,
+) -> None:
+    page_id = workspace.page_ids[0]
+    expected = make_client().get_all_blocks(page_id)
+
+    async def read() -> list[dict[str, Any]]:
+        client = make_async_client(response_cache=ResponseCache(tmp_path / "notion.db"))
+        return await client.get_all_blocks(page_id)
+
+    assert asyncio.run(read()) == expected
+    count = backend.request_count
+    assert asyncio.run(read()) == expected
+    assert backend.request_count - count == 1
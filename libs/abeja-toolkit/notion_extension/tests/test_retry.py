@@ -0,0 +1,143 @@
+import asyncio
+from typing import Callable
+
+import httpx
+import pytest
+from notion_client.errors import APIResponseError, RequestTimeoutError
+from notion_extension import AsyncClient, Client
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace, _handle_httpx_request
+
+
+class FlakyTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Fail the first requests in the given ways: HTTP 429 or `connect` before the backend
+    processes the request, or a 5xx status or `timeout` after it."""
+
+    def __init__(self, backend: MockNotionBackend, failures: list[int | str]):
+        self.backend = backend
+        self.failures = list(failures)
+        self.sent = 0
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.sent += 1
+        failure = self.failures.pop(0) if self.failures else None
+        if failure == "connect":
+            raise httpx.ConnectError("connection refused", request=request)
+        if failure == 429:
+            return httpx.Response(
+                429,
+                json={
+                    "object": "error",
+                    "status": 429,
+                    "code": "rate_limited",
+                    "message": "rate limited",
+                },
+            )
+        response = _handle_httpx_request(self.backend, request)
+        if failure == "timeout":
+            raise httpx.ReadTimeout("timed out", request=request)
+        if isinstance(failure, int):
+            return httpx.Response(
+                failure,
+                json={
+                    "object": "error",
+                    "status": failure,
+                    "code": "internal_server_error",
+                    "message": "failed",
+                },
+            )
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._handle(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return self._handle(request)
+
+
+def _paragraph(text: str) -> dict[str, object]:
+    return {"type": "paragraph", "paragraph": {"rich_text": [{"text": {"content": text}}]}}
+
+
+@pytest.mark.parametrize("failure", [500, 503, "timeout", 429, "connect"])
+def test_read_is_retried(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    failure: int | str,
+) -> None:
+    transport = FlakyTransport(backend, [failure])
+    client = make_client(transport=transport)
+    page = client.pages.retrieve(page_id=workspace.page_ids[0])
+    assert page["id"] == workspace.page_ids[0]
+    assert transport.sent == 2
+
+
+@pytest.mark.parametrize("failure", [500, "timeout"])
+def test_append_is_not_retried_after_it_may_have_been_processed(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    failure: int | str,
+) -> None:
+    page_id = workspace.page_ids[0]
+    before = len(backend.children[page_id])
+    transport = FlakyTransport(backend, [failure])
+    client = make_client(transport=transport)
+    with pytest.raises((APIResponseError, RequestTimeoutError)):
+        client.blocks.children.append(block_id=page_id, children=[_paragraph("once")])
+    assert transport.sent == 1
+    # Notion may have appended the blocks before failing, but never twice.
+    assert len(backend.children[page_id]) <= before + 1
+
+
+@pytest.mark.parametrize("failure", [429, "connect"])
+def test_create_is_retried_when_not_processed(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    failure: int | str,
+) -> None:
+    database_id = workspace.database_ids[0]
+    before = len(backend.database_pages[database_id])
+    transport = FlakyTransport(backend, [failure])
+    client = make_client(transport=transport)
+    client.pages.create(
+        parent={"database_id": database_id},
+        properties={"Name": {"title": [{"text": {"content": "new"}}]}},
+    )
+    assert transport.sent == 2
+    assert len(backend.database_pages[database_id]) == before + 1
+
+
+def test_async_create_is_not_retried_on_timeout(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    database_id = workspace.database_ids[0]
+    before = len(backend.database_pages[database_id])
+    transport = FlakyTransport(backend, ["timeout"])
+    client = make_async_client(transport=transport)
+
+    async def create() -> None:
+        await client.pages.create(
+            parent={"database_id": database_id},
+            properties={"Name": {"title": [{"text": {"content": "new"}}]}},
+        )
+
+    with pytest.raises(RequestTimeoutError):
+        asyncio.run(create())
+    assert transport.sent == 1
+    assert len(backend.database_pages[database_id]) == before + 1
+
+
+def test_query_is_retried(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    transport = FlakyTransport(backend, [502])
+    client = make_async_client(transport=transport)
+    pages = asyncio.run(client.get_entire_database(workspace.database_ids[0]))
+    assert len(pages) == 3
+    assert transport.sent == 2
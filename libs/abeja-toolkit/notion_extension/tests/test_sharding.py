@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+from notion_extension import AsyncClient, Client
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+from notion_extension.sharding import combine_filters, partition_by_timestamp
+
+
+def _checkbox(name: str) -> dict[str, Any]:
+    return {"property": name, "checkbox": {"equals": True}}
+
+
+def test_nested_and_filters_are_flattened() -> None:
+    a, b, c, d = (_checkbox(name) for name in "abcd")
+    nested = {"and": [a, {"and": [b, {"and": [c]}]}]}
+
+    assert combine_filters(nested, d) == {"and": [a, b, c, d]}
+    assert combine_filters(None, {"and": [a]}) == a
+    assert combine_filters(None, {}) is None
+
+
+def test_two_levels_of_compound_filters_are_allowed() -> None:
+    a, b, c = (_checkbox(name) for name in "abc")
+    either = {"or": [a, {"or": [b]}]}
+
+    assert combine_filters(either, c) == {"and": [{"or": [a, b]}, c]}
+
+
+def test_deeper_nesting_raises() -> None:
+    a, b, c = (_checkbox(name) for name in "abc")
+    nested = {"or": [{"and": [a, b]}, c]}
+
+    assert combine_filters(nested) == nested
+    with pytest.raises(ValueError, match="3 levels"):
+        combine_filters(nested, _checkbox("d"))
+
+
+def test_partitions_are_combined_with_the_filter(workspace: MockWorkspace, client: Client) -> None:
+    database_id = workspace.database_ids[0]
+    pages = client.get_entire_database(database_id)
+    boundary = sorted(page["created_time"] for page in pages)[1]
+
+    sharded = client.get_entire_database(
+        database_id,
+        filter={"and": [{"timestamp": "created_time", "created_time": {"is_not_empty": True}}]},
+        partitions=partition_by_timestamp([boundary]),
+    )
+    assert sorted(page["id"] for page in sharded) == sorted(page["id"] for page in pages)
+
+    with pytest.raises(ValueError):
+        client.get_entire_database(
+            database_id,
+            filter={"or": [{"and": [_checkbox("a"), _checkbox("b")]}, _checkbox("c")]},
+            partitions=partition_by_timestamp([boundary]),
+        )
+
+
+def test_async_partitions_fail_before_any_request(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    client = make_async_client()
+    count = backend.request_count
+    nested = {"or": [{"and": [_checkbox("a"), _checkbox("b")]}, _checkbox("c")]}
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            client.get_entire_database(
+                workspace.database_ids[0],
+                filter=nested,
+                partitions=partition_by_timestamp(["2024-01-01T00:00:00.000Z"]),
+            )
+        )
+    assert backend.request_count == count
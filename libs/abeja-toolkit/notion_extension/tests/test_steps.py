@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from typing import Any
+
+from notion_extension.steps import Blocking, Call, Steps, arun_steps, run_steps
+
+
+class _Target:
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+
+    def echo(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(kwargs)
+        return kwargs
+
+    def fail(self) -> None:
+        raise KeyError("missing")
+
+
+class _AsyncTarget(_Target):
+    async def echo(self, **kwargs: Any) -> dict[str, Any]:  # type: ignore[override]
+        return super().echo(**kwargs)
+
+    async def fail(self) -> None:  # type: ignore[override]
+        super().fail()
+
+
+def _procedure() -> Steps[tuple[Any, ...]]:
+    echoed = yield Call("echo", {"value": 1})
+    thread = yield Blocking(threading.get_ident, ())
+    try:
+        yield Call("fail", {})
+    except KeyError as error:
+        # The errors of the calls are raised in the procedure.
+        return echoed, thread, str(error)
+    raise AssertionError("not raised")
+
+
+def test_run_steps_calls_the_methods() -> None:
+    target = _Target()
+
+    echoed, thread, error = run_steps(target, _procedure())
+
+    assert echoed == {"value": 1}
+    assert target.calls == [{"value": 1}]
+    assert thread == threading.get_ident()
+    assert error == "'missing'"
+
+
+def test_arun_steps_awaits_the_methods_and_runs_blocking_calls_in_a_thread() -> None:
+    target = _AsyncTarget()
+
+    echoed, thread, error = asyncio.run(arun_steps(target, _procedure()))
+
+    assert echoed == {"value": 1}
+    assert thread != threading.get_ident()
+    assert error == "'missing'"
@@ -0,0 +1,96 @@
+import asyncio
+import io
+from typing import Any, Callable
+
+import pytest
+from notion_extension import AsyncClient, Client
+from notion_extension.mock_server import MockNotionBackend
+from notion_extension.utils import blocks2markdown
+
+
+def _walk(blocks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [item for block in blocks for item in [block, *_walk(block.get("children", []))]]
+
+
+def _paragraphs(count: int) -> list[dict[str, Any]]:
+    return [
+        {"type": "paragraph", "paragraph": {"rich_text": [{"text": {"content": f"line {i}"}}]}}
+        for i in range(count)
+    ]
+
+
+def _long_page(backend: MockNotionBackend, client: Client) -> str:
+    """A page with more than a page of results at the top level and in a nested block."""
+    page_id = backend.seed_workspace(
+        pages_per_database=1, blocks_per_page=150, depth=3, fanout=3
+    ).page_ids[0]
+    nested = next(
+        block
+        for block in _walk(client.get_all_blocks(page_id))
+        if block.get("children") and block["type"] == "toggle"
+    )
+    children = _paragraphs(130)
+    for start in range(0, len(children), 100):
+        client.blocks.children.append(block_id=nested["id"], children=children[start : start + 100])
+    return page_id
+
+
+OPTIONS = [
+    pytest.param({}, id="all"),
+    pytest.param({"max_depth": 2}, id="max_depth"),
+    pytest.param({"skip_children_of": ["toggle"]}, id="skip_children_of"),
+]
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_output_is_identical_to_blocks2markdown(
+    backend: MockNotionBackend,
+    client: Client,
+    make_async_client: Callable[..., AsyncClient],
+    options: dict[str, Any],
+) -> None:
+    page_id = _long_page(backend, client)
+    blocks = client.get_all_blocks(page_id, **options)
+    expected = blocks2markdown(blocks)
+
+    fp = io.StringIO()
+    written = client.stream_page_markdown(page_id, fp, max_workers=4, **options)
+
+    assert fp.getvalue() == expected
+    assert written == sum(1 for _ in _walk(blocks))
+
+    async_fp = io.StringIO()
+    asyncio.run(
+        make_async_client().stream_page_markdown(page_id, async_fp, max_concurrency=4, **options)
+    )
+    assert async_fp.getvalue() == expected
+
+
+class _FailingFile(io.StringIO):
+    def __init__(self, after: int):
+        super().__init__()
+        self.after = after
+
+    def write(self, text: str) -> int:
+        self.after -= 1
+        if self.after < 0:
+            raise OSError("disk full")
+        return super().write(text)
+
+
+def test_async_prefetches_are_finished_on_error(
+    backend: MockNotionBackend, client: Client, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    page_id = _long_page(backend, client)
+    # Keep the prefetches in flight when the write fails.
+    backend.latency = 0.01
+    async_client = make_async_client()
+
+    async def export() -> set[asyncio.Task[Any]]:
+        with pytest.raises(OSError, match="disk full"):
+            await async_client.stream_page_markdown(page_id, _FailingFile(after=5))
+        return asyncio.all_tasks() - {asyncio.current_task()}  # type: ignore[operator]
+
+    assert asyncio.run(export()) == set()
+    with pytest.raises(OSError, match="disk full"):
+        client.stream_page_markdown(page_id, _FailingFile(after=5))
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Callable
+
+from notion_extension import AsyncClient, Blocks, Client
+from notion_extension.mock_server import MockWorkspace
+
+
+def _paragraph(text: str) -> dict[str, Any]:
+    return {"type": "paragraph", "paragraph": {"rich_text": [{"text": {"content": text}}]}}
+
+
+def _texts(blocks: list[dict[str, Any]]) -> list[str]:
+    output = []
+    for block in blocks:
+        if block["type"] == "child_page":
+            output.append(f"page {block['child_page']['title']}")
+        else:
+            rich_text = block[block["type"]]["rich_text"]
+            output.append("".join(item["plain_text"] for item in rich_text))
+    return output
+
+
+def _make_page(client: Client, workspace: MockWorkspace, layout: list[str]) -> str:
+    """Create an empty page with the paragraphs and the child pages (`page <title>`)."""
+    page = client.pages.create(
+        parent={"database_id": workspace.database_ids[0]},
+        properties={"Name": {"title": [{"text": {"content": "Synced"}}]}},
+    )
+    for item in layout:
+        if item.startswith("page "):
+            client.pages.create(
+                parent={"page_id": page["id"]},
+                properties={"title": {"title": [{"text": {"content": item[5:]}}]}},
+            )
+        else:
+            client.blocks.children.append(block_id=page["id"], children=[_paragraph(item)])
+    return str(page["id"])
+
+
+def test_inserts_keep_the_position_of_child_pages(workspace: MockWorkspace, client: Client) -> None:
+    page_id = _make_page(client, workspace, ["A", "page P", "B"])
+
+    result = client.sync_page_content(page_id, Blocks.from_markdown("# X\nY\nB"))
+
+    assert _texts(client.get_all_blocks(page_id)) == ["X", "Y", "page P", "B"]
+    assert (result.kept, result.inserted, result.deleted) == (1, 2, 1)
+
+
+def test_appended_blocks_stay_before_a_trailing_child_page(
+    workspace: MockWorkspace, client: Client
+) -> None:
+    page_id = _make_page(client, workspace, ["A", "page P"])
+
+    client.sync_page_content(page_id, Blocks.from_markdown("A\nZ"))
+
+    assert _texts(client.get_all_blocks(page_id)) == ["A", "Z", "page P"]
+
+
+def test_blocks_before_a_leading_child_page_are_placed_after_it(
+    workspace: MockWorkspace, client: Client
+) -> None:
+    page_id = _make_page(client, workspace, ["page P", "A"])
+
+    client.sync_page_content(page_id, Blocks.from_markdown("# X\nA"))
+
+    assert _texts(client.get_all_blocks(page_id)) == ["page P", "X", "A"]
+
+
+def test_leading_insert_is_anchored_on_the_deleted_first_block(
+    workspace: MockWorkspace, client: Client
+) -> None:
+    page_id = _make_page(client, workspace, ["B", "C", "D"])
+
+    result = client.sync_page_content(page_id, Blocks.from_markdown("# X\nB\nC\nD"))
+
+    assert _texts(client.get_all_blocks(page_id)) == ["X", "B", "C", "D"]
+    # Only the first block is rewritten instead of the whole page.
+    assert (result.kept, result.inserted, result.deleted) == (2, 2, 1)
+
+
+def test_async_sync_keeps_the_position_of_child_pages(
+    workspace: MockWorkspace, client: Client, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    page_id = _make_page(client, workspace, ["A", "page P", "B", "page Q"])
+
+    async def sync() -> list[dict[str, Any]]:
+        async_client = make_async_client()
+        await async_client.sync_page_content(page_id, Blocks.from_markdown("A2\n# B"))
+        return await async_client.get_all_blocks(page_id)
+
+    assert _texts(asyncio.run(sync())) == ["A2", "page P", "B", "page Q"]
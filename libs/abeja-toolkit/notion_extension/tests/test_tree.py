@@ -0,0 +1,50 @@
+import asyncio
+from typing import Callable
+
+from notion_extension import AsyncClient, Client
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+def test_aclose_cancels_outstanding_prefetches(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    page_id = workspace.page_ids[0]
+    expected = make_client().get_all_blocks(page_id)
+    client = make_async_client()
+
+    async def read() -> None:
+        tree = await client.get_block_tree(page_id, prefetch=True)
+        tasks = list(tree._loader.tasks)
+        assert tasks
+
+        backend.latency = 0.05
+        await tree.aclose()
+        assert all(task.done() for task in tasks)
+        assert not tree._loader.tasks
+        backend.latency = 0.0
+
+        # The children which were not prefetched are fetched on access, without prefetching.
+        assert await tree.to_list() == expected
+        assert not tree._loader.tasks
+
+    asyncio.run(read())
+
+
+def test_async_context_manager_closes_the_tree(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    client = make_async_client()
+
+    async def read() -> None:
+        backend.latency = 0.05
+        async with await client.get_block_tree(workspace.page_ids[0], prefetch=True) as tree:
+            tasks = list(tree._loader.tasks)
+            assert tasks
+        assert all(task.cancelled() for task in tasks)
+
+    asyncio.run(read())
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Callable
+
+from notion_extension import AsyncClient, Client, Properties, Property
+from notion_extension.mock_server import MockNotionBackend
+from notion_extension.updates import changed_properties
+
+
+def _make_page(backend: MockNotionBackend, client: Client) -> dict[str, Any]:
+    database_id = backend.add_database("Links", {"Name": "title", "Status": "select", "U": "url"})
+    page = client.pages.create(
+        parent={"database_id": database_id},
+        properties={
+            "Name": {"title": [{"text": {"content": "Page"}}]},
+            "Status": {"select": {"name": "Done"}},
+            "U": {"url": "https://example.com"},
+        },
+    )
+    return dict(page)
+
+
+def test_unchanged_properties_are_not_sent(backend: MockNotionBackend, client: Client) -> None:
+    page = _make_page(backend, client)
+    properties = Properties(
+        properties=[
+            Property.title("Name", "Page"),
+            Property.select("Status", "Done"),
+            Property.url("U", "https://example.org"),
+        ]
+    )
+
+    assert changed_properties(page, properties) == {"U": {"url": "https://example.org"}}
+
+
+def test_cleared_values_are_sent_as_null(backend: MockNotionBackend, client: Client) -> None:
+    page = _make_page(backend, client)
+    properties = Properties(properties=[Property.select("Status", None), Property.url("U", None)])
+
+    changes = changed_properties(page, properties)
+    assert changes == {"Status": {"select": None}, "U": {"url": None}}
+
+    report = client.update_pages([(page, properties)])
+    assert report.results[0].success
+    updated = client.pages.retrieve(page_id=page["id"])["properties"]
+    assert updated["Status"]["select"] is None
+    assert updated["U"]["url"] is None
+    # Clearing an empty value again is not a change.
+    assert changed_properties({"properties": updated}, properties) == {}
+
+
+def test_a_malformed_page_fails_only_its_item(
+    backend: MockNotionBackend, client: Client, make_async_client: Callable[..., AsyncClient]
+) -> None:
+    page = _make_page(backend, client)
+    malformed = {**page, "properties": {"Status": {"type": "select", "select": "Done"}}}
+    without_id = {key: value for key, value in page.items() if key != "id"}
+    properties = Properties(properties=[Property.select("Status", "In progress")])
+    updates = [(malformed, properties), (without_id, properties), (page, properties)]
+
+    report = client.update_pages(updates)
+    assert [result.success for result in report.results] == [False, False, True]
+    assert report.results[0].error is not None
+
+    async def update() -> list[bool]:
+        async_report = await make_async_client().update_pages(updates)
+        return [result.success for result in async_report.results]
+
+    assert asyncio.run(update()) == [False, False, True]
@@ -0,0 +1,55 @@
+import asyncio
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from notion_extension import AsyncClient, Client, UserNotFoundError
+from notion_extension.mock_server import MockNotionBackend, MockWorkspace
+
+
+def test_users_are_fetched_once_per_ttl(
+    backend: MockNotionBackend, workspace: MockWorkspace, make_client: Callable[..., Client]
+) -> None:
+    client = make_client()
+
+    user = client.get_user_info("user1@example.com")
+    count = backend.request_count
+    assert client.get_user_info("User1@Example.com") == user
+    users = client.get_users_by_email(["user2@example.com", "nobody@example.com"])
+
+    assert user["id"] == workspace.user_ids[1]
+    assert list(users) == ["user2@example.com"]
+    assert backend.request_count == count
+
+
+def test_missing_user_raises_a_key_and_index_error(
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    make_async_client: Callable[..., AsyncClient],
+) -> None:
+    with pytest.raises(UserNotFoundError):
+        make_client().get_user_info("nobody@example.com")
+    with pytest.raises(IndexError):
+        make_client().get_user_info("nobody@example.com")
+    with pytest.raises(KeyError):
+        asyncio.run(make_async_client().get_user_info("nobody@example.com"))
+
+
+def test_persisted_users_are_separated_by_token(
+    backend: MockNotionBackend,
+    workspace: MockWorkspace,
+    make_client: Callable[..., Client],
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "users.json"
+    make_client(user_cache_path=path).get_user_info("user0@example.com")
+
+    count = backend.request_count
+    make_client(user_cache_path=path).get_user_info("user0@example.com")
+    assert backend.request_count == count
+
+    # Another integration doesn't read the users of the first one.
+    other = make_client(user_cache_path=path, auth="other-secret")
+    other.get_user_info("user0@example.com")
+    assert backend.request_count > count
+    assert len(list(tmp_path.glob("users.*.json"))) == 2